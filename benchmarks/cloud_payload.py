@@ -0,0 +1,96 @@
+"""
+大集合云同步数据量基准
+
+在内存后端（cloud.backends.MemoryBackend，基于 FakeFirestore）上对比时间记录集合的
+首次全量上传和新设备的首次下载：
+    逐项文档：每条记录一个项目文档（压缩分块之前的行为）
+    压缩分块：记录分组为 zlib 压缩的分块文档，集合文档中记录快照清单，下载时并行读取分块
+    压缩分块（串行读取）：同上，但只用一个线程读取分块
+
+报告写入和读取的数据量（按 Firestore 文档大小规则估算的字节数）、网络往返次数和耗时。
+--latency-ms 为每次往返加上模拟的网络延迟，并行读取分块的收益只在有延迟时体现。
+逐项文档在内存替身中会复制全部文档，数据量大时内存占用很高，超过 --per-item-limit 的规模跳过。
+
+用法：
+    python -m benchmarks.cloud_payload [--sizes 10000,100000,1000000] [--latency-ms 20]
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from cloud.backends import MemoryBackend  # noqa: E402
+from cloud.cloud_sync import CloudSync  # noqa: E402
+from model.event_model import RecordItem  # noqa: E402
+
+COLLECTION = 'event_records'
+CATEGORIES = ["work", "study", "life", "default"]
+
+
+def make_records(count: int) -> list:
+    base = datetime(2024, 1, 1, 9, 0)
+    records = []
+    for i in range(count):
+        start = base + timedelta(minutes=30 * i)
+        records.append(RecordItem(description=f"专注时段 {i}", start_time=start,
+                                  end_time=start + timedelta(minutes=25), duration_seconds=1500,
+                                  event_type=CATEGORIES[i % 4]).to_dict())
+    return records
+
+
+def run(records: list, chunked: bool, workers: int, latency: float) -> dict:
+    backend = MemoryBackend(latency=latency)
+    client = backend.client
+    cloud = CloudSync('', 'bench', backend=backend)
+    cloud.chunk_min_items = 1 if chunked else float('inf')
+    cloud.chunk_fetch_workers = workers
+    with contextlib.redirect_stdout(io.StringIO()):
+        began = time.perf_counter()
+        writes = cloud.item_writes(COLLECTION, records, {}, replace_legacy=True)
+        assert cloud.commit_writes(writes)
+        upload_seconds = time.perf_counter() - began
+        upload = client.reset_stats()
+        began = time.perf_counter()
+        result = cloud.download_items(COLLECTION, "")
+        download_seconds = time.perf_counter() - began
+        download = client.reset_stats()
+    assert result is not None and len(result[0]) == len(records)
+    return {'upload_bytes': upload['bytes_written'], 'upload_round_trips': upload['round_trips'],
+            'upload_seconds': upload_seconds, 'download_bytes': download['bytes_read'],
+            'download_round_trips': download['round_trips'], 'download_seconds': download_seconds}
+
+
+def report(name: str, result: dict):
+    print(f"  {name:<14} 上传 {result['upload_bytes'] / 1024 / 1024:9.2f} MiB "
+          f"{result['upload_round_trips']:6d} 次往返 {result['upload_seconds']:8.2f} s   "
+          f"下载 {result['download_bytes'] / 1024 / 1024:9.2f} MiB "
+          f"{result['download_round_trips']:6d} 次往返 {result['download_seconds']:8.2f} s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="大集合云同步数据量基准")
+    parser.add_argument('--sizes', default='10000,100000,1000000', help="逗号分隔的记录数")
+    parser.add_argument('--latency-ms', type=float, default=20.0, help="每次网络往返的模拟延迟（毫秒）")
+    parser.add_argument('--per-item-limit', type=int, default=100000, help="逐项文档方式的最大记录数")
+    args = parser.parse_args()
+    latency = args.latency_ms / 1000
+
+    for size in (int(value) for value in args.sizes.split(',')):
+        records = make_records(size)
+        print(f"{size} 条记录（往返延迟 {args.latency_ms:.0f} ms）")
+        if size <= args.per_item_limit:
+            report("逐项文档", run(records, chunked=False, workers=1, latency=latency))
+        else:
+            print(f"  {'逐项文档':<14} 跳过（超过 --per-item-limit）")
+        report("压缩分块", run(records, chunked=True, workers=8, latency=latency))
+        report("压缩分块串行", run(records, chunked=True, workers=1, latency=latency))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,81 @@
+"""
+项目内存占用基准
+
+模拟从数据文件加载：先 json.loads 出原始字典，再按模型的加载路径构造项目
+（TodoItem.from_dict / LazyRecordItem），
+统计最终仍被项目引用的内存（tracemalloc），输出每个项目平均占用的字节数。
+
+用法：
+    python -m benchmarks.memory_items [--todos 100000] [--records 1000000]
+
+说明：QDate 等 Qt 对象在 C++ 侧分配，不计入 tracemalloc 统计。
+"""
+
+import argparse
+import gc
+import json
+import os
+import sys
+import tracemalloc
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from model.event_model import LazyRecordItem, RecordItem  # noqa: E402
+from model.todo_model import TodoItem  # noqa: E402
+
+CATEGORIES = ["work", "study", "life", "default"]
+
+
+def todo_payload(count: int) -> str:
+    base = datetime(2024, 1, 1, 9, 0)
+    items = [
+        TodoItem(description=f"待办事项 {i}", category=CATEGORIES[i % 4],
+                 created_time=base + timedelta(minutes=i), priority=i % 4 + 1,
+                 consume_time=i % 120).to_dict()
+        for i in range(count)
+    ]
+    return json.dumps({"items": items}, ensure_ascii=False)
+
+
+def record_payload(count: int) -> str:
+    base = datetime(2024, 1, 1, 9, 0)
+    items = []
+    for i in range(count):
+        start = base + timedelta(minutes=30 * i)
+        items.append(RecordItem(description=f"专注 {i % 50}", category=CATEGORIES[i % 4],
+                                created_time=start, start_time=start,
+                                end_time=start + timedelta(minutes=25),
+                                duration_seconds=1500).to_dict())
+    return json.dumps({"events": items}, ensure_ascii=False)
+
+
+def measure(payload: str, key: str, build) -> float:
+    """返回加载后每个项目占用的字节数"""
+    gc.collect()
+    tracemalloc.start()
+    raw = json.loads(payload)[key]
+    items = [build(data) for data in raw]
+    del raw
+    gc.collect()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    per_item = current / len(items)
+    del items
+    return per_item
+
+
+def main():
+    parser = argparse.ArgumentParser(description="项目内存占用基准")
+    parser.add_argument("--todos", type=int, default=100_000)
+    parser.add_argument("--records", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    payload = todo_payload(args.todos)
+    print(f"TodoItem    x {args.todos:>9,}: {measure(payload, 'items', TodoItem.from_dict):8.1f} B/项")
+    payload = record_payload(args.records)
+    print(f"RecordItem  x {args.records:>9,}: {measure(payload, 'events', LazyRecordItem):8.1f} B/项")
+
+
+if __name__ == "__main__":
+    main()
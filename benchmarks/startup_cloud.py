@@ -0,0 +1,123 @@
+"""
+云同步启动开销基准
+
+对比 CloudSync 的两种初始化方式下应用创建全部数据模型的耗时：
+    立即初始化：创建 CloudSync 时就导入 firebase_admin、读取服务账号证书并创建 Firestore 客户端
+               （旧行为，在 cloud_sync 服务创建后立即调用 backend.connect() 来模拟）
+    延迟初始化：这些开销推迟到第一次同步或启动监听器时才发生（当前行为）
+
+每种方式在独立的 Python 进程中运行，模块导入缓存不会影响另一方；同时报告启动后
+firebase_admin 是否已被导入，以及延迟方式在第一次同步时付出的初始化耗时。
+在临时目录中运行，不读写真实的数据文件。没有安装 firebase_admin 或证书不可用时，
+立即初始化无法启动（旧行为下应用同样无法启动），对应结果显示为不可用。
+
+用法：
+    python -m benchmarks.startup_cloud [--key config/<服务账号证书>.json] [--runs 3]
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_KEY = os.path.join(ROOT, 'config', 'brilliant-balm-465903-g3-e308e8638139.json')
+
+
+def child(mode: str, key_path: str):
+    """在当前进程中创建全部模型并以 JSON 输出计时结果"""
+    began = time.perf_counter()
+    sys.path.insert(0, ROOT)
+    from PySide6.QtCore import QCoreApplication
+    app = QCoreApplication.instance() or QCoreApplication(sys.argv)
+    from utils.service_registry import create_app_registry
+    from model.storage import background_writer
+
+    result = {'mode': mode}
+    registry = create_app_registry('bench', key_path)
+    if mode == 'eager':
+        cloud_factory = registry._factories['cloud_sync']
+
+        def eager_cloud(r):
+            cloud = cloud_factory(r)
+            cloud.backend.connect()
+            return cloud
+        registry.register('cloud_sync', eager_cloud)
+    try:
+        with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+            registry.get('todo_model')
+            registry.get('event_model')
+            registry.get('timer_model')
+        result['startup_ms'] = (time.perf_counter() - began) * 1000
+        result['firebase_imported'] = 'firebase_admin' in sys.modules
+        cloud = registry.get('cloud_sync')
+        if not cloud.initialized:
+            # 第一次同步时才付出的初始化开销
+            with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+                first = time.perf_counter()
+                try:
+                    cloud.backend.connect()
+                    result['first_sync_init_ms'] = (time.perf_counter() - first) * 1000
+                except Exception as e:
+                    result['first_sync_error'] = f"{type(e).__name__}: {e}"
+    except Exception as e:
+        result['error'] = f"{type(e).__name__}: {e}"
+    background_writer.flush()
+    print(json.dumps(result, ensure_ascii=False))
+    del app
+
+
+def run_child(mode: str, key_path: str, workdir: str) -> dict:
+    proc = subprocess.run([sys.executable, '-m', 'benchmarks.startup_cloud', '--child', mode, '--key', key_path],
+                          cwd=workdir, env={**os.environ, 'PYTHONPATH': os.pathsep.join(
+                              filter(None, [ROOT, os.environ.get('PYTHONPATH')]))},
+                          capture_output=True, text=True)
+    lines = proc.stdout.strip().splitlines()
+    if proc.returncode != 0 or not lines:
+        return {'mode': mode, 'error': proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else '进程异常退出'}
+    return json.loads(lines[-1])
+
+
+def report(name: str, results: list):
+    failed = [r for r in results if 'error' in r]
+    if failed:
+        print(f"{name}: 不可用（{failed[0]['error']}）")
+        return None
+    startup = min(r['startup_ms'] for r in results)
+    line = f"{name}: 启动 {startup:8.1f} ms  firebase_admin 已导入: {'是' if results[0]['firebase_imported'] else '否'}"
+    inits = [r['first_sync_init_ms'] for r in results if 'first_sync_init_ms' in r]
+    if inits:
+        line += f"  首次同步初始化 {min(inits):8.1f} ms"
+    elif any('first_sync_error' in r for r in results):
+        line += f"  首次同步初始化不可用（{results[0]['first_sync_error']}）"
+    print(line)
+    return startup
+
+
+def main():
+    parser = argparse.ArgumentParser(description="云同步启动开销基准")
+    parser.add_argument('--key', default=DEFAULT_KEY, help="服务账号证书路径")
+    parser.add_argument('--runs', type=int, default=3, help="每种方式运行的次数（取最小值）")
+    parser.add_argument('--child', choices=['eager', 'lazy'], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    key_path = os.path.abspath(args.key)
+
+    if args.child:
+        child(args.child, key_path)
+        return
+
+    with tempfile.TemporaryDirectory() as workdir:
+        # 先运行一次完成数据文件的创建，避免计入任一方
+        run_child('lazy', key_path, workdir)
+        eager = report("立即初始化", [run_child('eager', key_path, workdir) for _ in range(args.runs)])
+        lazy = report("延迟初始化", [run_child('lazy', key_path, workdir) for _ in range(args.runs)])
+    if eager is not None and lazy is not None:
+        print(f"启动节省 {eager - lazy:8.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,136 @@
+"""
+启动装配基准
+
+对比两种启动装配方式加载数据模型的开销：
+    旧装配：main.py 创建 TodoModel 后再 load 一次，并创建一个 EventModel；
+            TimerModel 自己再创建一个 EventModel
+    注册表：通过 ServiceRegistry 创建，每个模型只创建一次并共享
+
+统计读取的字节数（Linux 的 /proc/self/io rchar）、耗时和加载后仍被持有的内存（tracemalloc）。
+在临时目录中生成数据运行，不依赖 Firebase：云同步替换为不联网的空实现。
+
+用法：
+    python -m benchmarks.startup_models [--todos 5000] [--events 20000]
+"""
+
+import argparse
+import contextlib
+import gc
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from PySide6.QtCore import QCoreApplication  # noqa: E402
+
+
+class OfflineCloud:
+    """不联网的云同步实现，只用于基准测试"""
+
+    def upload(self, collection: str, local_path: str) -> bool:
+        return False
+
+    def download(self, collection: str, local_path: str) -> bool:
+        return False
+
+
+def write_data(todos: int, events: int):
+    from model.todo_model import TodoItem
+    from model.event_model import RecordItem
+    os.makedirs('data', exist_ok=True)
+    items = [TodoItem(description=f"待办事项 {i}", priority=i % 4 + 1).to_dict() for i in range(todos)]
+    with open(os.path.join('data', 'todo_events.json'), 'w', encoding='utf-8') as f:
+        json.dump({'schema_version': 2, 'items': items}, f, ensure_ascii=False)
+    # 时间记录集中在当月，分段存储启动时会全部加载
+    start = datetime.now().replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    step = (datetime.now() - start) / max(events, 1)
+    records = []
+    for i in range(events):
+        begin = start + step * i
+        records.append(RecordItem(description=f"专注 {i}", start_time=begin,
+                                  end_time=begin + timedelta(seconds=1), duration_seconds=1).to_dict())
+    with open(os.path.join('data', 'event_records.json'), 'w', encoding='utf-8') as f:
+        json.dump({'schema_version': 2, 'events': records}, f, ensure_ascii=False)
+
+
+def read_bytes() -> int:
+    try:
+        with open('/proc/self/io', 'r') as f:
+            for line in f:
+                if line.startswith('rchar:'):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return -1
+
+
+def legacy_startup(cloud):
+    from model.todo_model import TodoModel
+    from model.event_model import EventModel
+    from model.timer_model import TimerModel
+    todo = TodoModel('bench', '', cloud=cloud)
+    todo.load()
+    event = EventModel('bench', '', cloud=cloud)
+    timer = TimerModel('bench', '', event_model=EventModel('bench', '', cloud=cloud), cloud=cloud)
+    return todo, event, timer
+
+
+def registry_startup(cloud):
+    from utils.service_registry import create_app_registry
+    registry = create_app_registry('bench', '')
+    registry.register('cloud_sync', lambda r: cloud)
+    return registry.get('todo_model'), registry.get('event_model'), registry.get('timer_model')
+
+
+def measure(name: str, startup):
+    gc.collect()
+    tracemalloc.start()
+    before_io, began = read_bytes(), time.perf_counter()
+    # 模型初始化会逐条打印待办事项，输出丢弃以免刷屏
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        models = startup(OfflineCloud())
+    elapsed = time.perf_counter() - began
+    io = read_bytes() - before_io if before_io >= 0 else -1
+    gc.collect()
+    memory, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    io_text = f"{io / 1024:10.0f} KiB" if io >= 0 else "        不可用"
+    print(f"{name}: 读取 {io_text}  耗时 {elapsed * 1000:8.1f} ms  内存 {memory / 1024:8.0f} KiB")
+    del models
+
+
+def main():
+    parser = argparse.ArgumentParser(description="启动装配基准")
+    parser.add_argument('--todos', type=int, default=5000)
+    parser.add_argument('--events', type=int, default=20000)
+    args = parser.parse_args()
+
+    app = QCoreApplication.instance() or QCoreApplication(sys.argv)
+    from model.todo_model import TodoModel
+    from model.event_model import EventModel
+    from model.storage import background_writer
+    TodoModel.archive_done_after_days = None
+    EventModel.archive_after_days = None
+
+    with tempfile.TemporaryDirectory() as workdir:
+        os.chdir(workdir)
+        write_data(args.todos, args.events)
+        # 先完成一次旧文件拆分等一次性迁移，避免计入任一方
+        with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+            registry_startup(OfflineCloud())
+        background_writer.flush()
+        measure("旧装配", legacy_startup)
+        measure("注册表", registry_startup)
+        background_writer.flush()
+        os.chdir(ROOT)
+    del app
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,158 @@
+"""
+云同步后端吞吐量与延迟基准
+
+通过 BaseModel.sync_upload/sync_download 在两台模拟设备（各自独立的临时数据目录）之间同步待办事项，
+依次使用每种云同步后端（cloud.backends）：
+    memory：内存中的 Firestore 替身，--latency-ms 模拟往返延迟，--failure-rate 注入失败
+    local：临时目录中的 SQLite 文件
+    firestore：真实的 Firestore（只在提供 --key 时运行，数据写在 --user 指定的用户下）
+
+报告：
+    首次同步：设备 A 全量上传、设备 B 全量下载的耗时和每秒项目数
+    增量同步：每轮在 A 上修改 --changes 个项目后上传，再由 B 下载，上传/下载耗时的中位数、p95 和最大值
+失败的同步会立即重试直到成功，重试次数计入报告（验证失败不会丢失或重复修改）。
+
+用法：
+    python -m benchmarks.sync_backends [--items 5000] [--rounds 20] [--changes 10]
+                                       [--latency-ms 20] [--failure-rate 0.1] [--key config/<证书>.json]
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PySide6.QtCore import QCoreApplication  # noqa: E402
+
+from cloud.backends import FirestoreBackend, LocalBackend, MemoryBackend  # noqa: E402
+from cloud.cloud_sync import CloudSync  # noqa: E402
+from model.storage import background_writer  # noqa: E402
+from model.todo_model import TodoItem, TodoModel  # noqa: E402
+
+CATEGORIES = ["work", "study", "life", "default"]
+
+
+class Device:
+    """一台模拟设备：独立的数据目录和 TodoModel（操作前切换到自己的目录）"""
+
+    def __init__(self, workdir: str, name: str, user_id: str, cloud: CloudSync, items: int = 0):
+        self.path = os.path.join(workdir, name)
+        os.makedirs(os.path.join(self.path, 'data'), exist_ok=True)
+        if items:
+            base = datetime(2024, 1, 1, 9, 0)
+            payload = [TodoItem(description=f"待办事项 {i}", category=CATEGORIES[i % 4],
+                                created_time=base + timedelta(minutes=i), priority=i % 4 + 1).to_dict()
+                       for i in range(items)]
+            with open(os.path.join(self.path, 'data', 'todo_events.json'), 'w', encoding='utf-8') as f:
+                json.dump({'items': payload}, f, ensure_ascii=False)
+        with self.inside():
+            self.model = TodoModel(user_id, '', cloud=cloud)
+
+    @contextlib.contextmanager
+    def inside(self):
+        previous = os.getcwd()
+        os.chdir(self.path)
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):
+                yield
+        finally:
+            # 后台写入使用相对路径，离开目录前写完
+            background_writer.flush()
+            os.chdir(previous)
+
+    def sync(self, upload: bool) -> tuple:
+        """同步直到成功，返回 (耗时秒数, 重试次数)"""
+        retries = 0
+        began = time.perf_counter()
+        with self.inside():
+            while not (self.model.sync_upload() if upload else self.model.sync_download()):
+                retries += 1
+        return time.perf_counter() - began, retries
+
+
+def percentile(values: list, fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def run(name: str, backend_a, backend_b, args) -> None:
+    user_id = f"bench-{int(time.time())}" if name == 'firestore' else args.user
+    workdir = tempfile.mkdtemp(prefix='sync_backends_')
+    try:
+        a = Device(workdir, 'a', user_id, CloudSync('', user_id, backend=backend_a), items=args.items)
+        b = Device(workdir, 'b', user_id, CloudSync('', user_id, backend=backend_b))
+        upload_seconds, retries = a.sync(upload=True)
+        download_seconds, download_retries = b.sync(upload=False)
+        retries += download_retries
+        assert len(b.model._items) == args.items, f"{name}: 下载后 {len(b.model._items)} 个项目"
+
+        uploads, downloads = [], []
+        for round_index in range(args.rounds):
+            with a.inside():
+                for i in range(args.changes):
+                    a.model.toggle_item_done((round_index * args.changes + i) % args.items)
+            seconds, count = a.sync(upload=True)
+            uploads.append(seconds)
+            retries += count
+            seconds, count = b.sync(upload=False)
+            downloads.append(seconds)
+            retries += count
+        done_a = sorted(item.id for item in a.model._items if item.done)
+        done_b = sorted(item.id for item in b.model._items if item.done)
+        assert done_a == done_b, f"{name}: 两台设备的数据不一致"
+
+        print(f"{name}:")
+        print(f"  首次上传 {upload_seconds:8.2f} s {args.items / upload_seconds:10.0f} 项/s   "
+              f"首次下载 {download_seconds:8.2f} s {args.items / download_seconds:10.0f} 项/s")
+        if uploads:
+            for label, values in (("增量上传", uploads), ("增量下载", downloads)):
+                print(f"  {label} 中位数 {statistics.median(values) * 1000:8.1f} ms  "
+                      f"p95 {percentile(values, 0.95) * 1000:8.1f} ms  最大 {max(values) * 1000:8.1f} ms")
+        print(f"  失败后重试 {retries} 次，两台设备数据一致")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="云同步后端吞吐量与延迟基准")
+    parser.add_argument('--items', type=int, default=5000, help="待办事项数")
+    parser.add_argument('--rounds', type=int, default=20, help="增量同步轮数")
+    parser.add_argument('--changes', type=int, default=10, help="每轮修改的项目数")
+    parser.add_argument('--latency-ms', type=float, default=20.0, help="memory 后端每次往返的模拟延迟（毫秒）")
+    parser.add_argument('--failure-rate', type=float, default=0.0, help="memory 后端每次往返失败的概率")
+    parser.add_argument('--key', help="Firestore 服务账号证书路径，提供时同时测试 firestore 后端")
+    parser.add_argument('--user', default='bench', help="memory/local 后端使用的用户 id")
+    args = parser.parse_args()
+    app = QCoreApplication.instance() or QCoreApplication(sys.argv)
+    TodoModel.archive_done_after_days = None
+
+    memory = MemoryBackend(latency=args.latency_ms / 1000, failure_rate=args.failure_rate, seed=1)
+    run('memory', memory, MemoryBackend(failure_rate=args.failure_rate, seed=2, client=memory.client), args)
+    local_dir = tempfile.mkdtemp(prefix='sync_backends_cloud_')
+    try:
+        run('local', LocalBackend(local_dir), LocalBackend(local_dir), args)
+    finally:
+        shutil.rmtree(local_dir, ignore_errors=True)
+    if args.key:
+        try:
+            backend = FirestoreBackend(os.path.abspath(args.key))
+            backend.connect()
+            run('firestore', backend, backend, args)
+        except Exception as e:
+            print(f"firestore: 不可用（{type(e).__name__}: {e}）")
+    else:
+        print("firestore: 跳过（未提供 --key）")
+    del app
+
+
+if __name__ == '__main__':
+    main()
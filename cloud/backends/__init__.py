@@ -0,0 +1,9 @@
+from .base_backend import (SERVER_TIMESTAMP, DELETE_FIELD, SYNCED_AT, Write, DocumentSnapshot, Listener,
+                           SyncBackend)
+from .firestore_backend import FirestoreBackend
+from .memory_backend import MemoryBackend
+from .local_backend import LocalBackend
+from .factory import BACKENDS, create_backend
+
+__all__ = ['SERVER_TIMESTAMP', 'DELETE_FIELD', 'SYNCED_AT', 'Write', 'DocumentSnapshot', 'Listener', 'SyncBackend',
+           'FirestoreBackend', 'MemoryBackend', 'LocalBackend', 'BACKENDS', 'create_backend']
@@ -0,0 +1,157 @@
+"""
+云同步后端抽象模块
+
+定义 CloudSync 与具体云端存储之间的接口。CloudSync 只负责同步协议（项目文档、删除标记、
+水位、压缩分块快照），文档的读写、查询和监听全部交给后端：
+
+- ``FirestoreBackend``：Google Firestore（默认）
+- ``MemoryBackend``：内存中的 Firestore 替身，可配置网络延迟和注入失败，用于离线测试
+- ``LocalBackend``：本地目录中的 SQLite 文件，可供同一台机器上的多个实例或共享目录使用
+
+文档以斜杠分隔的路径标识（``<集合>/<文档>/<子集合>/<文档>``），数据是普通字典；
+写入中的 SERVER_TIMESTAMP 由后端替换为服务器时间（同一次提交中相同、单调递增），
+DELETE_FIELD 在合并写入时删除字段。
+"""
+
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import Any, Callable, Iterable, List, Optional, Tuple
+
+
+class _Sentinel:
+    def __init__(self, name: str):
+        self._name = name
+
+    def __repr__(self) -> str:
+        return self._name
+
+
+# 提交时替换为服务器时间的占位值（可以嵌套在映射中）
+SERVER_TIMESTAMP = _Sentinel('SERVER_TIMESTAMP')
+# 合并写入时删除字段的占位值
+DELETE_FIELD = _Sentinel('DELETE_FIELD')
+# 后端按这个字段（服务器写入时间）排序和筛选查询结果
+SYNCED_AT = 'synced_at'
+
+# 一个写入操作：(文档路径, 数据（None 表示删除文档）, 是否与已有文档合并)
+Write = Tuple[str, Optional[dict], bool]
+
+
+class DocumentSnapshot:
+    """读取到的一个文档
+
+    Args:
+        path: 文档路径
+        data: 文档数据，文档不存在时为 None
+    """
+
+    __slots__ = ('path', '_data')
+
+    def __init__(self, path: str, data: Optional[dict]):
+        self.path = path
+        self._data = data
+
+    @property
+    def id(self) -> str:
+        return self.path.rsplit('/', 1)[-1]
+
+    @property
+    def exists(self) -> bool:
+        return self._data is not None
+
+    def to_dict(self) -> Optional[dict]:
+        return self._data
+
+
+class Listener(ABC):
+    """listen_query/listen_document 返回的监听句柄"""
+
+    @abstractmethod
+    def unsubscribe(self) -> None:
+        """停止监听，之后不再回调"""
+
+
+class SyncBackend(ABC):
+    """云同步后端基类
+
+    Attributes:
+        init_seconds: 首次连接（导入客户端库、读取证书等）的耗时，未连接或无需连接时为 None
+    """
+    init_seconds: Optional[float] = None
+
+    @property
+    def initialized(self) -> bool:
+        """是否已经连接（需要延迟初始化的后端在第一次访问前为 False）"""
+        return True
+
+    def connect(self) -> None:
+        """立即完成初始化（通常不必调用，第一次读写时自动完成）"""
+
+    @abstractmethod
+    def get(self, path: str, field_paths: Optional[List[str]] = None) -> DocumentSnapshot:
+        """读取一个文档；field_paths 不为 None 时只读取这些顶层字段"""
+
+    @abstractmethod
+    def get_all(self, paths: List[str], field_paths: Optional[List[str]] = None) -> List[DocumentSnapshot]:
+        """一次往返读取多个文档，结果与 paths 顺序一致"""
+
+    @abstractmethod
+    def query(self, collection_path: str, after: Optional[datetime] = None) -> Iterable[DocumentSnapshot]:
+        """查询集合中的文档，按 synced_at 升序；after 不为 None 时只返回 synced_at 晚于它的文档"""
+
+    @abstractmethod
+    def commit(self, writes: List[Write]) -> None:
+        """原子地提交一批写入（调用方保证不超过 Firestore 的批量写入限制），失败时抛出异常"""
+
+    @abstractmethod
+    def listen_query(self, collection_path: str, after: Optional[datetime],
+                     callback: Callable[[List[DocumentSnapshot]], None]) -> Listener:
+        """监听集合中 synced_at 晚于 after 的文档
+
+        先送达一次当前匹配的全部文档，之后每次有文档新增或修改时送达变化的文档。
+        callback 在后端的后台线程中调用。
+        """
+
+    @abstractmethod
+    def listen_document(self, path: str, callback: Callable[[DocumentSnapshot], None]) -> Listener:
+        """监听一个文档：先送达一次当前内容，之后每次修改时送达新内容（后台线程中回调）"""
+
+
+def apply_write(current: dict, data: dict, timestamp: datetime) -> dict:
+    """把一次写入应用到文档上：替换时间占位值、删除 DELETE_FIELD 字段、嵌套映射逐层合并
+
+    Args:
+        current: 合并写入时为已有文档，覆盖写入时为空字典
+        data: 写入的数据
+        timestamp: 本次提交的服务器时间
+    """
+    result = dict(current)
+    for key, value in data.items():
+        if value is DELETE_FIELD:
+            result.pop(key, None)
+        elif value is SERVER_TIMESTAMP:
+            result[key] = timestamp
+        elif isinstance(value, dict):
+            nested = current.get(key)
+            result[key] = apply_write(nested if isinstance(nested, dict) else {}, value, timestamp)
+        else:
+            result[key] = value
+    return result
+
+
+def select_fields(data: Optional[dict], field_paths: Optional[List[str]]) -> Optional[dict]:
+    """只保留 field_paths 中的顶层字段（field_paths 为 None 时原样返回）"""
+    if data is None or field_paths is None:
+        return data
+    return {key: value for key, value in data.items() if key in field_paths}
+
+
+def translate_sentinels(data: Any, server_timestamp: Any, delete_field: Any) -> Any:
+    """把写入数据中的占位值换成具体客户端库的占位值（嵌套映射逐层替换）"""
+    if isinstance(data, dict):
+        return {key: translate_sentinels(value, server_timestamp, delete_field) for key, value in data.items()}
+    if data is SERVER_TIMESTAMP:
+        return server_timestamp
+    if data is DELETE_FIELD:
+        return delete_field
+    return data
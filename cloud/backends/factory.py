@@ -0,0 +1,37 @@
+"""
+云同步后端工厂模块
+
+根据配置（config/settings.json 中的 ``cloud.backend``）创建云同步后端，默认使用 Firestore。
+"""
+
+import os
+from typing import Optional
+
+from .base_backend import SyncBackend
+
+BACKENDS = ('firestore', 'memory', 'local')
+DEFAULT_LOCAL_DIR = os.path.join('data', 'cloud')
+
+
+def create_backend(backend: Optional[str], key_path: str, local_dir: Optional[str] = None) -> SyncBackend:
+    """创建云同步后端
+
+    Args:
+        backend: firestore/memory/local，None 表示 firestore
+        key_path: Firestore 服务账号证书路径
+        local_dir: local 后端保存 sync.db 的目录，None 表示 data/cloud
+
+    Returns:
+        云同步后端实例
+    """
+    backend = backend or 'firestore'
+    if backend == 'firestore':
+        from .firestore_backend import FirestoreBackend
+        return FirestoreBackend(key_path)
+    if backend == 'memory':
+        from .memory_backend import MemoryBackend
+        return MemoryBackend()
+    if backend == 'local':
+        from .local_backend import LocalBackend
+        return LocalBackend(local_dir or DEFAULT_LOCAL_DIR)
+    raise ValueError(f"未知的云同步后端: {backend}")
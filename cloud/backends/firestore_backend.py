@@ -0,0 +1,122 @@
+"""
+Firestore 后端模块
+
+把 SyncBackend 的路径式接口翻译为 Firestore 客户端调用。构造时不导入 firebase_admin、
+不读取服务账号证书、不创建客户端：大多数会话从不同步，这些开销推迟到第一次读写或监听时
+才发生，且只发生一次。
+"""
+
+import threading
+import time
+from datetime import datetime
+from typing import Callable, Iterable, List, Optional
+
+from .base_backend import (SYNCED_AT, DocumentSnapshot, Listener, SyncBackend, Write,
+                           translate_sentinels)
+
+
+class _Watch(Listener):
+    def __init__(self, watch):
+        self._watch = watch
+
+    def unsubscribe(self) -> None:
+        self._watch.unsubscribe()
+
+
+class FirestoreBackend(SyncBackend):
+    """Firestore 云同步后端
+
+    Args:
+        key_path: 服务账号证书路径
+        client: 已创建的 Firestore 客户端（如 cloud.fake_firestore.FakeFirestore），
+            提供时不导入 firebase_admin；客户端需带 SERVER_TIMESTAMP 和 DELETE_FIELD 属性
+    """
+
+    def __init__(self, key_path: str, client=None):
+        self.key_path = key_path
+        self._db = client
+        self._firestore = client
+        self._init_lock = threading.Lock()
+
+    @property
+    def initialized(self) -> bool:
+        return self._db is not None
+
+    def connect(self) -> None:
+        self.db
+
+    @property
+    def db(self):
+        """Firestore 客户端，首次访问时导入 firebase_admin 并创建（线程安全）"""
+        if self._db is None:
+            with self._init_lock:
+                if self._db is None:
+                    began = time.perf_counter()
+                    import firebase_admin
+                    from firebase_admin import credentials, firestore
+                    if not firebase_admin._apps:
+                        cred = credentials.Certificate(self.key_path)
+                        firebase_admin.initialize_app(cred)
+                    self._firestore = firestore
+                    self._db = firestore.client()
+                    self.init_seconds = time.perf_counter() - began
+                    print(f"[CloudSync] Firestore 客户端初始化耗时 {self.init_seconds * 1000:.0f} ms")
+        return self._db
+
+    def _ref(self, path: str):
+        """斜杠分隔的路径 -> 集合或文档引用（段数为奇数是集合，偶数是文档）"""
+        ref = self.db
+        for index, part in enumerate(path.split('/')):
+            ref = ref.collection(part) if index % 2 == 0 else ref.document(part)
+        return ref
+
+    def _snapshot(self, path: str, doc) -> DocumentSnapshot:
+        return DocumentSnapshot(path, doc.to_dict() if doc.exists else None)
+
+    def get(self, path: str, field_paths: Optional[List[str]] = None) -> DocumentSnapshot:
+        return self._snapshot(path, self._ref(path).get(field_paths=field_paths))
+
+    def get_all(self, paths: List[str], field_paths: Optional[List[str]] = None) -> List[DocumentSnapshot]:
+        # get_all 不保证返回顺序，按文档路径对应回去
+        docs = {doc.reference.path: doc for doc in self.db.get_all([self._ref(path) for path in paths],
+                                                                    field_paths=field_paths)}
+        return [self._snapshot(path, docs[path]) if path in docs else DocumentSnapshot(path, None)
+                for path in paths]
+
+    def _query(self, collection_path: str, after: Optional[datetime]):
+        query = self._ref(collection_path)
+        if after is not None:
+            query = query.where(SYNCED_AT, '>', after)
+        return query.order_by(SYNCED_AT)
+
+    def query(self, collection_path: str, after: Optional[datetime] = None) -> Iterable[DocumentSnapshot]:
+        for doc in self._query(collection_path, after).stream():
+            yield DocumentSnapshot(f"{collection_path}/{doc.id}", doc.to_dict())
+
+    def commit(self, writes: List[Write]) -> None:
+        batch = self.db.batch()
+        for path, data, merge in writes:
+            if data is None:
+                batch.delete(self._ref(path))
+            else:
+                batch.set(self._ref(path), translate_sentinels(
+                    data, self._firestore.SERVER_TIMESTAMP, self._firestore.DELETE_FIELD), merge=merge)
+        batch.commit()
+
+    def listen_query(self, collection_path: str, after: Optional[datetime],
+                     callback: Callable[[List[DocumentSnapshot]], None]) -> Listener:
+        def on_snapshot(docs, changes, read_time):
+            changed = [DocumentSnapshot(f"{collection_path}/{change.document.id}", change.document.to_dict())
+                       for change in changes
+                       if change.type.name != 'REMOVED' and change.document.exists]
+            if changed:
+                callback(changed)
+
+        return _Watch(self._query(collection_path, after).on_snapshot(on_snapshot))
+
+    def listen_document(self, path: str, callback: Callable[[DocumentSnapshot], None]) -> Listener:
+        def on_snapshot(docs, changes, read_time):
+            for doc in docs:
+                callback(self._snapshot(path, doc))
+
+        return _Watch(self._ref(path).on_snapshot(on_snapshot))
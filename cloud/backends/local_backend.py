@@ -0,0 +1,212 @@
+"""
+本地目录后端模块
+
+把云端文档保存在指定目录下的 SQLite 文件（``sync.db``）中：每个文档一行，
+``parent`` 和 ``synced_at`` 两列带索引，供增量查询按服务器写入时间筛选和排序。
+可用于离线测试、同一台机器上的多个实例之间同步，或放在局域网共享目录中使用
+（SQLite 依赖文件锁，网络文件系统上的锁不可靠时不要多台机器同时写入）。
+
+- 服务器时间由提交事务分配：取当前时间和库中上次时间加 1 微秒中较大的一个，
+  同一次提交中的文档时间相同，多个进程之间也单调递增
+- 文档数据以 JSON 保存，bytes 和时间值带类型标记
+- 监听由后台线程每隔 poll_interval 秒查询一次变更
+"""
+
+import base64
+import json
+import os
+import sqlite3
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Iterable, List, Optional
+
+from .base_backend import (SYNCED_AT, DocumentSnapshot, Listener, SyncBackend, Write,
+                           apply_write, select_fields)
+
+DB_FILE = 'sync.db'
+
+
+def _encode_value(value):
+    if isinstance(value, (bytes, bytearray)):
+        return {'__bytes__': base64.b64encode(value).decode('ascii')}
+    if isinstance(value, datetime):
+        return {'__time__': value.isoformat()}
+    raise TypeError(f"无法保存的类型: {type(value).__name__}")
+
+
+def _decode_value(data: dict):
+    if '__bytes__' in data:
+        return base64.b64decode(data['__bytes__'])
+    if '__time__' in data:
+        return datetime.fromisoformat(data['__time__'])
+    return data
+
+
+def _encode(data: dict) -> str:
+    return json.dumps(data, ensure_ascii=False, separators=(',', ':'), default=_encode_value)
+
+
+def _decode(text: str) -> dict:
+    return json.loads(text, object_hook=_decode_value)
+
+
+def _sortable(value) -> Optional[str]:
+    """synced_at 列的值：固定宽度的 UTC 时间字符串，字符串顺序即时间顺序"""
+    if not isinstance(value, datetime):
+        return None
+    return value.astimezone(timezone.utc).strftime('%Y-%m-%dT%H:%M:%S.%f')
+
+
+def _parent(path: str) -> str:
+    return path.rsplit('/', 1)[0]
+
+
+class _Poll(Listener):
+    """轮询式监听：记录上次送达的位置，由 LocalBackend 的后台线程推进"""
+
+    def __init__(self, backend: 'LocalBackend', check: Callable[[], None]):
+        self._backend = backend
+        self.check = check
+        self.active = True
+
+    def unsubscribe(self) -> None:
+        self.active = False
+        self._backend._remove_listener(self)
+
+
+class LocalBackend(SyncBackend):
+    """本地目录中的 SQLite 云同步后端
+
+    Args:
+        directory: 保存 sync.db 的目录（不存在时创建）
+        poll_interval: 监听的轮询间隔（秒）
+    """
+
+    def __init__(self, directory: str, poll_interval: float = 1.0):
+        os.makedirs(directory, exist_ok=True)
+        self._db_path = os.path.join(directory, DB_FILE)
+        self._poll_interval = poll_interval
+        self._local = threading.local()
+        self._listeners: List[_Poll] = []
+        self._listeners_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._poller: Optional[threading.Thread] = None
+        with self._conn() as conn:
+            conn.execute('CREATE TABLE IF NOT EXISTS documents '
+                         '(path TEXT PRIMARY KEY, parent TEXT NOT NULL, synced_at TEXT, data TEXT NOT NULL)')
+            conn.execute('CREATE INDEX IF NOT EXISTS documents_parent_synced_at ON documents(parent, synced_at)')
+            conn.execute('CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)')
+
+    def _conn(self) -> sqlite3.Connection:
+        """当前线程的数据库连接（并行读取分块时每个线程各用一个连接）"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self._db_path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, path: str, field_paths: Optional[List[str]] = None) -> DocumentSnapshot:
+        row = self._conn().execute('SELECT data FROM documents WHERE path = ?', (path,)).fetchone()
+        return DocumentSnapshot(path, select_fields(_decode(row[0]), field_paths) if row else None)
+
+    def get_all(self, paths: List[str], field_paths: Optional[List[str]] = None) -> List[DocumentSnapshot]:
+        marks = ','.join('?' * len(paths))
+        rows = dict(self._conn().execute(f'SELECT path, data FROM documents WHERE path IN ({marks})', paths))
+        return [DocumentSnapshot(path, select_fields(_decode(rows[path]), field_paths) if path in rows else None)
+                for path in paths]
+
+    def _rows(self, collection_path: str, after: Optional[str]):
+        return self._conn().execute(
+            'SELECT path, synced_at, data FROM documents WHERE parent = ? AND synced_at > ? ORDER BY synced_at',
+            (collection_path, after or '')).fetchall()
+
+    def query(self, collection_path: str, after: Optional[datetime] = None) -> Iterable[DocumentSnapshot]:
+        return [DocumentSnapshot(path, _decode(data)) for path, _, data in self._rows(collection_path, _sortable(after))]
+
+    def commit(self, writes: List[Write]) -> None:
+        conn = self._conn()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            timestamp = self._server_time(conn)
+            for path, data, merge in writes:
+                if data is None:
+                    conn.execute('DELETE FROM documents WHERE path = ?', (path,))
+                    continue
+                current = {}
+                if merge:
+                    row = conn.execute('SELECT data FROM documents WHERE path = ?', (path,)).fetchone()
+                    current = _decode(row[0]) if row else {}
+                document = apply_write(current, data, timestamp)
+                conn.execute('INSERT OR REPLACE INTO documents (path, parent, synced_at, data) VALUES (?, ?, ?, ?)',
+                             (path, _parent(path), _sortable(document.get(SYNCED_AT)), _encode(document)))
+            conn.execute('COMMIT')
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+        self._wake.set()
+
+    def _server_time(self, conn: sqlite3.Connection) -> datetime:
+        """分配本次提交的服务器时间（在写事务中调用，多个进程之间也单调递增）"""
+        now = datetime.now(timezone.utc)
+        row = conn.execute("SELECT value FROM meta WHERE key = 'clock'").fetchone()
+        if row:
+            last = datetime.fromisoformat(row[0])
+            if now <= last:
+                now = last + timedelta(microseconds=1)
+        conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('clock', ?)", (now.isoformat(),))
+        return now
+
+    def listen_query(self, collection_path: str, after: Optional[datetime],
+                     callback: Callable[[List[DocumentSnapshot]], None]) -> Listener:
+        position = [_sortable(after) or '']
+
+        def check():
+            rows = self._rows(collection_path, position[0])
+            if rows:
+                position[0] = rows[-1][1]
+                callback([DocumentSnapshot(path, _decode(data)) for path, _, data in rows])
+
+        return self._add_listener(check)
+
+    def listen_document(self, path: str, callback: Callable[[DocumentSnapshot], None]) -> Listener:
+        last = [object()]
+
+        def check():
+            row = self._conn().execute('SELECT data FROM documents WHERE path = ?', (path,)).fetchone()
+            text = row[0] if row else None
+            if text != last[0]:
+                last[0] = text
+                callback(DocumentSnapshot(path, _decode(text) if text is not None else None))
+
+        return self._add_listener(check)
+
+    def _add_listener(self, check: Callable[[], None]) -> _Poll:
+        listener = _Poll(self, check)
+        with self._listeners_lock:
+            self._listeners.append(listener)
+            if self._poller is None:
+                self._poller = threading.Thread(target=self._poll, name='LocalBackendPoll', daemon=True)
+                self._poller.start()
+        self._wake.set()
+        return listener
+
+    def _remove_listener(self, listener: _Poll) -> None:
+        with self._listeners_lock:
+            if listener in self._listeners:
+                self._listeners.remove(listener)
+
+    def _poll(self) -> None:
+        while True:
+            self._wake.wait(self._poll_interval)
+            self._wake.clear()
+            with self._listeners_lock:
+                listeners = list(self._listeners)
+            for listener in listeners:
+                if not listener.active:
+                    continue
+                try:
+                    listener.check()
+                except Exception as e:
+                    print(f"[LocalBackend] 监听回调异常: {e}")
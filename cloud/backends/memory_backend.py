@@ -0,0 +1,75 @@
+"""
+内存后端模块
+
+在内存中的 Firestore 替身（cloud.fake_firestore.FakeFirestore）上运行 FirestoreBackend，
+不联网也不需要证书，同步协议经过与真实 Firestore 相同的翻译代码。另外可以配置：
+
+- ``latency``：每次网络往返的延迟（秒），在锁外等待，并发的读取互不阻塞
+- ``failure_rate``：每次往返失败的概率，失败时抛出 ConnectionError，数据不会被修改
+- ``fail_next(count)``：让接下来的 count 次往返失败（确定性地测试重试）
+"""
+
+import random
+import threading
+from datetime import datetime
+from typing import Iterable, List, Optional
+
+from .base_backend import DocumentSnapshot, Write
+from .firestore_backend import FirestoreBackend
+
+
+class MemoryBackend(FirestoreBackend):
+    """内存中的云同步后端，可注入延迟和失败
+
+    Args:
+        latency: 每次网络往返的模拟延迟（秒）
+        failure_rate: 每次往返失败的概率（0~1）
+        seed: 失败注入使用的随机数种子，None 表示不固定
+        client: 共用的 FakeFirestore（多个后端模拟多台设备访问同一个云端），None 时新建
+    """
+
+    def __init__(self, latency: float = 0.0, failure_rate: float = 0.0, seed: Optional[int] = None,
+                 client=None):
+        from cloud.fake_firestore import FakeFirestore
+        super().__init__('', client=client or FakeFirestore(latency=latency))
+        self.failure_rate = failure_rate
+        self.failures = 0
+        self._random = random.Random(seed)
+        self._fail_next = 0
+        self._fail_lock = threading.Lock()
+
+    @property
+    def client(self):
+        """底层的 FakeFirestore（读取 stats、直接检查云端数据）"""
+        return self._db
+
+    def fail_next(self, count: int = 1) -> None:
+        """让接下来的 count 次网络往返失败"""
+        with self._fail_lock:
+            self._fail_next += count
+
+    def _round_trip(self) -> None:
+        with self._fail_lock:
+            fail = self._fail_next > 0 or (self.failure_rate > 0 and self._random.random() < self.failure_rate)
+            if self._fail_next > 0:
+                self._fail_next -= 1
+            if fail:
+                self.failures += 1
+        if fail:
+            raise ConnectionError("模拟的网络故障")
+
+    def get(self, path: str, field_paths: Optional[List[str]] = None) -> DocumentSnapshot:
+        self._round_trip()
+        return super().get(path, field_paths)
+
+    def get_all(self, paths: List[str], field_paths: Optional[List[str]] = None) -> List[DocumentSnapshot]:
+        self._round_trip()
+        return super().get_all(paths, field_paths)
+
+    def query(self, collection_path: str, after: Optional[datetime] = None) -> Iterable[DocumentSnapshot]:
+        self._round_trip()
+        return super().query(collection_path, after)
+
+    def commit(self, writes: List[Write]) -> None:
+        self._round_trip()
+        super().commit(writes)
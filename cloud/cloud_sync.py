@@ -1,56 +1,472 @@
+import hashlib
 import os
-import threading
-from typing import Callable
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
 import json
-import firebase_admin
-from firebase_admin import credentials, firestore
+
+from cloud.backends import DELETE_FIELD, SERVER_TIMESTAMP, FirestoreBackend, SyncBackend, Write
+from model.storage.schema import SCHEMA_VERSION, document_version, upgrade_items
+
+# 增量同步的项目文档位于 <集合>/<用户>/items/<项目 id>
+ITEMS_SUBCOLLECTION = 'items'
+# Firestore 单次批量写入的操作数上限
+BATCH_LIMIT = 500
+# 单次批量写入的数据量上限（Firestore 限制一次请求 10 MiB，留出余量）
+BATCH_MAX_BYTES = 8 * 1024 * 1024
+
+# 整集合文档中记录内容哈希的字段
+CONTENT_HASH_FIELD = 'content_hash'
+# 集合文档中的快照清单：快照 id -> {chunks, items, bytes, synced_at}
+SNAPSHOTS_FIELD = 'snapshots'
+# 集合文档的元数据字段：批量读取和下载前的比较只取这些字段，不取文档内容
+METADATA_FIELDS = ['layout', 'schema_version', 'synced_at', CONTENT_HASH_FIELD, SNAPSHOTS_FIELD]
+
+# 读取过旧版整集合文档后的下载水位：早于任何服务器时间，旧版文档不会被再次读取，
+# 其他设备迁移到增量布局后仍会下载全部项目文档
+LEGACY_IMPORTED = '0001-01-01T00:00:00+00:00'
+
+# 大集合首次全量上传时的压缩分块位于 <集合>/<用户>/chunks/<快照 id>-<序号>
+CHUNKS_SUBCOLLECTION = 'chunks'
+# 首次全量上传的项目数达到这个值时改为压缩分块快照
+CHUNK_MIN_ITEMS = 2000
+# 每个分块的项目数；压缩后超过 CHUNK_MAX_BYTES 时对半拆分（Firestore 单个文档上限 1 MiB）
+CHUNK_ITEMS = 5000
+CHUNK_MAX_BYTES = 900 * 1024
+# 下载快照时并行读取分块的线程数
+CHUNK_FETCH_WORKERS = 8
+
+
+def content_hash(data: dict) -> str:
+    """整集合文档内容的哈希（键排序后的紧凑 JSON 的 SHA-256），不包括哈希字段本身"""
+    body = {key: value for key, value in data.items() if key != CONTENT_HASH_FIELD}
+    encoded = json.dumps(body, ensure_ascii=False, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(encoded.encode('utf-8')).hexdigest()
+
 
 class CloudSync:
-    def __init__(self, key_path: str, user_id: str):
-        if not firebase_admin._apps:
-            cred = credentials.Certificate(key_path)
-            firebase_admin.initialize_app(cred)
-        self.db = firestore.client()
+    """云同步
+
+    这里实现同步协议（项目文档、删除标记、水位、压缩分块快照），文档的读写、查询和监听
+    交给云同步后端（cloud.backends.SyncBackend）。默认的 Firestore 后端构造时不导入
+    firebase_admin、不读取服务账号证书、不创建客户端：大多数会话从不同步，
+    这些开销推迟到第一次同步或启动监听器时才发生，且只发生一次。
+
+    Args:
+        key_path: 服务账号证书路径
+        user_id: 用户 id，云端文档以它为 id
+        client: 已创建的 Firestore 客户端（如 cloud.fake_firestore.FakeFirestore），
+            以它创建 Firestore 后端，不导入 firebase_admin
+        backend: 云同步后端（见 cloud.backends.create_backend），提供时忽略 key_path 和 client
+    """
+
+    def __init__(self, key_path: str, user_id: str, client=None, backend: Optional[SyncBackend] = None):
+        self.key_path = key_path
         self.user_id = user_id
+        self.backend = backend or FirestoreBackend(key_path, client)
         self.listeners = {}
+        self.chunk_min_items = CHUNK_MIN_ITEMS
+        self.chunk_fetch_workers = CHUNK_FETCH_WORKERS
+
+    @property
+    def initialized(self) -> bool:
+        """后端是否已经完成初始化（Firestore 客户端是否已经创建）"""
+        return self.backend.initialized
+
+    @property
+    def init_seconds(self) -> Optional[float]:
+        """后端首次初始化（导入 + 证书 + 客户端）的耗时，未初始化时为 None"""
+        return self.backend.init_seconds
 
     def upload(self, collection: str, local_path: str) -> bool:
+        """上传整集合文档，文档中带内容哈希供下载端比较"""
         try:
             with open(local_path, 'r', encoding='utf-8') as f:
                 data = json.load(f)
-            doc_ref = self.db.collection(collection).document(self.user_id)
-            doc_ref.set(data)
+            self.backend.commit([self.document_write(collection, data)])
             return True
         except Exception as e:
             print(f"[CloudSync] 上传失败: {e}")
             return False
 
-    def download(self, collection: str, local_path: str) -> bool:
+    def download(self, collection: str, snapshot=None, local_hash: str = "") -> Optional[Tuple[Optional[dict], str]]:
+        """下载整集合文档
+
+        先只读取元数据，云端内容哈希与 local_hash 相同时不读取文档内容。
+        返回解码后的文档，由调用方直接替换内存中的数据并交给后台写入器保存，不经过本地文件。
+
+        Args:
+            snapshot: 已经通过 get_documents 批量读取的元数据快照，为 None 时单独读取
+            local_hash: 本地当前内容的哈希
+
+        Returns:
+            (文档内容, 内容哈希)，哈希与 local_hash 相同时文档内容为 None；
+            云端没有文档时返回 (None, "")，调用方保留本地数据即可；失败时返回 None
+        """
         try:
-            doc_ref = self.db.collection(collection).document(self.user_id)
-            doc = doc_ref.get()
-            if doc.exists:
-                with open(local_path, 'w', encoding='utf-8') as f:
-                    json.dump(doc.to_dict(), f, ensure_ascii=False, indent=2)
-                return True
-            else:
+            path = self._document_path(collection)
+            doc = snapshot if snapshot is not None else self.backend.get(path, METADATA_FIELDS)
+            if not doc.exists:
                 print(f"[CloudSync] 云端无数据: {collection}/{self.user_id}")
-                return False
+                return None, ""
+            remote_hash = doc.to_dict().get(CONTENT_HASH_FIELD)
+            if remote_hash and remote_hash == local_hash:
+                return None, local_hash
+            data = dict(self.backend.get(path).to_dict() or {})
+            data.pop(CONTENT_HASH_FIELD, None)
+            return data, content_hash(data)
         except Exception as e:
             print(f"[CloudSync] 下载失败: {e}")
+            return None
+
+    def _document_path(self, collection: str) -> str:
+        return f"{collection}/{self.user_id}"
+
+    def _items_path(self, collection: str) -> str:
+        return f"{self._document_path(collection)}/{ITEMS_SUBCOLLECTION}"
+
+    def _chunks_path(self, collection: str) -> str:
+        return f"{self._document_path(collection)}/{CHUNKS_SUBCOLLECTION}"
+
+    def document_write(self, collection: str, data: dict) -> Write:
+        """整集合文档的一个写入操作（附带内容哈希），交给 commit_writes 提交"""
+        return self._document_path(collection), {**data, CONTENT_HASH_FIELD: content_hash(data)}, False
+
+    def item_writes(self, collection: str, items: List[dict], tombstones: Dict[str, str],
+                    replace_legacy: bool = False, downloaded: str = "") -> List[Write]:
+        """增量上传的写入操作：每个项目一个文档，文档 id 即项目 id
+
+        每个文档带服务器写入时间 synced_at，下载端据此只查询新文档。
+        有写入时最后再合并写入集合文档的格式标记，它的 synced_at 不早于其中任何一个项目，
+        下载端批量读取集合文档后即可判断集合自上次下载以来是否有变更。
+
+        首次全量上传的项目数达到 chunk_min_items 时不逐项写入，而是写成压缩分块快照
+        （见 _snapshot_writes），删除标记仍逐项写入。
+
+        Args:
+            collection: 集合名
+            items: 自上次上传以来修改过的项目字典
+            tombstones: 本地删除的项目 id -> 删除时间，写为 deleted=True 的删除标记
+            replace_legacy: 首次增量上传时清除旧版整集合文档中的项目（即使没有项目也写格式标记）；
+                items 此时必须是包括本地归档在内的全部项目，否则只存在于旧版文档中的历史会丢失
+            downloaded: 本地的下载水位，首次全量上传时不晚于它的旧快照已合并进本地数据，被新快照取代
+        """
+        writes, superseded = [], []
+        parent = {'layout': ITEMS_SUBCOLLECTION, 'schema_version': SCHEMA_VERSION}
+        if replace_legacy:
+            parent.update(items=DELETE_FIELD, events=DELETE_FIELD)
+            if len(items) >= self.chunk_min_items:
+                writes, parent[SNAPSHOTS_FIELD], superseded = self._snapshot_writes(collection, items, downloaded)
+                items = []
+        path = self._items_path(collection)
+        docs = [(item['id'], {**item, 'deleted': False}) for item in items]
+        docs.extend((item_id, {'id': item_id, 'updated_at': deleted_at, 'deleted': True})
+                    for item_id, deleted_at in tombstones.items())
+        for item_id, doc in docs:
+            doc.update(schema_version=SCHEMA_VERSION, synced_at=SERVER_TIMESTAMP)
+            writes.append((f"{path}/{item_id}", doc, False))
+        if writes or replace_legacy:
+            # 合并写入，保留其他设备写入的快照清单；被取代的旧快照分块在新清单之后删除
+            writes.append((self._document_path(collection), {**parent, 'synced_at': SERVER_TIMESTAMP}, True))
+            writes.extend(superseded)
+        return writes
+
+    def _snapshot_writes(self, collection: str, items: List[dict],
+                         downloaded: str) -> Tuple[List[Write], dict, List[Write]]:
+        """首次全量上传的压缩分块快照
+
+        项目按 CHUNK_ITEMS 个一组序列化为紧凑 JSON 后用 zlib 压缩，每组一个分块文档；
+        集合文档的 snapshots 清单记录快照的分块数、项目数和服务器写入时间。
+        快照 id 由压缩内容的哈希得出，失败重传时写入相同的文档。
+        清单中 synced_at 不晚于 downloaded 的旧快照已经合并进本地数据，从清单中删除。
+
+        Returns:
+            (分块写入操作, 集合文档 snapshots 字段的合并内容, 被取代的旧分块的删除操作)
+        """
+        chunks = self._encode_chunks(items)
+        digest = hashlib.sha256()
+        for blob, _ in chunks:
+            digest.update(blob)
+        snapshot_id = digest.hexdigest()[:16]
+        path = self._chunks_path(collection)
+        writes = [(f"{path}/{snapshot_id}-{index}",
+                   {'snapshot': snapshot_id, 'index': index, 'encoding': 'zlib', 'count': count,
+                    'schema_version': SCHEMA_VERSION, 'data': blob}, False)
+                  for index, (blob, count) in enumerate(chunks)]
+        manifest = {snapshot_id: {'chunks': len(chunks), 'items': len(items),
+                                  'bytes': sum(len(blob) for blob, _ in chunks),
+                                  'synced_at': SERVER_TIMESTAMP}}
+        superseded = []
+        existing = self.backend.get(self._document_path(collection), [SNAPSHOTS_FIELD])
+        for old_id, old in ((existing.to_dict() or {}).get(SNAPSHOTS_FIELD) or {}).items():
+            synced_at = old.get('synced_at')
+            if old_id != snapshot_id and downloaded and synced_at is not None and synced_at.isoformat() <= downloaded:
+                manifest[old_id] = DELETE_FIELD
+                superseded.extend((f"{path}/{old_id}-{index}", None, False)
+                                  for index in range(old.get('chunks', 0)))
+        print(f"[CloudSync] {collection} 全量上传为压缩快照: {len(items)} 个项目，{len(chunks)} 个分块，"
+              f"{manifest[snapshot_id]['bytes'] / 1024:.0f} KiB")
+        return writes, manifest, superseded
+
+    @staticmethod
+    def _encode_chunks(items: List[dict]) -> List[Tuple[bytes, int]]:
+        """把项目分组压缩为分块，返回 [(压缩数据, 项目数)]；压缩后仍超过 CHUNK_MAX_BYTES 的组对半拆分"""
+        chunks = []
+        pending = [items[start:start + CHUNK_ITEMS] for start in range(0, len(items), CHUNK_ITEMS)]
+        while pending:
+            part = pending.pop(0)
+            blob = zlib.compress(json.dumps(part, ensure_ascii=False, separators=(',', ':')).encode('utf-8'))
+            if len(blob) > CHUNK_MAX_BYTES and len(part) > 1:
+                half = len(part) // 2
+                pending[:0] = [part[:half], part[half:]]
+                continue
+            chunks.append((blob, len(part)))
+        return chunks
+
+    def commit_writes(self, writes: List[Write], token=None) -> bool:
+        """用批量写入按顺序提交任意集合的写入操作
+
+        每个批次最多 BATCH_LIMIT 个操作、约 BATCH_MAX_BYTES 的分块数据。
+        中途失败时已提交的批次重传也是幂等的。
+
+        Args:
+            writes: (文档路径, 数据, 是否合并) 列表，可以来自多个集合；数据为 None 时删除文档
+            token: 后台同步的 SyncToken，每个批次后回报进度并检查取消
+
+        Returns:
+            是否全部写入成功
+        """
+        try:
+            start = 0
+            while start < len(writes):
+                if token and token.is_cancelled():
+                    return False
+                size, end = 0, start
+                while end < len(writes) and end - start < BATCH_LIMIT:
+                    data = writes[end][1]
+                    blob = data.get('data') if data else None
+                    size += len(blob) if isinstance(blob, bytes) else 0
+                    if end > start and size > BATCH_MAX_BYTES:
+                        break
+                    end += 1
+                self.backend.commit(writes[start:end])
+                start = end
+                if token:
+                    token.report(start, len(writes))
+            return True
+        except Exception as e:
+            print(f"[CloudSync] 批量写入失败: {e}")
             return False
 
-    def start_listener(self, collection: str, callback: Callable):
-        doc_ref = self.db.collection(collection).document(self.user_id)
-        def on_snapshot(doc_snapshot, changes, read_time):
-            for doc in doc_snapshot:
-                callback(doc.to_dict())
-        # Firestore 监听器需在新线程中启动，避免阻塞主线程
-        listener = doc_ref.on_snapshot(on_snapshot)
-        self.listeners[collection] = listener
+    def upload_items(self, collection: str, items: List[dict], tombstones: Dict[str, str],
+                     replace_legacy: bool = False, token=None) -> bool:
+        """增量上传一个集合（写入操作见 item_writes）
+
+        Returns:
+            是否全部写入成功
+        """
+        try:
+            writes = self.item_writes(collection, items, tombstones, replace_legacy)
+        except Exception as e:
+            print(f"[CloudSync] 增量上传失败: {e}")
+            return False
+        if not self.commit_writes(writes, token):
+            return False
+        print(f"[CloudSync] 增量上传 {collection}: {len(items)} 个项目，{len(tombstones)} 个删除")
+        return True
+
+    def get_documents(self, collections: List[str]) -> Optional[Dict[str, object]]:
+        """一次批量读取（get_all）多个集合的集合文档，只读取元数据字段
+
+        Returns:
+            集合名 -> 文档快照（不存在的文档 exists 为 False）；失败时返回 None
+        """
+        try:
+            snapshots = self.backend.get_all([self._document_path(collection) for collection in collections],
+                                             METADATA_FIELDS)
+            return dict(zip(collections, snapshots))
+        except Exception as e:
+            print(f"[CloudSync] 批量读取失败: {e}")
+            return None
+
+    def download_items(self, collection: str, since: str = "", token=None,
+                       parent=None) -> Optional[Tuple[List[dict], str]]:
+        """增量下载 synced_at 晚于 since 的项目文档
+
+        先读取集合文档的元数据：集合文档的 synced_at 不晚于 since 时不再查询项目；
+        清单中有晚于 since 的压缩分块快照时并行读取它们的分块，与查询到的项目文档一起
+        按 updated_at 去重（同一项目只保留最新的版本）。
+        云端还只有旧版整集合文档时，首次下载返回其中的全部项目并把水位设为 LEGACY_IMPORTED，
+        之后不再重复读取。
+
+        Args:
+            collection: 集合名
+            since: 下载水位（服务器时间的 ISO 字符串），空字符串表示全部
+            token: 后台同步的 SyncToken，每收到 BATCH_LIMIT 个文档或一个分块回报一次进度并检查取消
+            parent: 已经通过 get_documents 批量读取的集合文档元数据快照，为 None 时单独读取
+
+        Returns:
+            (变更列表, 新的下载水位)，删除标记为 {"id", "updated_at", "deleted": True}；
+            失败时返回 None
+        """
+        try:
+            if parent is None:
+                parent = self.backend.get(self._document_path(collection), METADATA_FIELDS)
+            data = parent.to_dict() if parent.exists else None
+            if data is None:
+                return [], since
+            if 'layout' not in data:
+                if since:
+                    return [], since
+                doc = self.backend.get(self._document_path(collection))
+                return self._legacy_items(doc.to_dict() if doc.exists else None), LEGACY_IMPORTED
+            parent_synced_at = data['synced_at'].isoformat() if data.get('synced_at') is not None else ""
+            if since and parent_synced_at and parent_synced_at <= since:
+                return [], since
+            snapshot_items = self._download_snapshots(collection, data.get(SNAPSHOTS_FIELD) or {}, since, token)
+            if snapshot_items is None:
+                return None
+            docs = self.backend.query(self._items_path(collection), datetime.fromisoformat(since) if since else None)
+            changes, watermark = [], since
+            for doc in docs:
+                data, synced_at = self._decode_item(doc.to_dict())
+                watermark = max(watermark, synced_at)
+                changes.append(data)
+                if token and len(changes) % BATCH_LIMIT == 0:
+                    if token.is_cancelled():
+                        return None
+                    token.report(len(changes), 0)
+            if snapshot_items:
+                changes = self._latest_versions(snapshot_items + changes)
+            # 集合文档在查询之前读取，早于它写入的项目和快照都已包含在结果中
+            return changes, max(watermark, parent_synced_at)
+        except Exception as e:
+            print(f"[CloudSync] 增量下载失败: {e}")
+            return None
+
+    def _download_snapshots(self, collection: str, snapshots: Dict[str, dict], since: str,
+                            token=None) -> Optional[List[dict]]:
+        """并行读取清单中 synced_at 晚于 since 的快照的全部分块
+
+        Returns:
+            快照中的项目（多个快照按写入时间先后排列）；被取消时返回 None
+        """
+        path = self._chunks_path(collection)
+        paths = []
+        for snapshot_id, manifest in sorted(snapshots.items(), key=lambda entry: entry[1].get('synced_at')):
+            synced_at = manifest.get('synced_at')
+            if since and synced_at is not None and synced_at.isoformat() <= since:
+                continue
+            paths.extend(f"{path}/{snapshot_id}-{index}" for index in range(manifest.get('chunks', 0)))
+        if not paths:
+            return []
+        items = []
+        with ThreadPoolExecutor(max_workers=max(1, min(self.chunk_fetch_workers, len(paths)))) as pool:
+            futures = [pool.submit(self._read_chunk, chunk_path) for chunk_path in paths]
+            for done, future in enumerate(futures, 1):
+                if token and token.is_cancelled():
+                    for pending in futures:
+                        pending.cancel()
+                    return None
+                items.extend(future.result())
+                if token:
+                    token.report(done, len(paths))
+        print(f"[CloudSync] {collection} 读取压缩快照: {len(paths)} 个分块，{len(items)} 个项目")
+        return items
+
+    def _read_chunk(self, chunk_path: str) -> List[dict]:
+        """读取并解压一个快照分块（在读取线程中调用）"""
+        doc = self.backend.get(chunk_path)
+        if not doc.exists:
+            raise RuntimeError(f"快照分块缺失: {chunk_path}")
+        data = doc.to_dict()
+        items = json.loads(zlib.decompress(data['data']).decode('utf-8'))
+        return upgrade_items(items, data.get('schema_version', SCHEMA_VERSION))
+
+    @staticmethod
+    def _latest_versions(changes: List[dict]) -> List[dict]:
+        """同一项目出现多次时只保留 updated_at 最新的版本，updated_at 相同时取后出现的"""
+        latest: Dict[str, dict] = {}
+        for data in changes:
+            current = latest.get(data['id'])
+            if current is None or data['updated_at'] >= current['updated_at']:
+                latest[data['id']] = data
+        return list(latest.values())
+
+    @staticmethod
+    def _decode_item(data: dict) -> Tuple[dict, str]:
+        """把项目文档还原为项目字典（删除标记保持 deleted=True），返回 (项目, synced_at ISO 字符串)"""
+        synced_at = data.pop('synced_at', None)
+        version = data.pop('schema_version', SCHEMA_VERSION)
+        if not data.get('deleted'):
+            data.pop('deleted', None)
+            upgrade_items([data], version)
+        return data, synced_at.isoformat() if synced_at is not None else ""
+
+    @staticmethod
+    def _legacy_items(data: Optional[dict]) -> List[dict]:
+        """旧版整集合文档中的项目（不是旧版文档时返回空列表）"""
+        if not data or 'layout' in data:
+            return []
+        items = data.get('items', data.get('events', []))
+        return upgrade_items(items, document_version(data))
+
+    def start_listener(self, collection: str, callback: Callable[[List[dict], str], None], since: str = ""):
+        """实时监听集合中 synced_at 晚于 since 的项目文档
+
+        监听器先送达一次初始快照（水位之后的全部变更），之后每次云端提交送达变化的文档。
+        同时监听集合文档：快照清单中出现新的压缩分块快照（其他设备的首次全量上传）时
+        读取它的分块并送达其中的项目，这类送达不推进水位（水位之前的项目文档可能尚未送达），
+        重复合并相同的快照没有副作用。
+        callback 在后端的监听线程中调用，不能直接修改 Qt 模型。
+        同一集合重复启动时先停止旧的监听。
+
+        Args:
+            collection: 集合名
+            callback: callback(变更列表, 本批文档中最大的 synced_at)，变更格式同 download_items
+            since: 下载水位，空字符串表示全部
+
+        Returns:
+            是否成功启动
+        """
+        self.stop_listener(collection)
+        try:
+            def on_items(docs):
+                decoded, watermark = [], ""
+                for doc in docs:
+                    data, synced_at = self._decode_item(doc.to_dict())
+                    watermark = max(watermark, synced_at)
+                    decoded.append(data)
+                callback(decoded, watermark)
+
+            seen = set()
+
+            def on_parent(doc):
+                snapshots = (doc.to_dict() or {}).get(SNAPSHOTS_FIELD) or {}
+                fresh = {snapshot_id: manifest for snapshot_id, manifest in snapshots.items()
+                         if snapshot_id not in seen}
+                if not fresh:
+                    return
+                try:
+                    items = self._download_snapshots(collection, fresh, since)
+                except Exception as e:
+                    print(f"[CloudSync] 读取压缩快照失败: {e}")
+                    return
+                seen.update(fresh)
+                if items:
+                    callback(self._latest_versions(items), "")
+
+            after = datetime.fromisoformat(since) if since else None
+            self.listeners[collection] = (
+                self.backend.listen_query(self._items_path(collection), after, on_items),
+                self.backend.listen_document(self._document_path(collection), on_parent))
+            return True
+        except Exception as e:
+            print(f"[CloudSync] 启动实时监听失败: {e}")
+            return False
 
     def stop_listener(self, collection: str):
-        listener = self.listeners.get(collection)
-        if listener:
+        for listener in self.listeners.pop(collection, ()):
             listener.unsubscribe()
-            del self.listeners[collection] 
\ No newline at end of file
+
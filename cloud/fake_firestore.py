@@ -0,0 +1,378 @@
+"""
+内存中的 Firestore 替身
+
+实现 CloudSync 用到的 Firestore 客户端接口子集，数据只保存在内存中，不联网也不需要证书，
+用于在没有 Firebase 项目的环境中验证同步逻辑（增量上传/下载、批量读写、实时监听）：
+
+- 集合/文档/子集合引用，``set(merge=...)``、``get(field_paths=...)``、``delete``
+- ``where``/``order_by``/``stream`` 查询
+- ``batch()`` 批量写入、``get_all`` 批量读取
+- ``SERVER_TIMESTAMP``：提交时替换为单调递增的 UTC 时间（包括嵌套在映射中的），
+  同一次提交中的文档时间相同；``DELETE_FIELD``：合并写入时删除字段
+- 查询和文档的 ``on_snapshot`` 监听：与真实客户端一样在后台线程中回调，先送达一次初始快照，
+  之后每次提交送达变化的文档（ADDED/MODIFIED/REMOVED）
+
+用法：
+    from cloud.fake_firestore import FakeFirestore
+    cloud = CloudSync(key_path, user_id, client=FakeFirestore())
+
+``latency`` 让每次网络往返先等待一段时间（在锁外等待，并发的请求互不阻塞），
+用来在本地估计真实网络下的同步耗时。
+"""
+
+import copy
+import queue
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from enum import Enum
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# 与 firestore.SERVER_TIMESTAMP 作用相同的占位值
+SERVER_TIMESTAMP = object()
+# 与 firestore.DELETE_FIELD 作用相同的占位值
+DELETE_FIELD = object()
+
+Path = Tuple[str, ...]
+
+_OPERATORS = {
+    '==': lambda a, b: a == b,
+    '!=': lambda a, b: a != b,
+    '<': lambda a, b: a < b,
+    '<=': lambda a, b: a <= b,
+    '>': lambda a, b: a > b,
+    '>=': lambda a, b: a >= b,
+}
+
+
+class ChangeType(Enum):
+    ADDED = 1
+    MODIFIED = 2
+    REMOVED = 3
+
+
+class DocumentSnapshot:
+    def __init__(self, reference: 'DocumentReference', data: Optional[dict],
+                 field_paths: Optional[List[str]] = None):
+        self.reference = reference
+        self.exists = data is not None
+        if data is not None and field_paths is not None:
+            data = {key: value for key, value in data.items() if key in field_paths}
+        self._data = data
+
+    @property
+    def id(self) -> str:
+        return self.reference.id
+
+    def to_dict(self) -> Optional[dict]:
+        return copy.deepcopy(self._data)
+
+    def get(self, field: str) -> Any:
+        return copy.deepcopy((self._data or {}).get(field))
+
+
+class DocumentChange:
+    def __init__(self, change_type: ChangeType, document: DocumentSnapshot):
+        self.type = change_type
+        self.document = document
+
+
+class Watch:
+    """on_snapshot 返回的监听句柄"""
+
+    def __init__(self, client: 'FakeFirestore', query: Any, callback: Callable):
+        self._client = client
+        self._query = query
+        self._callback = callback
+        self._matching: set = set()
+        self.active = True
+
+    def unsubscribe(self) -> None:
+        self.active = False
+        self._client._remove_watch(self)
+
+
+class Query:
+    def __init__(self, client: 'FakeFirestore', path: Path,
+                 filters: Tuple = (), order: Optional[str] = None, limit: Optional[int] = None):
+        self._client = client
+        self._path = path
+        self._filters = filters
+        self._order = order
+        self._limit = limit
+
+    def where(self, field: str, op: str, value: Any) -> 'Query':
+        return Query(self._client, self._path, self._filters + ((field, op, value),), self._order, self._limit)
+
+    def order_by(self, field: str, direction: Any = None) -> 'Query':
+        return Query(self._client, self._path, self._filters, field, self._limit)
+
+    def limit(self, count: int) -> 'Query':
+        return Query(self._client, self._path, self._filters, self._order, count)
+
+    def _matches(self, path: Path, data: dict) -> bool:
+        if path[:-1] != self._path:
+            return False
+        return all(field in data and _OPERATORS[op](data[field], value) for field, op, value in self._filters)
+
+    def _run(self) -> List[DocumentSnapshot]:
+        self._client._round_trip()
+        with self._client._lock:
+            found = [(path, data) for path, data in self._client._store.items() if self._matches(path, data)]
+            if self._order:
+                found.sort(key=lambda entry: entry[1][self._order])
+            if self._limit is not None:
+                found = found[:self._limit]
+            self._client._count(reads=len(found), bytes_read=sum(document_size(data) for _, data in found))
+            return [DocumentSnapshot(DocumentReference(self._client, path), data) for path, data in found]
+
+    def stream(self):
+        return iter(self._run())
+
+    def get(self) -> List[DocumentSnapshot]:
+        return self._run()
+
+    def on_snapshot(self, callback: Callable) -> Watch:
+        """callback(docs, changes, read_time) 在后台线程中调用"""
+        return self._client._add_watch(Watch(self._client, self, callback))
+
+
+class CollectionReference(Query):
+    def __init__(self, client: 'FakeFirestore', path: Path):
+        super().__init__(client, path)
+
+    @property
+    def id(self) -> str:
+        return self._path[-1]
+
+    def document(self, document_id: str) -> 'DocumentReference':
+        return DocumentReference(self._client, self._path + (document_id,))
+
+
+class DocumentReference:
+    def __init__(self, client: 'FakeFirestore', path: Path):
+        self._client = client
+        self._path = path
+
+    @property
+    def id(self) -> str:
+        return self._path[-1]
+
+    @property
+    def path(self) -> str:
+        return '/'.join(self._path)
+
+    def collection(self, name: str) -> CollectionReference:
+        return CollectionReference(self._client, self._path + (name,))
+
+    def set(self, data: dict, merge: bool = False) -> None:
+        self._client._commit([(self, data, merge)])
+
+    def delete(self) -> None:
+        self._client._commit([(self, None, False)])
+
+    def on_snapshot(self, callback: Callable) -> Watch:
+        """监听单个文档，callback(docs, changes, read_time) 在后台线程中调用"""
+        return self._client._add_watch(Watch(self._client, self, callback))
+
+    def _matches(self, path: Path, data: dict) -> bool:
+        return path == self._path
+
+    def get(self, field_paths: Optional[List[str]] = None) -> DocumentSnapshot:
+        self._client._round_trip()
+        with self._client._lock:
+            snapshot = DocumentSnapshot(self, self._client._store.get(self._path), field_paths)
+            self._client._count(reads=1, bytes_read=document_size(snapshot._data or {}))
+            return snapshot
+
+
+class WriteBatch:
+    def __init__(self, client: 'FakeFirestore'):
+        self._client = client
+        self._writes: List[Tuple[DocumentReference, Optional[dict], bool]] = []
+
+    def set(self, reference: DocumentReference, data: dict, merge: bool = False) -> None:
+        self._writes.append((reference, data, merge))
+
+    def delete(self, reference: DocumentReference) -> None:
+        self._writes.append((reference, None, False))
+
+    def commit(self) -> None:
+        self._client._commit(self._writes)
+        self._writes = []
+
+
+class FakeFirestore:
+    """内存中的 Firestore 客户端
+
+    stats 记录网络往返（round_trips）、提交（commits）、读取和写入的文档数，
+    以及读取和写入的数据量（按 document_size 估算的字节数），可用来比较不同同步策略的开销。
+
+    Args:
+        latency: 每次网络往返的模拟延迟（秒）
+    """
+
+    SERVER_TIMESTAMP = SERVER_TIMESTAMP
+    DELETE_FIELD = DELETE_FIELD
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self._store: Dict[Path, dict] = {}
+        self._lock = threading.RLock()
+        self._last_timestamp = datetime.min.replace(tzinfo=timezone.utc)
+        self._watches: List[Watch] = []
+        self._events: "queue.Queue[Tuple[Watch, List, List, datetime]]" = queue.Queue()
+        self._dispatcher: Optional[threading.Thread] = None
+        self.stats = {'round_trips': 0, 'commits': 0, 'reads': 0, 'writes': 0,
+                      'bytes_read': 0, 'bytes_written': 0}
+
+    def collection(self, name: str) -> CollectionReference:
+        return CollectionReference(self, (name,))
+
+    def batch(self) -> WriteBatch:
+        return WriteBatch(self)
+
+    def get_all(self, references: List[DocumentReference],
+                field_paths: Optional[List[str]] = None) -> List[DocumentSnapshot]:
+        self._round_trip()
+        with self._lock:
+            snapshots = [DocumentSnapshot(ref, self._store.get(ref._path), field_paths) for ref in references]
+            self._count(reads=len(references),
+                        bytes_read=sum(document_size(snapshot._data or {}) for snapshot in snapshots))
+            return snapshots
+
+    def reset_stats(self) -> Dict[str, int]:
+        """清零统计并返回清零前的值"""
+        with self._lock:
+            stats, self.stats = self.stats, dict.fromkeys(self.stats, 0)
+            return stats
+
+    def _count(self, **counts: int) -> None:
+        for key, value in counts.items():
+            self.stats[key] += value
+
+    def _round_trip(self) -> None:
+        """一次网络往返：计数并等待模拟延迟（不持有锁）"""
+        with self._lock:
+            self._count(round_trips=1)
+        if self.latency:
+            time.sleep(self.latency)
+
+    def _server_time(self) -> datetime:
+        now = datetime.now(timezone.utc)
+        if now <= self._last_timestamp:
+            now = self._last_timestamp + timedelta(microseconds=1)
+        self._last_timestamp = now
+        return now
+
+    def _commit(self, writes: List[Tuple[DocumentReference, Optional[dict], bool]]) -> None:
+        self._round_trip()
+        with self._lock:
+            self._count(commits=1, writes=len(writes),
+                        bytes_written=sum(document_size(data) for _, data, _ in writes if data))
+            timestamp = self._server_time()
+            changed = []
+            for reference, data, merge in writes:
+                if data is None:
+                    self._store.pop(reference._path, None)
+                else:
+                    self._store[reference._path] = _apply(
+                        self._store.get(reference._path, {}) if merge else {}, data, timestamp)
+                changed.append(reference._path)
+            for watch in self._watches:
+                self._notify(watch, changed, timestamp)
+
+    def _notify(self, watch: Watch, paths: List[Path], read_time: datetime) -> None:
+        """把 paths 中与监听查询相关的变化排队送给监听器（调用方持有锁）"""
+        changes = []
+        for path in paths:
+            data = self._store.get(path)
+            reference = DocumentReference(self, path)
+            if data is not None and watch._query._matches(path, data):
+                change_type = ChangeType.MODIFIED if path in watch._matching else ChangeType.ADDED
+                watch._matching.add(path)
+                changes.append(DocumentChange(change_type, DocumentSnapshot(reference, data)))
+            elif path in watch._matching:
+                watch._matching.discard(path)
+                changes.append(DocumentChange(ChangeType.REMOVED, DocumentSnapshot(reference, data)))
+        if changes:
+            docs = [DocumentSnapshot(DocumentReference(self, path), self._store[path])
+                    for path in sorted(watch._matching)]
+            self._events.put((watch, docs, changes, read_time))
+
+    def _add_watch(self, watch: Watch) -> Watch:
+        with self._lock:
+            self._watches.append(watch)
+            self._ensure_dispatcher()
+            initial = [path for path, data in self._store.items() if watch._query._matches(path, data)]
+            watch._matching.clear()
+            self._notify(watch, initial, self._server_time())
+            if not initial:
+                self._events.put((watch, [], [], self._last_timestamp))
+        return watch
+
+    def _ensure_dispatcher(self) -> None:
+        if self._dispatcher is None:
+            self._dispatcher = threading.Thread(target=self._dispatch, name='FakeFirestoreWatch', daemon=True)
+            self._dispatcher.start()
+
+    def _remove_watch(self, watch: Watch) -> None:
+        with self._lock:
+            if watch in self._watches:
+                self._watches.remove(watch)
+
+    def _dispatch(self) -> None:
+        while True:
+            watch, docs, changes, read_time = self._events.get()
+            if watch.active:
+                try:
+                    watch._callback(docs, changes, read_time)
+                except Exception as e:
+                    print(f"[FakeFirestore] 监听回调异常: {e}")
+
+    def wait_idle(self, timeout: float = 5.0) -> bool:
+        """等待已排队的监听回调全部执行完（测试用）"""
+        done = threading.Event()
+        with self._lock:
+            self._ensure_dispatcher()
+        self._events.put((_Marker(done), [], [], self._last_timestamp))
+        return done.wait(timeout)
+
+
+def _apply(current: dict, data: dict, timestamp: datetime) -> dict:
+    """把一次写入应用到文档上：替换时间占位值、删除 DELETE_FIELD 字段、嵌套映射逐层合并"""
+    result = dict(current)
+    for key, value in data.items():
+        if value is DELETE_FIELD:
+            result.pop(key, None)
+        elif value is SERVER_TIMESTAMP:
+            result[key] = timestamp
+        elif isinstance(value, dict):
+            result[key] = _apply(current.get(key) if isinstance(current.get(key), dict) else {}, value, timestamp)
+        else:
+            result[key] = copy.deepcopy(value)
+    return result
+
+
+def document_size(data: Any) -> int:
+    """按 Firestore 的存储大小规则估算数据量（字节）：字符串为 UTF-8 字节数加 1，
+    数字和时间为 8，布尔和空值为 1，bytes 为其长度，映射为字段名（加 1）与值之和"""
+    if isinstance(data, dict):
+        return sum(len(key.encode('utf-8')) + 1 + document_size(value) for key, value in data.items())
+    if isinstance(data, (list, tuple)):
+        return sum(document_size(value) for value in data)
+    if isinstance(data, str):
+        return len(data.encode('utf-8')) + 1
+    if isinstance(data, (bytes, bytearray)):
+        return len(data)
+    if data is None or isinstance(data, bool):
+        return 1
+    return 8
+
+
+class _Marker:
+    """wait_idle 放进回调队列的标记"""
+
+    def __init__(self, done: threading.Event):
+        self.active = True
+        self._callback = lambda *args: done.set()
@@ -0,0 +1,80 @@
+"""
+实时双向同步模块（可选）
+
+- 云端 → 本地：每个模型在 items 子集合上启动 Firestore 快照监听，监听线程中完成解码和
+  按 updated_at 的筛选，结果排队回到 GUI 线程后按 id 合并，只通知受影响的行；
+  删除以 deleted 删除标记的形式到达，同样按 updated_at 以后写入者为准
+- 本地 → 云端：模型发出 local_changed 后等待一小段时间（合并连续的编辑），
+  再把该模型的增量上传交给 SyncWorker 在后台执行
+
+本机上传的文档也会被自己的监听器收到，它们的 updated_at 与本地相同，合并时被忽略。
+"""
+
+from typing import List
+
+from PySide6.QtCore import QObject, QTimer
+
+from cloud.sync_worker import SyncWorker
+
+
+class LiveSync(QObject):
+    """管理一组模型的实时同步
+
+    Args:
+        sync_worker: 执行上传的后台工作器
+        models: 参与实时同步的模型（BaseModel）
+        upload_delay_ms: 本地修改后等待多久再上传（毫秒）
+    """
+
+    def __init__(self, sync_worker: SyncWorker, models: List, upload_delay_ms: int = 2000, parent=None):
+        super().__init__(parent)
+        self._sync_worker = sync_worker
+        self._models = list(models)
+        self._dirty: List = []
+        self._running = False
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(upload_delay_ms)
+        self._timer.timeout.connect(self._upload_dirty)
+        for model in self._models:
+            model.local_changed.connect(lambda model=model: self._on_local_changed(model))
+
+    @property
+    def running(self) -> bool:
+        return self._running
+
+    def start(self) -> bool:
+        """启动全部模型的云端监听
+
+        Returns:
+            是否全部启动成功（失败的模型只打印错误，不影响其他模型）
+        """
+        results = [model.start_live_sync() for model in self._models]
+        self._running = any(results)
+        if self._running:
+            print(f"[LiveSync] 实时同步已启动: {sum(results)}/{len(results)} 个集合")
+        return all(results)
+
+    def stop(self, upload_pending: bool = False):
+        """停止监听；upload_pending 为 True 时立即提交尚未上传的本地修改
+
+        未提交的修改不会丢失：它们的 updated_at 晚于上传水位，下次上传时会被选中。
+        """
+        for model in self._models:
+            model.stop_live_sync()
+        if upload_pending and self._timer.isActive():
+            self._timer.stop()
+            self._upload_dirty()
+        self._running = False
+
+    def _on_local_changed(self, model):
+        if not self._running:
+            return
+        if model not in self._dirty:
+            self._dirty.append(model)
+        self._timer.start()
+
+    def _upload_dirty(self):
+        dirty, self._dirty = self._dirty, []
+        for model in dirty:
+            self._sync_worker.request(model.upload_job())
@@ -0,0 +1,90 @@
+"""
+全部集合批量同步模块
+
+逐个模型同步时，待办事项、时间记录和计时数据各自至少一次网络往返。
+SyncAll 把所有模型的变更收集到一起：
+
+- 上传：各模型在 GUI 线程中捕获变更，工作线程把它们转成写入操作后合并为一组批量写入
+  （每 BATCH_LIMIT 个操作一个批次），大多数情况下只有一次往返
+- 下载：一次 get_all 批量读取全部集合文档，只对自上次下载以来有变更的集合查询项目，
+  计时数据直接使用读到的整个文档
+
+各模型 upload_job()/download_job() 的 prepare 和 finish 照常使用，只替换中间的网络部分，
+因此水位推进、删除标记清理和结果合并与单独同步完全一致。
+"""
+
+from typing import List
+
+from cloud.cloud_sync import CloudSync
+from cloud.sync_worker import SyncJob, SyncToken
+
+# 下载时云端不存在的集合的结果，不交给模型的 finish
+_NOTHING = object()
+
+
+class SyncAll:
+    """一次同步全部模型
+
+    Args:
+        cloud: 所有模型共用的 CloudSync
+        models: 参与同步的模型，需要提供 upload_job()/download_job()、_upload_writes()、
+            _run_download() 和 _collection_name（BaseModel、TimerModel）
+    """
+
+    UPLOAD = 'all:upload'
+    DOWNLOAD = 'all:download'
+
+    def __init__(self, cloud: CloudSync, models: List):
+        self._cloud = cloud
+        self._models = list(models)
+
+    def upload_job(self) -> SyncJob:
+        jobs = [model.upload_job() for model in self._models]
+
+        def prepare():
+            return [job.prepare() for job in jobs]
+
+        def run(prepared: list, token: SyncToken = None) -> bool:
+            writes = []
+            for model, model_prepared in zip(self._models, prepared):
+                writes.extend(model._upload_writes(model_prepared))
+            if not writes:
+                print("[SyncAll] 没有需要上传的变更")
+                return True
+            ok = self._cloud.commit_writes(writes, token)
+            if ok:
+                print(f"[SyncAll] 批量上传 {len(self._models)} 个集合，共 {len(writes)} 个写入")
+            return ok
+
+        def finish(prepared: list, ok: bool) -> bool:
+            results = [job.finish(model_prepared, ok) for job, model_prepared in zip(jobs, prepared)]
+            return all(results)
+
+        return SyncJob(self.UPLOAD, prepare, run, finish)
+
+    def download_job(self) -> SyncJob:
+        jobs = [model.download_job() for model in self._models]
+
+        def prepare():
+            return [job.prepare() for job in jobs]
+
+        def run(prepared: list, token: SyncToken = None) -> list:
+            snapshots = self._cloud.get_documents([model._collection_name for model in self._models])
+            if snapshots is None:
+                return [None] * len(self._models)
+            results = []
+            for model, model_prepared in zip(self._models, prepared):
+                if token and token.is_cancelled():
+                    break
+                snapshot = snapshots[model._collection_name]
+                # 云端还没有这个集合：没有可下载的内容，不算失败
+                results.append(model._run_download(model_prepared, token, snapshot=snapshot)
+                               if snapshot.exists else _NOTHING)
+            return results
+
+        def finish(prepared: list, results: list) -> bool:
+            results = [job.finish(model_prepared, result)
+                       for job, model_prepared, result in zip(jobs, prepared, results) if result is not _NOTHING]
+            return all(results)
+
+        return SyncJob(self.DOWNLOAD, prepare, run, finish)
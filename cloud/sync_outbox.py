@@ -0,0 +1,164 @@
+"""
+离线同步队列模块
+
+同步失败（断网、服务不可用）或退出时被取消的请求记录到本地的 ``data/sync_outbox.json``，
+按指数退避加随机抖动自动重试，应用重启后继续重试。任何一次同步成功都说明网络已经恢复，
+此时立即重试队列中的全部请求。
+
+队列中只保存请求名（如 ``todo_events:upload``），不保存数据：增量同步失败时不会推进水位，
+重试时才按水位挑选变更，同一集合的多次修改自然合并为每个项目的最新版本和删除标记，
+长时间离线后重新连接也只发送最少的数据。同名请求在队列中只保留一条，
+``all:upload`` 这类全集合请求会吸收它所覆盖的单集合请求。
+"""
+
+import json
+import os
+import random
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Iterable
+
+from PySide6.QtCore import QObject, QTimer
+
+from cloud.sync_worker import SyncJob, SyncWorker
+from model.storage import background_writer
+
+CANCELLED_MESSAGE = "已取消"
+
+
+class SyncOutbox(QObject):
+    """持久化的同步重试队列
+
+    Args:
+        sync_worker: 执行同步请求的后台工作器（监听它的 sync_finished）
+        path: 队列文件路径
+        base_delay: 第一次重试前的等待秒数，之后每次失败翻倍
+        max_delay: 等待秒数的上限
+    """
+
+    def __init__(self, sync_worker: SyncWorker, path: str,
+                 base_delay: float = 5.0, max_delay: float = 30 * 60, parent=None):
+        super().__init__(parent)
+        self._sync_worker = sync_worker
+        self._path = path
+        self._base_delay = base_delay
+        self._max_delay = max_delay
+        self._factories: Dict[str, Callable[[], SyncJob]] = {}
+        self._covers: Dict[str, set] = {}
+        # 请求名 -> {attempts, next_attempt, last_error}
+        self._pending: "OrderedDict[str, dict]" = OrderedDict()
+        self._in_flight: set = set()
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.timeout.connect(self._replay_due)
+        self._sync_worker.sync_finished.connect(self._on_sync_finished)
+
+    def register(self, job_factory: Callable[[], SyncJob], covers: Iterable[str] = ()) -> None:
+        """登记一种可重试的请求
+
+        Args:
+            job_factory: 返回 SyncJob 的函数（如 model.upload_job），请求名取自它创建的任务
+            covers: 该请求同时完成的其他请求名，排队时吸收这些请求
+        """
+        name = job_factory().name
+        self._factories[name] = job_factory
+        self._covers[name] = set(covers)
+
+    def start(self) -> None:
+        """读取上次退出时未完成的请求并安排重试"""
+        try:
+            with open(self._path, 'r', encoding='utf-8') as f:
+                operations = json.load(f).get('operations', [])
+        except (FileNotFoundError, json.JSONDecodeError):
+            operations = []
+        for operation in operations:
+            if operation.get('name') in self._factories:
+                self._pending[operation['name']] = {
+                    'attempts': operation.get('attempts', 0),
+                    'next_attempt': time.time(),
+                    'last_error': operation.get('last_error', ""),
+                }
+        if self._pending:
+            print(f"[SyncOutbox] 待重试的同步请求: {', '.join(self._pending)}")
+        self._schedule()
+
+    @property
+    def pending(self) -> Dict[str, dict]:
+        """排队中的请求（请求名 -> 重试次数、下次重试时间、最后一次错误）"""
+        return {name: dict(entry) for name, entry in self._pending.items()}
+
+    def shutdown(self) -> None:
+        """退出时取消工作器中的请求，并把仍在执行或排队的可重试请求记入队列，下次启动后继续"""
+        self._timer.stop()
+        running = self._sync_worker.running
+        self._sync_worker.cancel()
+        if running in self._factories:
+            self._enqueue(running, CANCELLED_MESSAGE, count_attempt=False)
+
+    def retry_now(self) -> None:
+        """立即重试全部排队的请求"""
+        now = time.time()
+        for entry in self._pending.values():
+            entry['next_attempt'] = now
+        self._replay_due()
+
+    def backoff(self, attempts: int) -> float:
+        """第 attempts 次失败后的等待秒数：指数增长到上限，再在后一半区间内随机抖动"""
+        delay = min(self._max_delay, self._base_delay * (2 ** max(attempts - 1, 0)))
+        return delay / 2 + random.uniform(0, delay / 2)
+
+    def _on_sync_finished(self, name: str, ok: bool, message: str):
+        if name not in self._factories:
+            return
+        self._in_flight.discard(name)
+        if ok:
+            done = {name} | self._covers[name]
+            removed = [pending for pending in self._pending if pending in done]
+            for pending in removed:
+                del self._pending[pending]
+            if removed:
+                self._save()
+            # 同步成功说明网络已恢复，其余请求不再等待退避
+            if self._pending:
+                self.retry_now()
+            return
+        self._enqueue(name, message, count_attempt=message != CANCELLED_MESSAGE)
+
+    def _enqueue(self, name: str, error: str, count_attempt: bool):
+        if any(name in self._covers[other] for other in self._pending):
+            return
+        for covered in self._covers[name]:
+            self._pending.pop(covered, None)
+        entry = self._pending.setdefault(name, {'attempts': 0, 'next_attempt': 0.0, 'last_error': ""})
+        if count_attempt:
+            entry['attempts'] += 1
+            entry['next_attempt'] = time.time() + self.backoff(entry['attempts'])
+        else:
+            entry['next_attempt'] = time.time()
+        entry['last_error'] = error
+        wait = max(0.0, entry['next_attempt'] - time.time())
+        print(f"[SyncOutbox] {name} 未完成（{error}），{wait:.0f} 秒后重试")
+        self._save()
+        self._schedule()
+
+    def _replay_due(self):
+        now = time.time()
+        for name, entry in list(self._pending.items()):
+            if entry['next_attempt'] <= now and name not in self._in_flight:
+                self._in_flight.add(name)
+                self._sync_worker.request(self._factories[name]())
+        self._schedule()
+
+    def _schedule(self):
+        waiting = [entry['next_attempt'] for name, entry in self._pending.items() if name not in self._in_flight]
+        if not waiting:
+            self._timer.stop()
+            return
+        self._timer.start(int(max(0.0, min(waiting) - time.time()) * 1000))
+
+    def _save(self):
+        operations = [{'name': name, 'attempts': entry['attempts'], 'last_error': entry['last_error']}
+                      for name, entry in self._pending.items()]
+        os.makedirs(os.path.dirname(self._path) or '.', exist_ok=True)
+        background_writer.submit(
+            self._path, lambda: json.dumps({'operations': operations}, ensure_ascii=False).encode('utf-8'))
@@ -0,0 +1,72 @@
+"""
+增量同步状态模块
+
+记录一个集合与云端增量同步的进度，保存在 ``data/<集合名>.syncstate.json``：
+
+- upload_watermark：上次成功上传开始时的本地时间，updated_at 不早于它的项目需要上传
+- download_watermark：已下载文档中最大的服务器时间 synced_at，下次只查询更新的文档
+- tombstones：本地删除、尚未上传的项目 id -> 删除时间
+- content_hash：整集合文档同步的集合（计时数据）上次上传或下载时的内容哈希
+"""
+
+import json
+import os
+from typing import Dict, Iterable
+
+from model.storage import background_writer
+from model.storage.schema import utc_timestamp
+
+
+class SyncState:
+    """单个集合的增量同步状态
+
+    Args:
+        path: 状态文件路径
+    """
+
+    def __init__(self, path: str):
+        self._path = path
+        self.upload_watermark = ""
+        self.download_watermark = ""
+        self.tombstones: Dict[str, str] = {}
+        self.content_hash = ""
+        self._load()
+
+    def _load(self):
+        try:
+            with open(self._path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return
+        self.upload_watermark = data.get('upload_watermark', "")
+        self.download_watermark = data.get('download_watermark', "")
+        self.tombstones = data.get('tombstones', {})
+        self.content_hash = data.get('content_hash', "")
+
+    def save(self):
+        """交给后台写入器保存"""
+        data = {
+            'upload_watermark': self.upload_watermark,
+            'download_watermark': self.download_watermark,
+            'tombstones': dict(self.tombstones),
+            'content_hash': self.content_hash,
+        }
+        os.makedirs(os.path.dirname(self._path) or '.', exist_ok=True)
+        background_writer.submit(self._path, lambda: json.dumps(data, ensure_ascii=False).encode('utf-8'))
+
+    def record_deletion(self, item_id: str):
+        """记录一次本地删除，下次上传时写入云端的删除标记"""
+        self.tombstones[item_id] = utc_timestamp()
+        self.save()
+
+    def uploaded(self, started_at: str, item_ids: Iterable[str]):
+        """上传成功后推进上传水位，并清除已经上传的删除标记
+
+        Args:
+            started_at: 本次上传开始（挑选项目）时的时间戳
+            item_ids: 已作为删除标记上传的项目 id
+        """
+        self.upload_watermark = started_at
+        for item_id in item_ids:
+            self.tombstones.pop(item_id, None)
+        self.save()
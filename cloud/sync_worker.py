@@ -0,0 +1,164 @@
+"""
+后台云同步模块
+
+把上传/下载的网络往返移出 GUI 线程。每个同步操作拆成三段：
+
+- prepare：在 GUI 线程中捕获要发送的数据（模型只在 GUI 线程中读写）
+- run：在线程池中执行网络请求
+- finish：回到 GUI 线程，一次性把结果应用到模型
+
+请求按顺序逐个执行；同名请求在排队期间重复提交只保留一个。
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Optional, Tuple
+
+from PySide6.QtCore import QObject, QRunnable, QThreadPool, Signal
+
+
+class SyncToken:
+    """传给 run 的取消标记和进度回报接口（可在工作线程中调用）"""
+
+    def __init__(self, report: Callable[[int, int], None]):
+        self._cancelled = threading.Event()
+        self._report = report
+
+    def cancel(self) -> None:
+        self._cancelled.set()
+
+    def is_cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+    def report(self, done: int, total: int) -> None:
+        """回报进度，total 为 0 表示总量未知"""
+        self._report(done, total)
+
+
+class SyncJob:
+    """一次同步操作
+
+    Args:
+        name: 请求名（如 "todo_events:upload"），同名请求排队时会被合并
+        prepare: GUI 线程中调用，返回交给 run 的数据
+        run: 工作线程中调用 run(prepared, token)，返回网络请求的结果
+        finish: GUI 线程中调用 finish(prepared, result)，应用结果并返回是否成功
+    """
+
+    def __init__(self, name: str, prepare: Callable[[], Any],
+                 run: Callable[[Any, SyncToken], Any],
+                 finish: Callable[[Any, Any], bool]):
+        self.name = name
+        self.prepare = prepare
+        self.run = run
+        self.finish = finish
+
+
+class _Task(QRunnable):
+    def __init__(self, fn: Callable[[], None]):
+        super().__init__()
+        self._fn = fn
+
+    def run(self):
+        self._fn()
+
+
+class SyncWorker(QObject):
+    """串行执行同步请求的后台工作器
+
+    Signals:
+        sync_started(name): 请求开始执行
+        sync_progress(name, done, total): 执行进度（total 为 0 表示总量未知）
+        sync_finished(name, ok, message): 请求结束（成功、失败或被取消）
+        idle(): 队列全部执行完毕
+    """
+    sync_started = Signal(str)
+    sync_progress = Signal(str, int, int)
+    sync_finished = Signal(str, bool, str)
+    idle = Signal()
+    # 内部信号：工作线程把结果排队送回 GUI 线程
+    _run_done = Signal(object, object, object)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._pool = QThreadPool(self)
+        self._pool.setMaxThreadCount(1)
+        self._pending: "OrderedDict[str, SyncJob]" = OrderedDict()
+        self._running: Optional[Tuple[SyncJob, Any, SyncToken]] = None
+        self.coalesced = 0
+        self._run_done.connect(self._on_run_done)
+
+    @property
+    def running(self) -> Optional[str]:
+        """正在执行的请求名，空闲时为 None"""
+        return self._running[0].name if self._running else None
+
+    @property
+    def busy(self) -> bool:
+        return self._running is not None or bool(self._pending)
+
+    def request(self, job: SyncJob) -> bool:
+        """提交同步请求
+
+        Returns:
+            False 表示同名请求已在排队，本次请求被合并
+        """
+        if job.name in self._pending:
+            self.coalesced += 1
+            return False
+        self._pending[job.name] = job
+        self._start_next()
+        return True
+
+    def cancel(self, name: Optional[str] = None) -> None:
+        """取消排队中的请求，并丢弃正在执行的请求的结果
+
+        已经发出的网络请求无法中断：上传在批次之间检查取消标记，
+        被取消的请求不会推进同步水位，下次同步会重新发送。
+
+        Args:
+            name: 只取消该名称的请求，None 表示全部
+        """
+        for pending in [n for n in self._pending if name in (None, n)]:
+            del self._pending[pending]
+            self.sync_finished.emit(pending, False, "已取消")
+        if self._running and name in (None, self._running[0].name):
+            self._running[2].cancel()
+        elif not self.busy:
+            self.idle.emit()
+
+    def _start_next(self):
+        while self._running is None and self._pending:
+            name, job = self._pending.popitem(last=False)
+            try:
+                prepared = job.prepare()
+            except Exception as e:
+                self.sync_finished.emit(name, False, f"准备同步数据失败: {e}")
+                continue
+            token = SyncToken(lambda done, total, name=name: self.sync_progress.emit(name, done, total))
+            self._running = (job, prepared, token)
+            self.sync_started.emit(name)
+            self._pool.start(_Task(lambda: self._run(job, prepared, token)))
+        if not self.busy:
+            self.idle.emit()
+
+    def _run(self, job: SyncJob, prepared: Any, token: SyncToken):
+        try:
+            self._run_done.emit(token, job.run(prepared, token), None)
+        except Exception as e:
+            self._run_done.emit(token, None, e)
+
+    def _on_run_done(self, token: SyncToken, result: Any, error: Optional[Exception]):
+        job, prepared, _ = self._running
+        self._running = None
+        if token.is_cancelled():
+            self.sync_finished.emit(job.name, False, "已取消")
+        elif error is not None:
+            self.sync_finished.emit(job.name, False, f"同步异常: {error}")
+        else:
+            try:
+                ok = job.finish(prepared, result)
+                self.sync_finished.emit(job.name, ok, "完成" if ok else "失败")
+            except Exception as e:
+                self.sync_finished.emit(job.name, False, f"应用同步结果失败: {e}")
+        self._start_next()
@@ -1,29 +1,104 @@
+from typing import Dict, Tuple
+
+from PySide6.QtCore import QObject, QRunnable, QThreadPool, QTimer, Signal
+
 from model.todo_model import TodoModel, TodoItem
 from utils.ai_service import GeminiService
 from utils.ai_converter import AIConverter
+from utils.item_factory import ItemFactory
+
+# AI 解析结果更新占位项目时替换的字段（完成状态等用户可能已经修改的字段保持不变）
+AI_FIELDS = ('description', 'priority', 'category', 'deadline', 'consume_time')
+
+
+class _Task(QRunnable):
+    def __init__(self, fn):
+        super().__init__()
+        self._fn = fn
+
+    def run(self):
+        self._fn()
+
+
+class AIParseHandler(QObject):
+    """AI 解析控制器
+
+    输入后立即按本地规则添加一个占位项目，Gemini 请求在线程池中执行，不阻塞界面：
+    结果在超时前返回时就地更新占位项目（只通知该行的 dataChanged）；
+    请求失败、超时、被取消或占位项目已被删除时，保留本地解析的结果。
+    """
+    # AI 请求的超时时间（毫秒），超时后到达的结果被丢弃
+    timeout_ms = 8000
+    # 内部信号：工作线程把 (请求号, 解析出的项目, 异常) 排队送回 GUI 线程
+    _parsed = Signal(int, object, object)
 
-class AIParseHandler:
-    def __init__(self, model: TodoModel, ai_service: GeminiService):
+    def __init__(self, model: TodoModel, ai_service: GeminiService, parent=None):
+        super().__init__(parent)
         self._model = model
         self._ai_service = ai_service
+        self._pool = QThreadPool(self)
+        self._pool.setMaxThreadCount(2)
+        # 请求号 -> (占位项目 id, 超时定时器)；请求结束（返回、超时或取消）时删除定时器
+        self._pending: Dict[int, Tuple[str, QTimer]] = {}
+        self._next_request = 0
+        self._parsed.connect(self._on_parsed)
+
+    @property
+    def pending(self) -> int:
+        """尚未返回的 AI 请求数"""
+        return len(self._pending)
 
     def parse_item(self, text: str):
+        placeholder = ItemFactory.create_from_clean_text(text)
+        self._model.add_item(placeholder)
         if not self._ai_service or not self._ai_service.is_available():
-            self._fallback_add_item(text)
             return
+        request = self._next_request
+        self._next_request += 1
+        timer = QTimer(self)
+        timer.setSingleShot(True)
+        timer.timeout.connect(lambda: self._expire(request))
+        self._pending[request] = (placeholder.id, timer)
+        timer.start(self.timeout_ms)
+        self._pool.start(_Task(lambda: self._run(request, text)))
+
+    def cancel(self):
+        """放弃所有尚未返回的 AI 请求，占位项目保持本地解析的结果"""
+        for _, timer in self._pending.values():
+            self._discard_timer(timer)
+        self._pending.clear()
+
+    def _run(self, request: int, text: str):
+        """工作线程：请求 Gemini 并转换为 TodoItem"""
         try:
-            ai_result = self._ai_service.parse_todo_text(text)
-            todo_item = AIConverter.convert_ai_to_todo_item(ai_result)
-            self._model.add_item(todo_item)
+            ai_result = self._ai_service.parse_todo_text(text, fallback=False)
+            self._parsed.emit(request, AIConverter.convert_ai_to_todo_item(ai_result), None)
         except Exception as e:
-            print(f"AI 解析失败，回退到普通解析: {e}")
-            self._fallback_add_item(text)
-
-    def _fallback_add_item(self, text: str):
-        # This is a simplified version of the original add_item logic.
-        # A more robust solution would be to have a shared utility for this.
-        from utils.data_converter import DataConverter
-        deadline, clean_text = DataConverter.convert_text_to_date(text)
-        priority, clean_text = DataConverter.convert_text_to_priority(clean_text)
-        item = TodoItem(description=clean_text, deadline=deadline, priority=priority)
-        self._model.add_item(item)
+            self._parsed.emit(request, None, e)
+
+    @staticmethod
+    def _discard_timer(timer: QTimer):
+        timer.stop()
+        timer.deleteLater()
+
+    def _expire(self, request: int):
+        entry = self._pending.pop(request, None)
+        if entry is not None:
+            self._discard_timer(entry[1])
+            print(f"AI 解析超时（{self.timeout_ms} ms），保留本地解析结果")
+
+    def _on_parsed(self, request: int, item: TodoItem, error: Exception):
+        """GUI 线程：用 AI 解析结果更新占位项目"""
+        entry = self._pending.pop(request, None)
+        if entry is None:
+            return
+        item_id, timer = entry
+        self._discard_timer(timer)
+        if error is not None:
+            print(f"AI 解析失败，保留本地解析结果: {error}")
+            return
+        fields = {name: getattr(item, name) for name in AI_FIELDS}
+        if not item.consume_time:
+            del fields['consume_time']
+        if not self._model.update_item(item_id, **fields):
+            print("AI 解析完成时占位项目已被删除，忽略结果")
@@ -16,7 +16,8 @@ from .dialog_manager import DialogManager
 
 class AppController(QObject):
     """应用程序的主控制器"""
-    def __init__(self, model: TodoModel, view: MainWindow, parent=None):
+    def __init__(self, model: TodoModel, view: MainWindow, parent=None, timer_model=None, sync_worker=None,
+                 sync_all=None):
         super().__init__(parent)
         self._model = model
         self._view = view
@@ -26,8 +27,8 @@ class AppController(QObject):
         self._save_timer.setSingleShot(True)
         self._save_timer.timeout.connect(self._delayed_save)
         
-        # 初始化计时器控制器
-        self._timer_controller = TimerController()
+        # 初始化计时器控制器（计时模型由服务注册表提供，与主窗口共享 EventModel）
+        self._timer_controller = TimerController(model=timer_model, sync_worker=sync_worker)
         
         # 将Timer按钮集成到主界面
         self._integrate_timer_button()
@@ -39,8 +40,8 @@ class AppController(QObject):
             print(f"AI 服务初始化失败: {e}")
             self._ai_service = None
         
-        self._ai_parse_handler = AIParseHandler(self._model, self._ai_service)
-        self._cloud_sync_handler = CloudSyncHandler(self._model)
+        self._ai_parse_handler = AIParseHandler(self._model, self._ai_service, parent=self)
+        self._cloud_sync_handler = CloudSyncHandler(self._model, sync_worker, sync_all)
         self._dialog_manager = DialogManager(self._view)
         self._connect_signals()
 
@@ -97,6 +98,13 @@ class AppController(QObject):
                 except:
                     pass
             
+            if getattr(self._view, 'archive_list_view', None):
+                try:
+                    self._view.archive_list_view.delete_item_requested.disconnect(self.confirm_delete_item)
+                    self._view.archive_list_view.show_info_requested.disconnect(self.show_item_info)
+                except:
+                    pass
+            
             # 连接当前活动视图的信号
             current_view = self._view.get_list_view()
             if current_view:
@@ -193,12 +201,10 @@ class AppController(QObject):
             elif item.item_type == "record":
                 # 删除时间记录
                 if hasattr(current_view, 'event_model'):
-                    row = index.row()
+                    # 列表按时间排序显示，行号需要映射回 EventModel；删除信号由代理模型同步到列表
+                    row = current_view.event_list_model.source_row(index)
                     if current_view.event_model.delete_event(row):
                         print(f"✅ [删除调试] 时间记录删除成功")
-                        # 刷新EventListView显示
-                        if hasattr(current_view, 'time_model'):
-                            current_view.time_model.refresh()
                     else:
                         print(f"❌ [删除调试] 时间记录删除失败")
                 else:
@@ -1,29 +1,40 @@
 from model.todo_model import TodoModel
+from cloud.sync_all import SyncAll
+from cloud.sync_worker import SyncWorker
 
 class CloudSyncHandler:
-    def __init__(self, model: TodoModel):
-        self._model = model
+    def __init__(self, model: TodoModel, sync_worker: SyncWorker = None, sync_all: SyncAll = None):
+        # 提供 sync_all 时上传/下载全部集合（合并为批量写入和一次批量读取），否则只同步 model
+        self._model = sync_all or model
+        # 同步请求交给后台工作器执行，网络往返不阻塞界面；结果通过 sync_finished 回到 GUI 线程
+        self._sync_worker = sync_worker or SyncWorker()
+        self._upload_job_name = self._model.upload_job().name
+        self._download_job_name = self._model.download_job().name
+        self._sync_worker.sync_finished.connect(self._on_sync_finished)
 
     def handle_upload_request(self):
         """处理上传到云端的请求"""
-        print("🔄 [云同步] 开始上传数据到云端...")
-        try:
-            success = self._model.sync_upload()
-            if success:
-                print("✅ [云同步] 上传成功！数据已同步到云端")
-            else:
-                print("❌ [云同步] 上传失败！请检查网络连接或配置")
-        except Exception as e:
-            print(f"❌ [云同步] 上传异常: {e}")
+        if self._sync_worker.request(self._model.upload_job()):
+            print("🔄 [云同步] 开始上传数据到云端...")
+        else:
+            print("⏳ [云同步] 上传已在排队，忽略重复请求")
 
     def handle_download_request(self):
         """处理从云端下载的请求"""
-        print("🔄 [云同步] 开始从云端下载数据...")
-        try:
-            success = self._model.sync_download()
+        if self._sync_worker.request(self._model.download_job()):
+            print("🔄 [云同步] 开始从云端下载数据...")
+        else:
+            print("⏳ [云同步] 下载已在排队，忽略重复请求")
+
+    def _on_sync_finished(self, name: str, success: bool, message: str):
+        """后台同步结束（在 GUI 线程中调用，下载的变更此时已合并进模型）"""
+        if name == self._upload_job_name:
+            if success:
+                print("✅ [云同步] 上传成功！数据已同步到云端")
+            else:
+                print(f"❌ [云同步] 上传失败（{message}）！请检查网络连接或配置")
+        elif name == self._download_job_name:
             if success:
                 print("✅ [云同步] 下载成功！本地数据已更新")
             else:
-                print("❌ [云同步] 下载失败！云端可能无数据或网络异常")
-        except Exception as e:
-            print(f"❌ [云同步] 下载异常: {e}")
+                print(f"❌ [云同步] 下载失败（{message}）！云端可能无数据或网络异常")
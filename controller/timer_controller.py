@@ -2,6 +2,7 @@ import subprocess
 import os
 from PySide6.QtCore import QObject
 from model.timer_model import TimerModel, TimerStatus
+from cloud.sync_worker import SyncWorker
 from view.widgets.timer.timer_view import TimerDialog
 from view.widgets.timer.timer_button import TimerButton
 from .notification_handler import NotificationHandler
@@ -19,10 +20,14 @@ except ImportError:
 class TimerController(QObject):
     """番茄时间控制器，协调模型、视图和辅助处理器"""
     
-    def __init__(self, parent=None, user_id="default_user", key_path="config/brilliant-balm-465903-g3-e308e8638139.json"):
+    def __init__(self, parent=None, user_id="default_user", key_path="config/brilliant-balm-465903-g3-e308e8638139.json",
+                 model: TimerModel = None, sync_worker: SyncWorker = None):
         super().__init__(parent)
         
-        self.model = TimerModel(user_id, key_path)
+        self.model = model or TimerModel(user_id, key_path)
+        # 云同步在后台工作器中执行，与主窗口共用同一个队列
+        self._sync_worker = sync_worker or SyncWorker(self)
+        self._sync_worker.sync_finished.connect(self._on_sync_finished)
         self.button = TimerButton()
         self.dialog = None
         
@@ -89,27 +94,23 @@ class TimerController(QObject):
         self._update_dialog_display()
 
     def _handle_upload_request(self):
-        """处理上传请求"""
-        log_controller("cloud_sync", "开始上传番茄钟数据")
-        try:
-            if self.model.sync_upload():
-                log_controller("cloud_sync", "上传成功")
-            else:
-                log_controller("cloud_sync", "上传失败")
-        except Exception as e:
-            log_controller("cloud_sync_exception", f"上传异常: {e}")
+        """处理上传请求（交给后台工作器，重复点击会被合并）"""
+        if self._sync_worker.request(self.model.upload_job()):
+            log_controller("cloud_sync", "开始上传番茄钟数据")
 
     def _handle_download_request(self):
-        """处理下载请求"""
-        log_controller("cloud_sync", "开始下载番茄钟数据")
-        try:
-            if self.model.sync_download():
-                log_controller("cloud_sync", "下载成功")
+        """处理下载请求（交给后台工作器，重复点击会被合并）"""
+        if self._sync_worker.request(self.model.download_job()):
+            log_controller("cloud_sync", "开始下载番茄钟数据")
+
+    def _on_sync_finished(self, name: str, success: bool, message: str):
+        """后台同步结束（在 GUI 线程中调用）"""
+        if name == self.model.upload_job().name:
+            log_controller("cloud_sync", "上传成功" if success else f"上传失败: {message}")
+        elif name == self.model.download_job().name:
+            log_controller("cloud_sync", "下载成功" if success else f"下载失败: {message}")
+            if success:
                 self._update_dialog_display()
-            else:
-                log_controller("cloud_sync", "下载失败")
-        except Exception as e:
-            log_controller("cloud_sync_exception", f"下载异常: {e}")
     
     def _update_button_display(self):
         """更新按钮的文本和状态显示"""
@@ -99,26 +99,51 @@ def main():
         KEY_PATH = "config/brilliant-balm-465903-g3-e308e8638139.json"
         USER_ID = "default_user"  # 可根据实际需求动态生成
         
-        # 初始化数据模型
+        # 初始化数据模型：全部通过服务注册表创建，每个模型和 CloudSync 只创建一次
         from model.event_model import EventModel
-        model = TodoModel(USER_ID, KEY_PATH)
-        event_model = EventModel(USER_ID, KEY_PATH)
+        from model.storage import set_default_backend, background_writer
+        from utils.service_registry import create_app_registry
+        storage_cfg = config.get('data_storage', {})
+        set_default_backend(storage_cfg.get('backend', 'json'))
+        background_writer.configure(storage_cfg.get('durability', 'batched'),
+                                    storage_cfg.get('batch_interval_seconds', 5))
+        EventModel.archive_after_days = storage_cfg.get('archive_after_days', 90)
+        TodoModel.archive_done_after_days = storage_cfg.get('todo_archive_after_days', 30)
+        cloud_cfg = config.get('cloud', {})
+        registry = create_app_registry(USER_ID, KEY_PATH,
+                                       live_upload_delay_ms=cloud_cfg.get('live_upload_delay_ms', 2000),
+                                       cloud_backend=cloud_cfg.get('backend', 'firestore'),
+                                       cloud_dir=cloud_cfg.get('local_dir'))
+        model = registry.get('todo_model')
+        event_model = registry.get('event_model')
         
-        # 初始化视图，传递event_model
-        view = MainWindow(config, event_model)
+        # 初始化视图，传递event_model和待办事项归档（归档列表浏览）
+        view = MainWindow(config, event_model, todo_archive=model.archive)
         delegate = TodoDelegate(config)
-        controller = AppController(model, view)
+        sync_worker = registry.get('sync_worker')
+        # 主窗口的上传/下载同步全部集合（待办事项、时间记录、计时数据）
+        controller = AppController(model, view, timer_model=registry.get('timer_model'),
+                                   sync_worker=sync_worker, sync_all=registry.get('sync_all'))
 
-        # 4. 连接组件
+        # 实时同步（可选）：监听云端变更并自动合并，本地修改后自动上传
+        if cloud_cfg.get('live_sync', False):
+            live_sync = registry.get('live_sync')
+            live_sync.start()
+            app.aboutToQuit.connect(live_sync.stop)
+
+        # 失败或离线的同步请求记录在 data/sync_outbox.json 中，按指数退避自动重试
+        sync_outbox = registry.get('sync_outbox')
+        sync_outbox.start()
+        # 退出时把未完成的同步请求记入重试队列（被取消的同步不推进水位，下次启动后重新发送），
+        # 然后等待后台写入完成并落盘
+        app.aboutToQuit.connect(sync_outbox.shutdown)
+        app.aboutToQuit.connect(background_writer.flush)
+
+        # 4. 连接组件（模型在创建时已加载数据，无需再次 load）
         view.list_view.setModel(model)
         view.list_view.setItemDelegate(delegate)
-        
-        # 5. 加载初始数据并显示
-        try:
-            model.load()
-        except Exception as e:
-            print(f"警告：数据加载失败 ({e})，将从空列表开始")
-            
+
+        # 5. 显示界面
         view.show()
 
         # 运行应用程序
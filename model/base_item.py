@@ -5,13 +5,26 @@
 只负责数据存储和序列化，不包含任何界面显示逻辑。
 """
 
+import json
+import sys
 from abc import ABC, abstractmethod
 from dataclasses import dataclass, field
 from datetime import datetime
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 
+from .storage.schema import new_item_id, utc_timestamp
 
-@dataclass
+# 项目数据类的装饰器：Python 3.10+ 生成 __slots__，去掉每个实例的 __dict__。
+# 注意：slots 数据类会被重新创建，方法中不能使用无参数的 super()。
+item_dataclass = dataclass(**({'slots': True} if sys.version_info >= (3, 10) else {}))
+
+
+def intern_str(value: Any) -> Any:
+    """驻留分类、类型等高度重复的字符串，使同值字符串共享同一个对象"""
+    return sys.intern(value) if type(value) is str else value
+
+
+@item_dataclass
 class BaseItem(ABC):
     """所有项目类型的抽象基类
     
@@ -22,16 +35,40 @@ class BaseItem(ABC):
         description: 项目描述文本
         category: 项目分类
         created_time: 创建时间
+        id: 稳定的唯一标识，用于在重新加载、同步时识别同一个项目
+        updated_at: 最后修改时间（UTC ISO 字符串），由模型在每次本地修改时更新，
+            增量云同步据此选出需要上传的项目并解决冲突
         item_type: 项目类型标识（由子类设置）
     """
     description: str
     category: str = "default"
     created_time: datetime = field(default_factory=datetime.now)
+    id: str = field(default_factory=new_item_id)
+    updated_at: str = field(default_factory=utc_timestamp)
     item_type: str = field(init=False)
+    # 序列化缓存：None 表示项目自上次编码后被修改过（脏）
+    _encoded: Optional[str] = field(default=None, init=False, repr=False, compare=False)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        """任何字段被修改时清除序列化缓存，标记为脏"""
+        object.__setattr__(self, name, value)
+        if name != '_encoded':
+            object.__setattr__(self, '_encoded', None)
+
+    @property
+    def is_dirty(self) -> bool:
+        """自上次编码后是否被修改过"""
+        return self._encoded is None
+
+    def to_json(self) -> str:
+        """返回项目的 JSON 片段，只有脏项目才会重新调用 to_dict 编码"""
+        if self._encoded is None:
+            self._encoded = json.dumps(self.to_dict(), ensure_ascii=False)
+        return self._encoded
     
     def __post_init__(self) -> None:
         """初始化后处理，验证子类是否正确设置了item_type"""
-        if not hasattr(self, '_item_type_set'):
+        if not hasattr(self, 'item_type'):
             raise NotImplementedError(
                 f"子类 {self.__class__.__name__} 必须在 __post_init__ 中设置 item_type"
             )
@@ -47,10 +84,12 @@ class BaseItem(ABC):
             包含对象数据的字典
         """
         return {
+            "id": self.id,
             "description": self.description,
             "category": self.category,
             "created_time": self.created_time.isoformat(),
-            "item_type": self.item_type
+            "item_type": self.item_type,
+            "updated_at": self.updated_at
         }
     
     @classmethod
@@ -1,45 +1,231 @@
 import json
 import os
-from typing import List, Any, Callable
-from PySide6.QtCore import QAbstractListModel, QModelIndex, Qt
-from cloud.cloud_sync import CloudSync
+from typing import TYPE_CHECKING, List, Any, Dict, Callable, Iterable, Optional, Tuple
+from PySide6.QtCore import QAbstractListModel, QModelIndex, Qt, Signal
+from cloud.sync_state import SyncState
+from cloud.sync_worker import SyncJob
+from .storage import FileLock, create_storage
+from .storage.schema import utc_timestamp
+
+if TYPE_CHECKING:
+    # cloud.cloud_sync 依赖 model.storage.schema，运行时在构造函数中导入以免循环导入
+    from cloud.cloud_sync import CloudSync
+
+# 合并云端变更的中间结果：(需要写入的项目对象, 删除标记 [(项目 id, 删除时间)])
+RemoteMerge = Tuple[List[Any], List[Tuple[str, str]]]
+
 
 class BaseModel(QAbstractListModel):
-    def __init__(self, user_id: str, key_path: str, data_file: str, collection_name: str):
+    # 本地修改了项目内容（不包括合并云端变更），实时同步据此安排上传
+    local_changed = Signal()
+    # 内部信号：监听线程把合并好的云端变更排队送回 GUI 线程
+    _live_changes = Signal(object, str)
+
+    # 日志模式：JSON 后端下变更追加写入 <data_file>.journal，超过阈值后后台压缩进快照
+    journal_enabled = False
+    journal_compact_bytes = 256 * 1024
+    # SQLite 后端需要建立索引的列：列名 -> 从项目字典提取列值的函数
+    storage_columns: Dict[str, Callable[[dict], Any]] = {}
+    # JSON 后端按该时间字段的月份分段存储，启动时只加载近期分段（None 表示不分段）
+    storage_segment_field: Optional[str] = None
+    segment_preload_items = 0
+    # 一次下载的云端变更超过该数量时，交给存储引擎整体替换而不是逐条记录
+    bulk_apply_threshold = 200
+
+    def __init__(self, user_id: str, key_path: str, data_file: str, collection_name: str,
+                 storage_backend: Optional[str] = None, cloud: Optional['CloudSync'] = None):
         super().__init__()
         self.user_id = user_id
         self._data_dir = 'data'
         self._data_file_path = os.path.join(self._data_dir, data_file)
         self._collection_name = collection_name
-        self._cloud = CloudSync(key_path, user_id)
+        # 通常由服务注册表注入共享的 CloudSync 实例
+        if cloud is None:
+            from cloud.cloud_sync import CloudSync
+            cloud = CloudSync(key_path, user_id)
+        self._cloud = cloud
+        self._sync_state = SyncState(os.path.join(self._data_dir, f"{collection_name}.syncstate.json"))
+        # 从云端合并来的项目版本（id -> updated_at），上传时跳过，避免把云端的修改再传回去
+        self._remote_versions: Dict[str, str] = {}
         self._items: List[Any] = []
-        self._ensure_local_file_exists()
+        self._watcher = None
+        self._live_changes.connect(self._on_live_changes)
+        self._encode_stats = {'encoded': 0, 'reused': 0}
+        items_key = next(iter(self.get_default_data_structure()))
+        self._storage = create_storage(
+            data_file, collection_name, items_key,
+            journal=self.journal_enabled, compact_bytes=self.journal_compact_bytes,
+            columns=self.storage_columns, backend=storage_backend,
+            segment_field=self.storage_segment_field, preload_items=self.segment_preload_items
+        )
         self.load()
 
-    def _ensure_local_file_exists(self):
-        os.makedirs(self._data_dir, exist_ok=True)
-        if not os.path.exists(self._data_file_path):
-            with open(self._data_file_path, 'w', encoding='utf-8') as f:
-                json.dump(self.get_default_data_structure(), f)
-
     def get_default_data_structure(self) -> dict:
         return {'items': []}
 
     def load(self):
+        self.beginResetModel()
+        data = self._storage.load()
+        self._items = self._parse_items(self._unique_by_id(data))
+        self.endResetModel()
+        if len(self._items) != len(data):
+            self._reset_storage_rows()
+        elif self._storage.needs_rewrite:
+            self.save()
+
+    def watch_external_changes(self, debounce_ms: int = 200):
+        """监视数据文件，被其他进程修改后增量重新加载"""
+        if self._watcher is None:
+            from .external_watcher import ExternalChangeWatcher
+            self._watcher = ExternalChangeWatcher(self, debounce_ms)
+
+    def reload_external(self) -> bool:
+        """数据文件被外部修改时按 id 增量合并新内容
+
+        Returns:
+            是否检测到了外部修改
+        """
+        if not self._storage.has_external_changes():
+            return False
+        self._merge_items(self._storage.reload())
+        return True
+
+    def _unique_by_id(self, data: List[dict]) -> List[dict]:
+        """去掉重复 id 的项目：保留第一次出现的位置和最后一次出现的内容；没有 id 的行被跳过"""
+        unique, malformed = {}, 0
+        for item_data in data:
+            if not isinstance(item_data, dict) or not item_data.get('id'):
+                malformed += 1
+                continue
+            unique[item_data['id']] = item_data
+        if malformed:
+            print(f"⚠️ [{self.__class__.__name__}] 跳过 {malformed} 个没有 id 的项目")
+        if len(unique) != len(data) - malformed:
+            print(f"[{self.__class__.__name__}] 数据中有 {len(data) - malformed - len(unique)} 个重复 id 的项目，已合并")
+        return list(unique.values())
+
+    def _parse_items(self, data: List[dict]) -> List[Any]:
+        """把项目字典转换为项目对象，无法解析的行打印警告后跳过，不中断加载"""
+        items = []
+        for item_data in data:
+            try:
+                items.append(self._dict_to_item(item_data))
+            except (KeyError, TypeError, ValueError, AttributeError) as e:
+                print(f"⚠️ [{self.__class__.__name__}] 跳过无法解析的项目 {item_data.get('id')}: {e!r}")
+        return items
+
+    def _reset_storage_rows(self):
+        """跳过了重复或损坏的行之后，用当前列表整体替换存储引擎中的数据
+
+        SQLite 和分段存储按行号定位项目，行号必须与 _items 一致，否则后续的修改会写到错误的行上。
+        """
+        self._record_mutation('reset', 0, data={'items': [self._item_to_dict(item) for item in self._items]})
+        self.save()
+
+    def _merge_items(self, new_data: List[dict]):
+        """把当前项目列表就地变换为 new_data，只发出插入/删除/移动/修改信号
+
+        不调用 beginResetModel，视图的选中项和滚动位置得以保留。
+        重复的 id 先合并；逐行对齐仍然失败时退回整体重置。
+        """
+        loaded = len(new_data)
+        new_data = self._unique_by_id(new_data)
         try:
-            with open(self._data_file_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
+            self._align_items(new_data)
+        except Exception as e:
+            print(f"[{self.__class__.__name__}] 增量合并失败，整体重新加载: {e}")
             self.beginResetModel()
-            items_data = data.get('items', data.get('events', []))
-            self._items = [self._dict_to_item(item_data) for item_data in items_data]
+            self._items = self._parse_items(new_data)
             self.endResetModel()
-        except (FileNotFoundError, json.JSONDecodeError):
-            self._items = []
+        if len(self._items) != loaded:
+            self._reset_storage_rows()
+
+    def _align_items(self, new_data: List[dict]):
+        """_merge_items 的逐行对齐（new_data 的 id 唯一）"""
+        if len({item.id for item in self._items}) != len(self._items):
+            raise ValueError("当前列表中有重复 id")
+        new_ids = [data['id'] for data in new_data]
+        keep = set(new_ids)
+        # 1. 删除新内容中不存在的项目（从后往前，连续的行合并为一次删除）
+        row = len(self._items) - 1
+        while row >= 0:
+            if self._items[row].id in keep:
+                row -= 1
+                continue
+            last = row
+            while row > 0 and self._items[row - 1].id not in keep:
+                row -= 1
+            self.beginRemoveRows(QModelIndex(), row, last)
+            del self._items[row:last + 1]
+            self.endRemoveRows()
+            row -= 1
+        # 2. 按新顺序逐行对齐：移动已有项目、插入新项目、替换内容变化的项目
+        present = {item.id for item in self._items}
+        row = 0
+        while row < len(new_data):
+            data = new_data[row]
+            if data['id'] not in present:
+                end = row
+                while end + 1 < len(new_data) and new_data[end + 1]['id'] not in present:
+                    end += 1
+                self.beginInsertRows(QModelIndex(), row, end)
+                self._items[row:row] = [self._dict_to_item(d) for d in new_data[row:end + 1]]
+                self.endInsertRows()
+                row = end + 1
+                continue
+            if self._items[row].id != data['id']:
+                source = next(i for i in range(row + 1, len(self._items)) if self._items[i].id == data['id'])
+                self.beginMoveRows(QModelIndex(), source, source, QModelIndex(), row)
+                self._items.insert(row, self._items.pop(source))
+                self.endMoveRows()
+            if self._items[row].to_json() != json.dumps(data, ensure_ascii=False):
+                self._items[row] = self._dict_to_item(data)
+                index = self.index(row, 0)
+                self.dataChanged.emit(index, index)
+            row += 1
 
     def save(self):
-        with open(self._data_file_path, 'w', encoding='utf-8') as f:
-            data = {'items': [self._item_to_dict(item) for item in self._items]}
-            json.dump(data, f, ensure_ascii=False, indent=2)
+        self._storage.save(self._snapshot)
+
+    def flush(self):
+        """同步写出完整数据（日志模式下同时压缩日志）"""
+        self._storage.flush(self._snapshot)
+
+    def _snapshot(self) -> List[str]:
+        """返回全部项目的 JSON 片段，未修改的项目直接复用缓存"""
+        fragments = []
+        for item in self._items:
+            self._encode_stats['encoded' if item.is_dirty else 'reused'] += 1
+            fragments.append(item.to_json())
+        return fragments
+
+    @property
+    def serialization_stats(self) -> Dict[str, int]:
+        """序列化统计：encoded/reused 为重新编码/复用缓存的项目数，
+        writes/skipped_writes 为实际写盘/因内容哈希未变而跳过的次数"""
+        stats = dict(self._encode_stats)
+        stats.update(self._storage.write_stats)
+        return stats
+
+    def _record_mutation(self, op: str, row: int, item: Any = None, data: Optional[dict] = None,
+                         touch: bool = True):
+        """把一次增量变更交给存储引擎（引擎不需要时跳过序列化）
+
+        本地修改（touch=True）同时更新项目的 updated_at，删除时记录删除标记，
+        供增量云同步使用；合并云端变更时传 touch=False，保留云端的时间戳。
+        """
+        if touch and item is not None:
+            if op == 'remove':
+                self._sync_state.record_deletion(item.id)
+            else:
+                item.updated_at = utc_timestamp()
+            self.local_changed.emit()
+        if not self._storage.tracks_mutations:
+            return
+        if item is not None:
+            # 删除只带 id：变更日志按 id 定位项目
+            data = self._item_to_dict(item) if op != 'remove' else {'id': item.id}
+        self._storage.apply(op, row, data)
 
     def _dict_to_item(self, data: dict) -> Any:
         raise NotImplementedError("Subclasses must implement _dict_to_item")
@@ -47,15 +233,197 @@ class BaseModel(QAbstractListModel):
     def _item_to_dict(self, item: Any) -> dict:
         raise NotImplementedError("Subclasses must implement _item_to_dict")
 
+    def _archived_items(self) -> Iterable[dict]:
+        """已移出热数据的归档项目字典，首次上传时在工作线程中读取（默认没有归档）"""
+        return ()
+
     def sync_upload(self):
-        self.save()
-        return self._cloud.upload(self._collection_name, self._data_file_path)
+        """增量上传自上次上传以来修改过的项目和本地删除（同步执行，会阻塞调用线程）"""
+        prepared = self._prepare_upload()
+        return self._finish_upload(prepared, self._run_upload(prepared))
 
     def sync_download(self):
-        if self._cloud.download(self._collection_name, self._data_file_path):
-            self.load()
+        """增量下载云端的新变更并合并进当前列表（同步执行，会阻塞调用线程）"""
+        prepared = self._prepare_download()
+        return self._finish_download(prepared, self._run_download(prepared))
+
+    def upload_job(self) -> SyncJob:
+        """供 SyncWorker 在后台执行的上传任务"""
+        return SyncJob(f"{self._collection_name}:upload",
+                       self._prepare_upload, self._run_upload, self._finish_upload)
+
+    def download_job(self) -> SyncJob:
+        """供 SyncWorker 在后台执行的下载任务"""
+        return SyncJob(f"{self._collection_name}:download",
+                       self._prepare_download, self._run_download, self._finish_download)
+
+    def _prepare_upload(self) -> tuple:
+        """GUI 线程：记下开始时间，挑选 updated_at 不早于上传水位的本地修改
+
+        首次上传需要全部数据（包括尚未加载的分段和已归档的项目），这里只导出文件，由工作线程读取；
+        同时带上下载水位，全量上传为压缩快照时据此取代已经合并进本地的旧快照。
+        """
+        started_at = utc_timestamp()
+        watermark = self._sync_state.upload_watermark
+        tombstones = dict(self._sync_state.tombstones)
+        if watermark:
+            items = [self._item_to_dict(item) for item in self._items
+                     if item.updated_at >= watermark and self._remote_versions.get(item.id) != item.updated_at]
+            return started_at, False, items, None, tombstones, ""
+        return (started_at, True, None, self._storage.sync_export(self._snapshot), tombstones,
+                self._sync_state.download_watermark)
+
+    def _run_upload(self, prepared: tuple, token=None) -> bool:
+        writes = self._upload_writes(prepared)
+        if not writes:
+            print(f"[{self.__class__.__name__}] 没有需要上传的变更")
             return True
-        return False
+        return self._cloud.commit_writes(writes, token)
+
+    def _upload_writes(self, prepared: tuple) -> list:
+        """工作线程：把 _prepare_upload 捕获的变更转成云端写入操作（批量上传全部集合时合并提交）"""
+        _, first, items, export_path, tombstones, downloaded = prepared
+        if export_path:
+            with FileLock(export_path, shared=True), open(export_path, 'r', encoding='utf-8') as f:
+                document = json.load(f)
+            items = document.get('items', document.get('events', []))
+            # 首次上传会清除云端旧版整集合文档，归档的项目也要导出，否则历史只剩本地一份
+            live = {data['id'] for data in items}
+            archived = {data['id']: data for data in self._archived_items() if data['id'] not in live}
+            items.extend(archived.values())
+        return self._cloud.item_writes(self._collection_name, items, tombstones,
+                                       replace_legacy=first, downloaded=downloaded)
+
+    def _finish_upload(self, prepared: tuple, ok: bool) -> bool:
+        if ok:
+            self._sync_state.uploaded(prepared[0], prepared[4])
+            watermark = self._sync_state.upload_watermark
+            self._remote_versions = {item_id: updated_at for item_id, updated_at in self._remote_versions.items()
+                                     if updated_at >= watermark}
+        return ok
+
+    def _prepare_download(self) -> str:
+        return self._sync_state.download_watermark
+
+    def _run_download(self, watermark: str, token=None, snapshot=None):
+        """工作线程：下载变更并解码、筛选为项目对象；snapshot 为批量读取的集合文档，集合没有新变更时不再查询项目
+
+        Returns:
+            (合并结果, 新的下载水位, 下载的变更数)，失败为 None
+        """
+        result = self._cloud.download_items(self._collection_name, watermark, token=token, parent=snapshot)
+        if result is None:
+            return None
+        changes, new_watermark = result
+        return self._merge_remote_changes(changes), new_watermark, len(changes)
+
+    def _finish_download(self, watermark: str, result) -> bool:
+        """GUI 线程：把工作线程准备好的合并结果一次性应用到列表并推进下载水位"""
+        if result is None:
+            return False
+        merge, new_watermark, count = result
+        applied = self._apply_merge(merge)
+        if applied:
+            self.save()
+        print(f"[{self.__class__.__name__}] 下载 {count} 个云端变更，应用 {applied} 个")
+        self._sync_state.download_watermark = new_watermark
+        self._sync_state.save()
+        return True
+
+    def start_live_sync(self) -> bool:
+        """开始实时监听云端变更（从下载水位开始），变更到达后自动合并进列表"""
+        return self._cloud.start_listener(self._collection_name, self._on_remote_snapshot,
+                                          since=self._sync_state.download_watermark)
+
+    def stop_live_sync(self):
+        self._cloud.stop_listener(self._collection_name)
+
+    def _on_remote_snapshot(self, changes: List[dict], watermark: str):
+        """监听线程：解码和筛选在这里完成，结果排队交给 GUI 线程应用"""
+        self._live_changes.emit(self._merge_remote_changes(changes), watermark)
+
+    def _on_live_changes(self, merge: RemoteMerge, watermark: str):
+        applied = self._apply_merge(merge)
+        if applied:
+            self.save()
+            print(f"[{self.__class__.__name__}] 实时同步应用 {applied} 个云端变更")
+        if watermark > self._sync_state.download_watermark or applied:
+            self._sync_state.download_watermark = max(self._sync_state.download_watermark, watermark)
+            self._sync_state.save()
+
+    def _merge_remote_changes(self, changes: List[dict]) -> RemoteMerge:
+        """筛选出比本地新的云端变更并构造项目对象（可在任意线程中调用）
+
+        只读取项目列表和删除标记的副本做预筛选，最终以 _apply_merge 在 GUI 线程中的检查为准。
+        """
+        local = {item.id: item.updated_at for item in list(self._items)}
+        tombstones = dict(self._sync_state.tombstones)
+        newer, deletions = [], []
+        for data in changes:
+            current = local.get(data['id'])
+            if data.get('deleted'):
+                if current is not None and data['updated_at'] > current:
+                    deletions.append((data['id'], data['updated_at']))
+            elif data['updated_at'] > (current if current is not None else tombstones.get(data['id'], "")):
+                newer.append(data)
+        # 云端新增的项目按创建时间追加到末尾
+        newer.sort(key=lambda data: data.get('created_time') or "")
+        return self._parse_items(newer), deletions
+
+    def _apply_merge(self, merge: RemoteMerge) -> int:
+        """GUI 线程：把 _merge_remote_changes 的结果应用到列表
+
+        只对受影响的行发出修改/删除/插入信号。本地已删除、尚未上传的项目，
+        只有云端版本晚于删除时间时才会恢复。
+
+        Returns:
+            实际应用的变更数
+        """
+        items, deletions = merge
+        rows = {item.id: row for row, item in enumerate(self._items)}
+        tombstones = self._sync_state.tombstones
+        updated, removed, inserted = [], [], []
+        for item in items:
+            row = rows.get(item.id)
+            if row is not None:
+                if item.updated_at > self._items[row].updated_at:
+                    updated.append((row, item))
+            elif item.updated_at > tombstones.get(item.id, ""):
+                tombstones.pop(item.id, None)
+                inserted.append(item)
+        for item_id, deleted_at in deletions:
+            row = rows.get(item_id)
+            if row is not None and deleted_at > self._items[row].updated_at:
+                removed.append(row)
+
+        for item in [item for _, item in updated] + inserted:
+            self._remote_versions[item.id] = item.updated_at
+
+        bulk = len(updated) + len(removed) + len(inserted) > self.bulk_apply_threshold
+        for row, item in updated:
+            self._items[row] = item
+            index = self.index(row, 0)
+            self.dataChanged.emit(index, index)
+            if not bulk:
+                self._record_mutation('update', row, item, touch=False)
+        for row in sorted(removed, reverse=True):
+            self.beginRemoveRows(QModelIndex(), row, row)
+            item = self._items.pop(row)
+            self.endRemoveRows()
+            if not bulk:
+                self._record_mutation('remove', row, item, touch=False)
+        if inserted:
+            start = len(self._items)
+            self.beginInsertRows(QModelIndex(), start, start + len(inserted) - 1)
+            self._items.extend(inserted)
+            self.endInsertRows()
+            if not bulk:
+                for row in range(start, len(self._items)):
+                    self._record_mutation('insert', row, self._items[row], touch=False)
+        if bulk and self._storage.tracks_mutations:
+            self._record_mutation('reset', 0, data={'items': [item.to_dict() for item in self._items]},
+                                  touch=False)
+        return len(updated) + len(removed) + len(inserted)
 
     def rowCount(self, parent: QModelIndex = QModelIndex()) -> int:
         return len(self._items)
@@ -5,17 +5,17 @@
 严格遵循数据与视图分离的原则。
 """
 
-import json
-from datetime import datetime
+from datetime import datetime, timedelta
 from dataclasses import dataclass, asdict
-from typing import List, Optional, Dict, Any
+from typing import Iterator, List, Optional, Dict, Any
 
-from PySide6.QtCore import Signal
+from PySide6.QtCore import QModelIndex, Signal
 
-from .base_item import BaseItem
+from .base_item import BaseItem, item_dataclass, intern_str
 from .base_model import BaseModel
+from .record_archive import RecordArchive
 
-@dataclass
+@item_dataclass
 class RecordItem(BaseItem):
     """时间记录数据类
     
@@ -36,8 +36,7 @@ class RecordItem(BaseItem):
     def __post_init__(self) -> None:
         """初始化后处理，设置类型标识"""
         self.item_type = "record"
-        self._item_type_set = True
-        super().__post_init__()
+        BaseItem.__post_init__(self)
 
     @property
     def event_description(self) -> str:
@@ -49,11 +48,19 @@ class RecordItem(BaseItem):
         """向后兼容性接口 - 设置描述文本"""
         self.description = value
 
+    def time_key(self, name: str) -> str:
+        """返回时间字段的 ISO 字符串，可直接用于排序和按日期前缀比较
+
+        Args:
+            name: start_time/end_time/created_time
+        """
+        value = getattr(self, name)
+        return value.isoformat() if value else ""
+
     def to_dict(self) -> Dict[str, Any]:
-        """序列化为字典，包含所有时间记录字段"""
-        base_dict = super().to_dict()
+        """序列化为字典（当前格式版本），包含所有时间记录字段"""
+        base_dict = BaseItem.to_dict(self)
         base_dict.update({
-            "event_description": self.description,  # 保持向后兼容
             "start_time": self.start_time.isoformat() if self.start_time else None,
             "end_time": self.end_time.isoformat() if self.end_time else None,
             "duration_seconds": self.duration_seconds,
@@ -66,67 +73,186 @@ class RecordItem(BaseItem):
         """从字典反序列化时间记录对象
         
         Args:
-            data: 包含时间记录数据的字典
+            data: 包含时间记录数据的字典（当前格式，旧格式由存储层升级）
             
         Returns:
             反序列化后的RecordItem实例
         """
-        # 处理时间字段
-        created_time = data.get("created_time")
-        if created_time:
-            try:
-                created_time = datetime.fromisoformat(created_time)
-            except ValueError:
-                created_time = datetime.now()
-        else:
-            created_time = datetime.now()
-
-        start_time = None
-        if data.get("start_time"):
-            try:
-                start_time = datetime.fromisoformat(data["start_time"])
-            except ValueError:
-                start_time = None
-
-        end_time = None
-        if data.get("end_time"):
-            try:
-                end_time = datetime.fromisoformat(data["end_time"])
-            except ValueError:
-                end_time = None
-
         return cls(
-            description=data.get("event_description", data.get("description", "")),
-            category=data.get("category", "default"),
-            created_time=created_time,
-            start_time=start_time,
-            end_time=end_time,
+            id=data["id"],
+            description=data["description"],
+            category=intern_str(data.get("category", "default")),
+            created_time=datetime.fromisoformat(data["created_time"]),
+            updated_at=data["updated_at"],
+            start_time=_parse_time(data.get("start_time")),
+            end_time=_parse_time(data.get("end_time")),
             duration_seconds=data.get("duration_seconds", 0),
-            event_type=data.get("event_type", "pomodoro")
+            event_type=intern_str(data.get("event_type", "pomodoro"))
         )
 
 
+def _parse_time(value: Optional[str]) -> Optional[datetime]:
+    """解析 ISO 时间字符串，无效时返回 None"""
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        return None
+
+
+def _lazy_time_field(name: str) -> property:
+    """生成首次访问时才解析原始字符串的时间字段属性"""
+    def getter(self) -> Optional[datetime]:
+        parsed = self._parsed
+        if name not in parsed:
+            parsed[name] = _parse_time(self._raw.get(name))
+        return parsed[name]
+
+    def setter(self, value: Optional[datetime]) -> None:
+        self._parsed[name] = value
+
+    return property(getter, setter)
+
+
+# 需要驻留的原始字典字段
+_INTERNED_KEYS = ("category", "event_type", "item_type")
+
+
+class LazyRecordItem(RecordItem):
+    """延迟解析时间字段的时间记录
+
+    直接持有从文件读出的原始字典，start_time/end_time/created_time
+    只在首次访问时调用 datetime.fromisoformat。未被修改的记录序列化时
+    原样返回原始字典，不需要再格式化时间。
+    """
+
+    __slots__ = ("_raw", "_parsed", "_pristine")
+
+    start_time = _lazy_time_field("start_time")
+    end_time = _lazy_time_field("end_time")
+    created_time = _lazy_time_field("created_time")
+
+    def __init__(self, raw: Dict[str, Any]):
+        # 原始字典会一直被持有：驻留其中重复的分类/类型字符串
+        for key in _INTERNED_KEYS:
+            if key in raw:
+                raw[key] = intern_str(raw[key])
+        # 绕过脏标记钩子直接赋值，加载大量记录时这是热点路径
+        init = object.__setattr__
+        init(self, "_raw", raw)
+        init(self, "_parsed", {})
+        init(self, "_encoded", None)
+        init(self, "_pristine", True)
+        init(self, "id", raw["id"])
+        init(self, "updated_at", raw["updated_at"])
+        init(self, "description", raw["description"])
+        init(self, "category", raw.get("category", "default"))
+        init(self, "duration_seconds", raw.get("duration_seconds", 0))
+        init(self, "event_type", raw.get("event_type", "pomodoro"))
+        init(self, "item_type", "record")
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        super().__setattr__(name, value)
+        if not name.startswith("_"):
+            object.__setattr__(self, "_pristine", False)
+
+    def time_key(self, name: str) -> str:
+        """未解析的字段直接返回原始 ISO 字符串"""
+        if name in self._parsed:
+            return super().time_key(name)
+        return self._raw.get(name) or ""
+
+    def to_dict(self) -> Dict[str, Any]:
+        if self._pristine:
+            return dict(self._raw)
+        return super().to_dict()
+
+
 class EventModel(BaseModel):
     event_saved = Signal(str)
+    # 开始时间早于 N 天的记录自动迁入列式归档，None 表示不归档
+    archive_after_days: Optional[int] = 90
+    storage_columns = {
+        "start_time": lambda data: data.get("start_time"),
+        "category": lambda data: data.get("category"),
+    }
+    # JSON 后端按结束时间分月存储：启动只加载当月（不足一屏时向前补足），更早的按需加载
+    storage_segment_field = "end_time"
+    segment_preload_items = 50
 
-    def __init__(self, user_id: str, key_path: str):
+    def __init__(self, user_id: str, key_path: str, storage_backend: Optional[str] = None, cloud=None):
         self.current_session_start: Optional[datetime] = None
-        super().__init__(user_id, key_path, 'event_records.json', 'event_records')
+        self.archive = RecordArchive()
+        super().__init__(user_id, key_path, 'event_records.json', 'event_records', storage_backend, cloud)
+
+    def load(self):
+        super().load()
+        self._archive_old_records()
+
+    def _archive_old_records(self):
+        """把超过 archive_after_days 天的记录迁入归档，只比较 ISO 字符串不解析时间"""
+        if self.archive_after_days is None or not RecordArchive.available():
+            return
+        cutoff = (datetime.now() - timedelta(days=self.archive_after_days)).isoformat()
+        # 整月都早于截止时间的未加载分段直接整段归档，不必并入模型
+        # 无法归档（字段超出归档列的范围）的记录留在热数据中，不丢弃
+        for key in self._storage.pending_partitions():
+            if key < cutoff[:7]:
+                try:
+                    self.archive.append([LazyRecordItem(data) for data in self._storage.read_partition(key)])
+                except ValueError as e:
+                    print(f"⚠️ [EventModel] 分段 {key} 归档失败，保留在原数据中: {e}")
+                    continue
+                self._storage.drop_partition(key)
+        old = [item for item in self._items if "" < item.time_key('start_time') < cutoff]
+        if not old:
+            return
+        try:
+            self.archive.append(old)
+        except ValueError as e:
+            print(f"⚠️ [EventModel] 记录归档失败，保留在原数据中: {e}")
+            return
+        archived = set(map(id, old))
+        self.beginResetModel()
+        self._items = [item for item in self._items if id(item) not in archived]
+        self.endResetModel()
+        self._record_mutation('reset', 0, data={'items': [item.to_dict() for item in self._items]})
+        self.save()
 
     def get_default_data_structure(self) -> dict:
         return {"events": []}
 
+    def _archived_items(self) -> Iterator[dict]:
+        return self.archive.iter_records() if RecordArchive.available() else iter(())
+
+    def canFetchMore(self, parent: QModelIndex = QModelIndex()) -> bool:
+        return not parent.isValid() and bool(self._storage.pending_partitions())
+
+    def fetchMore(self, parent: QModelIndex = QModelIndex()):
+        self.load_older_segment()
+
+    def load_older_segment(self) -> List[RecordItem]:
+        """按需加载下一个更早的月度分段，返回新加载的记录"""
+        pending = self._storage.pending_partitions()
+        if not pending:
+            return []
+        row, rows = self._storage.load_partition(pending[0])
+        items = self._parse_items(rows)
+        if items:
+            self.beginInsertRows(QModelIndex(), row, row + len(items) - 1)
+            self._items[row:row] = items
+            self.endInsertRows()
+        if len(items) != len(rows):
+            self._reset_storage_rows()
+        return items
+
     def _dict_to_item(self, data: dict) -> RecordItem:
-        return RecordItem.from_dict(data)
+        # 启动时不解析时间字段，首次访问时再解析
+        return LazyRecordItem(data)
 
     def _item_to_dict(self, item: RecordItem) -> dict:
         return item.to_dict()
-    
-    def save(self):
-        """重写save方法，使用events而不是items"""
-        with open(self._data_file_path, 'w', encoding='utf-8') as f:
-            data = {'events': [self._item_to_dict(item) for item in self._items]}
-            json.dump(data, f, ensure_ascii=False, indent=2)
 
     def start_session(self):
         self.current_session_start = datetime.now()
@@ -143,17 +269,32 @@ class EventModel(BaseModel):
             duration_seconds=duration,
             category=category
         )
-        # 添加到内部数据结构
+        # 添加到内部数据结构：发出插入信号，排序代理（时间记录列表）据此显示新行
+        row = len(self._items)
+        self.beginInsertRows(QModelIndex(), row, row)
         self._items.append(event)
+        self.endInsertRows()
+        self._record_mutation('insert', len(self._items) - 1, event)
         # 保存到文件
         self.save()
         self.event_saved.emit(event_description)
         self.current_session_start = None
         return event
 
-    def get_today_summary(self) -> dict:
+    def _today_events(self) -> List[RecordItem]:
+        """返回今天开始的记录；支持查询的存储引擎走 start_time 索引，
+        否则只比较 ISO 字符串的日期前缀，不解析时间字段"""
         today = datetime.now().date()
-        today_events = [event for event in self._items if event.start_time.date() == today]
+        if not self._storage.supports_queries:
+            prefix = today.isoformat()
+            return [event for event in self._items if event.time_key('start_time')[:10] == prefix]
+        tomorrow = today + timedelta(days=1)
+        rows = self._storage.query("start_time >= ? AND start_time < ?",
+                                   (today.isoformat(), tomorrow.isoformat()))
+        return [self._dict_to_item(row) for row in rows]
+
+    def get_today_summary(self) -> dict:
+        today_events = self._today_events()
         total_duration = sum(event.duration_seconds for event in today_events)
         category_stats = {}
         for event in today_events:
@@ -170,14 +311,29 @@ class EventModel(BaseModel):
             "categories": category_stats,
         }
 
+    def get_category_stats(self, since: Optional[datetime] = None) -> Dict[str, Dict[str, int]]:
+        """按类别统计记录数和总时长（归档部分向量化计算，再合并内存中的近期记录
+        和尚未加载的分段）"""
+        stats = self.archive.category_totals(since) if RecordArchive.available() else {}
+        since_key = since.isoformat() if since else ""
+        unloaded = [LazyRecordItem(data) for key in self._storage.pending_partitions()
+                    for data in self._storage.read_partition(key)]
+        for event in self._items + unloaded:
+            if event.time_key('start_time') >= since_key:
+                entry = stats.setdefault(event.category, {"count": 0, "total_duration": 0})
+                entry["count"] += 1
+                entry["total_duration"] += event.duration_seconds
+        return stats
+
     def delete_event(self, row: int):
         """删除指定行的事件记录"""
         if not 0 <= row < len(self._items):
             return False
         
         self.beginRemoveRows(self.createIndex(row, 0).parent(), row, row)
-        del self._items[row]
+        event = self._items.pop(row)
         self.endRemoveRows()
+        self._record_mutation('remove', row, event)
         
         # 保存到文件
         self.save()
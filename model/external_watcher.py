@@ -0,0 +1,56 @@
+"""
+外部修改监视模块
+
+用 QFileSystemWatcher 监视存储引擎给出的变更通知文件（数据目录的写入代数计数器），
+其他进程写入后（短暂防抖合并连续的修改通知）让模型检查代数并做一次增量重新加载。
+数据文件本身既不被监视也不被轮询。
+"""
+
+import os
+
+from PySide6.QtCore import QFileSystemWatcher, QObject, QTimer
+
+
+class ExternalChangeWatcher(QObject):
+    """监视存储引擎的变更通知文件，变化后调用 model.reload_external()
+
+    计数文件是就地改写的，登记一次即可；文件尚不存在或被删除重建时
+    改为监视所在目录，并在每次通知后重新登记文件路径。
+
+    Args:
+        model: 需要重新加载的模型（BaseModel）
+        debounce_ms: 合并连续修改通知的等待时间（毫秒）
+    """
+
+    def __init__(self, model, debounce_ms: int = 200, parent=None):
+        super().__init__(parent or model)
+        self._model = model
+        self._watcher = QFileSystemWatcher(self)
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(debounce_ms)
+        self._timer.timeout.connect(self._on_timeout)
+        self._watcher.fileChanged.connect(self._on_changed)
+        self._watcher.directoryChanged.connect(self._on_changed)
+        self._refresh_paths()
+
+    def _refresh_paths(self):
+        paths = set()
+        for path in self._model._storage.watch_paths():
+            if os.path.exists(path):
+                paths.add(path)
+                continue
+            directory = os.path.dirname(os.path.abspath(path))
+            if os.path.isdir(directory):
+                paths.add(directory)
+        missing = [path for path in paths
+                   if path not in self._watcher.files() and path not in self._watcher.directories()]
+        if missing:
+            self._watcher.addPaths(missing)
+
+    def _on_changed(self, path: str):
+        self._timer.start()
+
+    def _on_timeout(self):
+        self._refresh_paths()
+        self._model.reload_external()
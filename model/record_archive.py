@@ -0,0 +1,254 @@
+"""
+时间记录归档模块
+
+把只用于统计的历史时间记录存入紧凑的列式二进制文件，并以内存映射
+方式读成 NumPy 结构化数组，统计可以直接向量化计算。
+
+文件布局（data/archive/ 目录下）：
+    records.bin       定长记录：id、开始/结束/创建/修改时间、时长、类别编号、事件类型编号、描述偏移/长度
+    descriptions.bin  所有描述文本首尾相接的 UTF-8 字节
+    strings.json      类别和事件类型的字符串表，以及 records.bin 的格式版本 format
+
+格式 1 的定长记录没有 id 和结束/创建/修改时间，打开时一次性转换为当前格式：
+id 由开始时间确定地生成（格式 1 按开始时间去重，它在归档中唯一），结束时间为开始时间加时长。
+"""
+
+import json
+import os
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterator, List, Optional
+
+try:
+    import numpy as np
+except ImportError:  # numpy 是可选依赖，缺失时归档层不可用
+    np = None
+
+from .storage import atomic_write
+from .storage.schema import utc_timestamp
+
+_EPOCH = datetime(1970, 1, 1)
+_UTC_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+ARCHIVE_FORMAT = 2
+
+RECORD_DTYPE = None if np is None else np.dtype([
+    ('id', 'S32'),             # 项目 id（ASCII）
+    ('start_us', '<i8'),       # 开始时间（本地时间，距 1970-01-01 的微秒数）
+    ('end_us', '<i8'),         # 结束时间（同上），没有结束时间时为 NO_TIME
+    ('created_us', '<i8'),     # 创建时间（同上）
+    ('updated_us', '<i8'),     # 最后修改时间（UTC，距 1970-01-01 的微秒数）
+    ('duration', '<i4'),       # 时长（秒）
+    ('category', '<u2'),       # 类别在字符串表中的编号
+    ('event_type', '<u2'),     # 事件类型在字符串表中的编号
+    ('desc_offset', '<u8'),    # 描述在 descriptions.bin 中的偏移
+    ('desc_length', '<u4'),    # 描述字节长度
+])
+
+# 格式 1 的定长记录
+_FORMAT1_DTYPE = None if np is None else np.dtype([
+    ('start_us', '<i8'),
+    ('duration', '<i4'),
+    ('category', '<u2'),
+    ('event_type', '<u1'),
+    ('desc_offset', '<u8'),
+    ('desc_length', '<u4'),
+])
+
+NO_TIME = -2 ** 63
+
+
+def _to_us(value: datetime) -> int:
+    if value.tzinfo is not None:
+        return (value - _UTC_EPOCH) // _EPOCH.resolution
+    return (value - _EPOCH) // _EPOCH.resolution
+
+
+def _from_us(value: int) -> datetime:
+    return _EPOCH + timedelta(microseconds=int(value))
+
+
+def _checked(row: 'np.void', name: str, value: int) -> None:
+    """写入整数列，超出列类型的取值范围时抛出 ValueError（不静默截断）"""
+    info = np.iinfo(RECORD_DTYPE[name])
+    if not info.min <= value <= info.max:
+        raise ValueError(f"归档字段 {name} 的值 {value} 超出 {RECORD_DTYPE[name]} 的范围")
+    row[name] = value
+
+
+class RecordArchive:
+    """列式、内存映射的时间记录归档
+
+    Args:
+        directory: 归档文件所在目录
+    """
+
+    def __init__(self, directory: str = os.path.join('data', 'archive')):
+        self._dir = directory
+        self._records_path = os.path.join(directory, 'records.bin')
+        self._desc_path = os.path.join(directory, 'descriptions.bin')
+        self._strings_path = os.path.join(directory, 'strings.json')
+        self._strings = self._load_strings()
+        if self._strings.get('format', 1) < ARCHIVE_FORMAT and os.path.exists(self._records_path):
+            self._upgrade_format1()
+
+    @staticmethod
+    def available() -> bool:
+        """numpy 可用时归档层才能工作"""
+        return np is not None
+
+    def _load_strings(self) -> Dict[str, Any]:
+        try:
+            with open(self._strings_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {'format': ARCHIVE_FORMAT, 'categories': [], 'event_types': []}
+
+    def _save_strings(self) -> None:
+        self._strings['format'] = ARCHIVE_FORMAT
+        atomic_write(self._strings_path, json.dumps(self._strings, ensure_ascii=False).encode('utf-8'))
+
+    def _upgrade_format1(self) -> None:
+        """把格式 1 的 records.bin 原子地重写为当前格式"""
+        old = np.fromfile(self._records_path, dtype=_FORMAT1_DTYPE)
+        rows = np.zeros(len(old), dtype=RECORD_DTYPE)
+        for name in _FORMAT1_DTYPE.names:
+            rows[name] = old[name]
+        rows['end_us'] = old['start_us'] + old['duration'].astype('<i8') * 1_000_000
+        rows['created_us'] = old['start_us']
+        for row in rows:
+            start = _from_us(row['start_us'])
+            row['id'] = uuid.uuid5(uuid.NAMESPACE_OID, f"record-archive:{int(row['start_us'])}").hex.encode('ascii')
+            row['updated_us'] = _to_us(datetime.fromisoformat(utc_timestamp(start)))
+        atomic_write(self._records_path, rows.tobytes())
+        self._save_strings()
+        print(f"[RecordArchive] 已把 {len(rows)} 条归档记录转换为格式 {ARCHIVE_FORMAT}")
+
+    def _string_id(self, table: str, value: str) -> int:
+        values = self._strings[table]
+        if value not in values:
+            values.append(value)
+        return values.index(value)
+
+    def columns(self) -> 'np.ndarray':
+        """以只读内存映射方式返回全部归档记录（结构化数组）"""
+        size = os.path.getsize(self._records_path) if os.path.exists(self._records_path) else 0
+        count = size // RECORD_DTYPE.itemsize
+        if count == 0:
+            return np.zeros(0, dtype=RECORD_DTYPE)
+        return np.memmap(self._records_path, dtype=RECORD_DTYPE, mode='r', shape=(count,))
+
+    def __len__(self) -> int:
+        return len(self.columns())
+
+    def append(self, records: List) -> int:
+        """追加记录，已归档过（id 相同）的记录会被跳过
+
+        写入顺序为字符串表 → 描述 → 定长记录，中途崩溃最多留下无主的描述字节和不完整的末行，
+        不完整的末行在读取时被忽略、下次追加前被截掉。
+        任何字段超出列类型的范围时抛出 ValueError，这一批记录都不写入。
+
+        Args:
+            records: RecordItem 列表（start_time 不能为空）
+
+        Returns:
+            实际归档的记录数
+        """
+        archived = set(self.columns()['id'].tolist())
+        fresh = {}
+        for record in records:
+            key = record.id.encode('ascii', errors='replace')
+            if record.start_time and key not in archived:
+                fresh.setdefault(key, record)
+        records = list(fresh.values())
+        if not records:
+            return 0
+        rows = np.zeros(len(records), dtype=RECORD_DTYPE)
+        try:
+            blob = self._fill_rows(rows, records)
+        except ValueError:
+            self._strings = self._load_strings()
+            raise
+        os.makedirs(self._dir, exist_ok=True)
+        self._save_strings()
+        with open(self._desc_path, 'ab') as f:
+            f.write(blob)
+        with open(self._records_path, 'ab') as f:
+            # 上次追加中途崩溃留下的不完整行会让之后的每一行都错位：先截掉
+            size = f.seek(0, os.SEEK_END)
+            partial = size % RECORD_DTYPE.itemsize
+            if partial:
+                print(f"⚠️ [RecordArchive] 截掉 records.bin 末尾不完整的 {partial} 字节")
+                f.truncate(size - partial)
+            f.write(rows.tobytes())
+        return len(records)
+
+    def _fill_rows(self, rows: 'np.ndarray', records: List) -> bytes:
+        """填充定长记录，返回需要追加的描述字节；取值超出列类型时抛出 ValueError"""
+        offset = os.path.getsize(self._desc_path) if os.path.exists(self._desc_path) else 0
+        chunks = []
+        for row, record in zip(rows, records):
+            text = record.description.encode('utf-8')
+            key = record.id.encode('ascii')
+            if len(key) > RECORD_DTYPE['id'].itemsize:
+                raise ValueError(f"归档字段 id 过长: {record.id}")
+            row['id'] = key
+            _checked(row, 'start_us', _to_us(record.start_time))
+            _checked(row, 'end_us', _to_us(record.end_time) if record.end_time else NO_TIME)
+            _checked(row, 'created_us', _to_us(record.created_time or record.start_time))
+            _checked(row, 'updated_us', _to_us(datetime.fromisoformat(record.updated_at)))
+            _checked(row, 'duration', record.duration_seconds)
+            _checked(row, 'category', self._string_id('categories', record.category))
+            _checked(row, 'event_type', self._string_id('event_types', record.event_type))
+            _checked(row, 'desc_offset', offset)
+            _checked(row, 'desc_length', len(text))
+            offset += len(text)
+            chunks.append(text)
+        return b''.join(chunks)
+
+    def description(self, index: int) -> str:
+        """读取第 index 条归档记录的描述"""
+        row = self.columns()[index]
+        with open(self._desc_path, 'rb') as f:
+            f.seek(int(row['desc_offset']))
+            return f.read(int(row['desc_length'])).decode('utf-8')
+
+    def iter_records(self) -> Iterator[Dict[str, Any]]:
+        """按归档顺序还原为当前格式的项目字典（供首次云同步导出完整历史）"""
+        cols = self.columns()
+        if not len(cols):
+            return
+        categories, event_types = self._strings['categories'], self._strings['event_types']
+        with open(self._desc_path, 'rb') as f:
+            for row in cols:
+                f.seek(int(row['desc_offset']))
+                end_us = int(row['end_us'])
+                yield {
+                    "id": row['id'].decode('ascii'),
+                    "description": f.read(int(row['desc_length'])).decode('utf-8'),
+                    "category": categories[row['category']],
+                    "created_time": _from_us(row['created_us']).isoformat(),
+                    "updated_at": utc_timestamp(_UTC_EPOCH + timedelta(microseconds=int(row['updated_us']))),
+                    "item_type": "record",
+                    "start_time": _from_us(row['start_us']).isoformat(),
+                    "end_time": _from_us(end_us).isoformat() if end_us != NO_TIME else None,
+                    "duration_seconds": int(row['duration']),
+                    "event_type": event_types[row['event_type']],
+                }
+
+    def category_totals(self, since: Optional[datetime] = None) -> Dict[str, Dict[str, int]]:
+        """按类别向量化统计记录数和总时长
+
+        Args:
+            since: 只统计该时间之后开始的记录，None 表示全部
+        """
+        cols = self.columns()
+        if since is not None:
+            cols = cols[cols['start_us'] >= _to_us(since)]
+        names = self._strings['categories']
+        counts = np.bincount(cols['category'], minlength=len(names))
+        totals = np.bincount(cols['category'], weights=cols['duration'], minlength=len(names))
+        return {
+            name: {"count": int(counts[i]), "total_duration": int(totals[i])}
+            for i, name in enumerate(names) if counts[i]
+        }
@@ -0,0 +1,13 @@
+from .base_storage import StorageEngine
+from .json_storage import JsonStorage
+from .sqlite_storage import SqliteStorage
+from .segmented_storage import SegmentedStorage
+from .journal import MutationJournal
+from .factory import create_storage, set_default_backend
+from .background_writer import BackgroundWriter, background_writer, atomic_write
+from .schema import SCHEMA_VERSION, new_item_id, upgrade_items
+from .interprocess import FileLock, GenerationCounter, generation_counter, bump_generation, locked_write
+
+__all__ = ['StorageEngine', 'JsonStorage', 'SqliteStorage', 'SegmentedStorage', 'MutationJournal', 'create_storage', 'set_default_backend',
+           'BackgroundWriter', 'background_writer', 'atomic_write', 'SCHEMA_VERSION', 'new_item_id', 'upgrade_items',
+           'FileLock', 'GenerationCounter', 'generation_counter', 'bump_generation', 'locked_write']
@@ -0,0 +1,184 @@
+"""
+后台写入模块
+
+把数据文件的编码和写入移出 Qt 主线程：调用方在主线程捕获快照，
+由后台线程编码、写入临时文件，再原子替换目标文件。
+同一文件在写入期间到达的多次保存请求会合并为一次。
+写入时持有该文件的进程间独占锁，并增加文件的写入代数（见 interprocess 模块）。
+"""
+
+import os
+import threading
+import time
+from typing import Callable, Dict, Optional, Set, Tuple
+
+from .interprocess import locked_write
+
+# 持久化级别
+DURABILITY_ALWAYS = 'always'    # 每次写入都 fsync 文件和目录
+DURABILITY_BATCHED = 'batched'  # 每隔 batch_interval 秒统一 fsync 一次
+DURABILITY_EXIT = 'exit'        # 只在 flush()（程序退出）时 fsync
+DURABILITY_MODES = (DURABILITY_ALWAYS, DURABILITY_BATCHED, DURABILITY_EXIT)
+
+EncodeFn = Callable[[], Optional[bytes]]
+DoneFn = Callable[[bool], None]
+
+
+def fsync_path(path: str) -> None:
+    """对文件或目录执行 fsync（Windows 上目录无法打开，直接跳过）"""
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def atomic_write(path: str, payload: bytes, fsync: bool = True) -> None:
+    """写入临时文件后原子替换目标文件，崩溃时目标文件要么是旧内容要么是新内容"""
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(payload)
+        if fsync:
+            f.flush()
+            os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+    if fsync:
+        fsync_path(os.path.dirname(os.path.abspath(path)))
+
+
+class BackgroundWriter:
+    """单线程后台写入器
+
+    ``submit`` 只登记"某个文件最新的待写内容"：写入进行中再次提交同一文件时，
+    旧的待写请求被新请求替换（其 on_done 回调也一并丢弃，
+    调用方需保证新请求包含旧请求的全部内容）。
+    """
+
+    def __init__(self, durability: str = DURABILITY_BATCHED, batch_interval: float = 5.0):
+        self._cond = threading.Condition()
+        self._pending: Dict[str, Tuple[EncodeFn, Optional[DoneFn]]] = {}
+        self._busy = False
+        self._unsynced: Set[str] = set()
+        self._last_sync = time.monotonic()
+        self._thread: Optional[threading.Thread] = None
+        self.configure(durability, batch_interval)
+
+    def configure(self, durability: str, batch_interval: float = 5.0) -> None:
+        """设置持久化级别"""
+        if durability not in DURABILITY_MODES:
+            raise ValueError(f"未知的持久化级别: {durability}")
+        self.durability = durability
+        self.batch_interval = batch_interval
+
+    def submit(self, path: str, encode: EncodeFn, on_done: Optional[DoneFn] = None) -> None:
+        """登记一次写入请求
+
+        Args:
+            path: 目标文件
+            encode: 在后台线程中调用，返回要写入的字节；返回 None 表示内容未变、无需写入
+            on_done: 写入完成后在后台线程中调用，参数表示是否成功
+        """
+        with self._cond:
+            self._pending.pop(path, None)
+            self._pending[path] = (encode, on_done)
+            self._start()
+            self._cond.notify_all()
+
+    def sync_later(self, path: str) -> None:
+        """登记调用方直接写入、尚未 fsync 的文件（追加写的变更日志）
+
+        batched 模式下按间隔统一落盘，exit 模式下在 flush() 时落盘；
+        always 模式下调用方应当自己在写入后 fsync。
+        """
+        with self._cond:
+            self._unsynced.add(path)
+            self._start()
+            self._cond.notify_all()
+
+    def _start(self) -> None:
+        """启动后台线程（调用方持有锁）"""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="BackgroundWriter", daemon=True)
+            self._thread.start()
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """等待所有待写请求完成并 fsync 尚未落盘的文件
+
+        Returns:
+            是否在超时前完成
+        """
+        with self._cond:
+            done = self._cond.wait_for(lambda: not self._pending and not self._busy, timeout)
+            unsynced, self._unsynced = self._unsynced, set()
+        self._sync_files(unsynced)
+        return done
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                # 每次被唤醒都重新计算等待时间：sync_later 登记的文件也要按间隔落盘
+                if not self._pending:
+                    self._cond.wait(self._idle_timeout())
+                if not self._pending:
+                    self._sync_due_files()
+                    continue
+                path = next(iter(self._pending))
+                encode, on_done = self._pending.pop(path)
+                self._busy = True
+            ok = self._write(path, encode)
+            self._notify_done(on_done, ok)
+            with self._cond:
+                self._busy = False
+                self._sync_due_files()
+                self._cond.notify_all()
+
+    def _idle_timeout(self) -> Optional[float]:
+        """batched 模式下，有未落盘文件时按间隔唤醒执行 fsync"""
+        if self.durability != DURABILITY_BATCHED or not self._unsynced:
+            return None
+        return max(0.0, self._last_sync + self.batch_interval - time.monotonic())
+
+    def _sync_due_files(self) -> None:
+        """batched 模式下距上次 fsync 超过间隔时，统一落盘（调用方持有锁）"""
+        if self.durability != DURABILITY_BATCHED or not self._unsynced:
+            return
+        if time.monotonic() - self._last_sync >= self.batch_interval:
+            unsynced, self._unsynced = self._unsynced, set()
+            self._sync_files(unsynced)
+
+    @staticmethod
+    def _notify_done(on_done: Optional[DoneFn], ok: bool) -> None:
+        if on_done is None:
+            return
+        try:
+            on_done(ok)
+        except Exception as e:
+            print(f"[BackgroundWriter] 写入回调异常: {e}")
+
+    def _write(self, path: str, encode: EncodeFn) -> bool:
+        try:
+            payload = encode()
+            if payload is None:
+                return True
+            locked_write(path, payload, fsync=self.durability == DURABILITY_ALWAYS)
+        except Exception as e:
+            print(f"[BackgroundWriter] 写入失败 {path}: {e}")
+            return False
+        if self.durability != DURABILITY_ALWAYS:
+            with self._cond:
+                self._unsynced.add(path)
+        return True
+
+    def _sync_files(self, paths: Set[str]) -> None:
+        for path in paths:
+            fsync_path(path)
+        for directory in {os.path.dirname(os.path.abspath(p)) for p in paths}:
+            fsync_path(directory)
+        self._last_sync = time.monotonic()
+
+
+# 全局后台写入器实例
+background_writer = BackgroundWriter()
@@ -0,0 +1,106 @@
+"""
+存储引擎抽象模块
+
+定义 BaseModel 与具体持久化方式之间的接口。模型只维护内存中的
+项目列表，持久化细节（JSON 快照、变更日志、SQLite）全部由存储引擎负责。
+"""
+
+from abc import ABC, abstractmethod
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+# 返回当前全部项目 JSON 片段（按行顺序）的回调，只在引擎确实需要全量数据时才调用
+SnapshotFn = Callable[[], List[str]]
+
+
+class StorageEngine(ABC):
+    """存储引擎基类
+
+    Attributes:
+        tracks_mutations: 引擎是否需要逐条接收增量变更（apply）
+        supports_queries: 引擎是否支持下推查询（query/query_order）
+        needs_rewrite: load 时旧格式数据被升级，需要尽快整体写回
+    """
+    tracks_mutations = False
+    supports_queries = False
+    needs_rewrite = False
+
+    @abstractmethod
+    def load(self) -> List[dict]:
+        """按行顺序读取全部项目字典（已升级到当前格式版本）"""
+
+    @abstractmethod
+    def apply(self, op: str, row: int, data: Optional[dict]) -> None:
+        """接收一次增量变更
+
+        Args:
+            op: insert/remove/update/order/reset
+            row: 变更所在行
+            data: 变更后的项目字典；remove 时为 ``{"id": 项目 id}``，
+                order 时为 ``{"order": [旧行号...], "ids": [新顺序的项目 id...]}``，
+                reset（批量替换全部项目）时为 ``{"items": [...]}``
+        """
+
+    @abstractmethod
+    def save(self, snapshot: SnapshotFn) -> None:
+        """常规保存（可能是增量的、延迟的）"""
+
+    @abstractmethod
+    def flush(self, snapshot: SnapshotFn) -> None:
+        """同步把完整状态写入持久化介质"""
+
+    @abstractmethod
+    def sync_export(self, snapshot: SnapshotFn) -> str:
+        """生成供云同步上传的 JSON 文件，返回其路径"""
+
+    @property
+    @abstractmethod
+    def sync_path(self) -> str:
+        """sync_export 生成的 JSON 文件路径"""
+
+    def query(self, where: str, params: Sequence[Any] = (), order_by: str = "position") -> List[dict]:
+        """按条件查询项目字典（仅 supports_queries 为 True 时可用）"""
+        raise NotImplementedError(f"{self.__class__.__name__} 不支持查询")
+
+    def query_order(self, order_by: str) -> List[int]:
+        """按排序条件返回旧行号组成的新顺序（仅 supports_queries 为 True 时可用）"""
+        raise NotImplementedError(f"{self.__class__.__name__} 不支持查询")
+
+    def pending_partitions(self) -> List[str]:
+        """尚未加载的分区键（从新到旧），不分区的引擎返回空列表"""
+        return []
+
+    def load_partition(self, key: str) -> Tuple[int, List[dict]]:
+        """加载一个分区并并入已加载的数据
+
+        Returns:
+            (插入行号, 该分区的项目字典列表)
+        """
+        raise NotImplementedError(f"{self.__class__.__name__} 不支持分区")
+
+    def read_partition(self, key: str) -> List[dict]:
+        """只读取分区内容，不并入已加载的数据"""
+        raise NotImplementedError(f"{self.__class__.__name__} 不支持分区")
+
+    def drop_partition(self, key: str) -> None:
+        """删除一个未加载的分区"""
+        raise NotImplementedError(f"{self.__class__.__name__} 不支持分区")
+
+    def watch_paths(self) -> List[str]:
+        """其他进程写入后会发生变化的通知文件（写入代数计数器），不支持监视的引擎返回空列表"""
+        return []
+
+    def has_external_changes(self) -> bool:
+        """数据是否被其他进程修改过（按写入代数判断，自身的写入不算）"""
+        return False
+
+    def reload(self) -> List[dict]:
+        """外部修改后重新读取当前已加载范围内的全部项目"""
+        return self.load()
+
+    @property
+    def write_stats(self) -> Dict[str, int]:
+        """写入统计（writes/skipped_writes），不做全量写入的引擎返回空字典"""
+        return {}
+
+    def close(self) -> None:
+        """释放引擎持有的资源"""
@@ -0,0 +1,61 @@
+"""
+存储引擎工厂模块
+
+根据配置（config/settings.json 中的 ``data_storage.backend``）创建存储引擎，
+默认使用 JSON 后端。
+"""
+
+import os
+from typing import Optional
+
+from .base_storage import StorageEngine
+from .json_storage import JsonStorage
+from .segmented_storage import SegmentedStorage
+from .sqlite_storage import SqliteStorage, ColumnMap
+
+DATA_DIR = 'data'
+SQLITE_FILE = 'todoer.db'
+
+_default_backend = 'json'
+
+
+def set_default_backend(backend: str) -> None:
+    """设置未显式指定后端时使用的存储引擎（json/sqlite）"""
+    global _default_backend
+    if backend not in ('json', 'sqlite'):
+        raise ValueError(f"未知的存储后端: {backend}")
+    _default_backend = backend
+
+
+def create_storage(data_file: str, collection: str, items_key: str = 'items',
+                   journal: bool = False, compact_bytes: int = 256 * 1024,
+                   columns: Optional[ColumnMap] = None,
+                   backend: Optional[str] = None,
+                   segment_field: Optional[str] = None,
+                   preload_items: int = 0) -> StorageEngine:
+    """创建存储引擎
+
+    Args:
+        data_file: JSON 数据文件名（位于 data 目录下）
+        collection: 集合名，SQLite 后端以此作为表名
+        items_key: JSON 中项目列表的键
+        journal: JSON 后端是否启用变更日志
+        compact_bytes: 变更日志压缩阈值（字节）
+        columns: SQLite 后端需要建立索引的列
+        backend: 指定后端，None 表示使用默认后端
+        segment_field: JSON 后端按该时间字段的月份分段存储（data/<集合名>/YYYY-MM.json），
+            None 表示不分段
+        preload_items: 分段存储启动时至少加载的项目数
+
+    Returns:
+        存储引擎实例
+    """
+    os.makedirs(DATA_DIR, exist_ok=True)
+    data_path = os.path.join(DATA_DIR, data_file)
+    if (backend or _default_backend) == 'sqlite':
+        return SqliteStorage(os.path.join(DATA_DIR, SQLITE_FILE), collection,
+                             columns or {}, items_key, data_path + '.sync')
+    if segment_field:
+        return SegmentedStorage(os.path.join(DATA_DIR, collection), segment_field, items_key,
+                                preload_items, legacy_path=data_path)
+    return JsonStorage(data_path, items_key, journal, compact_bytes)
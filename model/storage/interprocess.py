@@ -0,0 +1,177 @@
+"""
+多进程协调模块
+
+同一个数据目录可能被多个 todoer 进程同时使用。本模块提供两样东西：
+
+- ``FileLock``：数据文件旁的 ``<文件>.lock`` 上的建议锁。读取时持共享锁，
+  写入时持独占锁，保证一个进程不会读到另一个进程写了一半的状态，
+  两个进程的写入也不会交错。
+- ``GenerationCounter``：每个目录一个 ``.generations`` 文件，记录其中每个数据文件的
+  写入代数。每次写入在持有独占锁时把代数加一；其他进程只需监视这一个小文件，
+  代数变化时才重新读取对应的数据文件，不需要轮询或比较数据文件本身。
+"""
+
+import json
+import os
+import threading
+from typing import Dict, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+GENERATION_FILE = '.generations'
+
+
+def _lock_fd(fd: int, shared: bool) -> None:
+    if fcntl is not None:
+        fcntl.flock(fd, fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+        return
+    # msvcrt 只有独占的字节区间锁；LK_LOCK 重试约 10 秒后抛出 OSError，这里一直等待
+    while True:
+        try:
+            msvcrt.locking(fd, msvcrt.LK_LOCK, 1)
+            return
+        except OSError:
+            continue
+
+
+def _unlock_fd(fd: int) -> None:
+    if fcntl is not None:
+        fcntl.flock(fd, fcntl.LOCK_UN)
+    else:
+        os.lseek(fd, 0, os.SEEK_SET)
+        msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+
+
+class FileLock:
+    """数据文件的进程间建议锁（上下文管理器）
+
+    锁加在 ``<path>.lock`` 上而不是数据文件本身：数据文件以原子替换方式写入，
+    替换后旧的 inode 上的锁就失去了意义。同一进程内的不同线程各自打开锁文件，
+    因此线程之间也同样互斥。Windows 上共享锁退化为独占锁。
+
+    Args:
+        path: 被保护的数据文件路径
+        shared: True 为共享（读）锁，False 为独占（写）锁
+    """
+
+    def __init__(self, path: str, shared: bool = False):
+        self._lock_path = path + '.lock'
+        self._shared = shared
+        self._fd: Optional[int] = None
+
+    def __enter__(self) -> 'FileLock':
+        os.makedirs(os.path.dirname(os.path.abspath(self._lock_path)), exist_ok=True)
+        self._fd = os.open(self._lock_path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            _lock_fd(self._fd, self._shared)
+        except BaseException:
+            os.close(self._fd)
+            self._fd = None
+            raise
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        try:
+            _unlock_fd(self._fd)
+        finally:
+            os.close(self._fd)
+            self._fd = None
+
+
+class GenerationCounter:
+    """目录级的写入代数计数器
+
+    计数文件就地改写（不做原子替换），文件监视器登记的路径因此一直有效。
+    计数文件自身用同一种建议锁保护。
+
+    Args:
+        directory: 数据文件所在目录
+    """
+
+    def __init__(self, directory: str):
+        self._path = os.path.join(directory, GENERATION_FILE)
+        self._own: Dict[str, int] = {}
+        self._own_lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+        if not os.path.exists(self._path):
+            with FileLock(self._path):
+                if not os.path.exists(self._path):
+                    with open(self._path, 'w', encoding='utf-8') as f:
+                        f.write('{}')
+
+    @property
+    def path(self) -> str:
+        return self._path
+
+    def read(self) -> Dict[str, int]:
+        """读取目录中全部文件的当前代数"""
+        with FileLock(self._path, shared=True):
+            return self._read()
+
+    def get(self, name: str) -> int:
+        """读取一个文件的当前代数，从未写入过的文件为 0"""
+        return self.read().get(name, 0)
+
+    def bump(self, name: str) -> int:
+        """把一个文件的代数加一，返回新的代数（调用方应持有该数据文件的独占锁）"""
+        with FileLock(self._path):
+            generations = self._read()
+            generation = generations.get(name, 0) + 1
+            generations[name] = generation
+            with open(self._path, 'r+', encoding='utf-8') as f:
+                f.write(json.dumps(generations, ensure_ascii=False))
+                f.truncate()
+        with self._own_lock:
+            self._own[name] = generation
+        return generation
+
+    def own_generation(self, name: str) -> int:
+        """本进程最近一次写入该文件后得到的代数，从未写入过为 0"""
+        with self._own_lock:
+            return self._own.get(name, 0)
+
+    def _read(self) -> Dict[str, int]:
+        try:
+            with open(self._path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return {}
+
+
+_counters: Dict[str, GenerationCounter] = {}
+_counters_lock = threading.Lock()
+
+
+def generation_counter(directory: str) -> GenerationCounter:
+    """返回目录的计数器（同一目录在进程内共用一个实例）"""
+    directory = os.path.abspath(directory)
+    with _counters_lock:
+        counter = _counters.get(directory)
+        if counter is None:
+            counter = _counters[directory] = GenerationCounter(directory)
+        return counter
+
+
+def _counter_of(path: str) -> GenerationCounter:
+    return generation_counter(os.path.dirname(os.path.abspath(path)))
+
+
+def bump_generation(path: str) -> int:
+    """数据文件写入后把它的代数加一"""
+    return _counter_of(path).bump(os.path.basename(path))
+
+
+def locked_write(path: str, payload: bytes, fsync: bool = True) -> int:
+    """在独占锁内原子写入数据文件并增加其代数
+
+    Returns:
+        写入后的代数
+    """
+    from .background_writer import atomic_write
+    with FileLock(path):
+        atomic_write(path, payload, fsync)
+        return bump_generation(path)
@@ -0,0 +1,285 @@
+"""
+变更日志模块
+
+以追加写的方式记录模型的增量变更，避免每次修改都重写整个快照文件。
+日志超过阈值后由后台写入器压缩进快照文件。
+"""
+
+import contextlib
+import json
+import os
+import threading
+from typing import Dict, List, Optional
+
+from .background_writer import DURABILITY_ALWAYS, BackgroundWriter, fsync_path, background_writer
+from .interprocess import FileLock
+
+
+class MutationJournal:
+    """追加写的变更日志
+
+    每条记录是一行 JSON：``{"seq", "op", "row", "id", "data"}``。记录按项目 id 指向目标，
+    row 只是插入位置的提示：多个进程向同一日志追加时，另一个进程移动过的行号不会让变更落到别的项目上。
+    序号取自共享的日志文件（持有独占锁时读取最后一行），不同进程的记录不会重号；
+    截断时即使不保留任何记录也写入一行只带序号的标记，序号不会回退。
+    快照文件中保存 ``journal_seq``，回放时跳过已包含在快照中的记录，
+    保证压缩过程中崩溃也不会重复应用变更。
+
+    Args:
+        path: 日志文件路径
+        compact_threshold: 压缩阈值（字节）
+        lock_path: 追加和截断时持有该数据文件的进程间独占锁（通常是快照文件），
+            None 表示不加锁
+        writer: 按其持久化级别落盘：always 每次追加后 fsync，batched/exit 交给写入器
+            按间隔或在 flush() 时 fsync；默认使用全局实例
+
+    Attributes:
+        seq: 已知的最大序号
+        applied_seq: 内存中的数据已包含的最大序号（其他进程追加了记录、尚未重新加载时落后于 seq），
+            压缩只能截断到这里
+    """
+
+    def __init__(self, path: str, compact_threshold: int = 256 * 1024, lock_path: Optional[str] = None,
+                 writer: Optional[BackgroundWriter] = None):
+        self._path = path
+        self._writer = writer or background_writer
+        self._compact_threshold = compact_threshold
+        self._lock_path = lock_path
+        self._lock = threading.Lock()
+        self._compacting = False
+        self.seq = 0
+        self.applied_seq = 0
+
+    @property
+    def path(self) -> str:
+        return self._path
+
+    def append(self, op: str, row: int, data: Optional[dict] = None, item_id: Optional[str] = None) -> None:
+        """追加一条变更记录
+
+        Args:
+            op: 操作类型（insert/remove/update/order/reset）
+            row: 变更所在行（回放时只作为插入位置的提示）
+            data: 变更后的项目字典；order 时为 ``{"order": [旧行号...], "ids": [新顺序的项目 id...]}``，
+                reset 时为 ``{"items": [全部项目字典...]}``，remove 时为 None
+            item_id: 变更的项目 id，省略时取 data 中的 id
+        """
+        if item_id is None and data is not None:
+            item_id = data.get('id')
+        with self._lock, self._file_lock():
+            last = max(self.seq, self._last_seq())
+            # 上次读取或追加之后没有其他进程的记录时，内存中的数据仍然包含全部记录
+            current = last == self.applied_seq
+            self.seq = last + 1
+            if current:
+                self.applied_seq = self.seq
+            record = {"seq": self.seq, "op": op, "row": row, "id": item_id, "data": data}
+            line = json.dumps(record, ensure_ascii=False, separators=(',', ':'))
+            created = not os.path.exists(self._path)
+            with open(self._path, 'a', encoding='utf-8') as f:
+                f.write(line + '\n')
+                if self._writer.durability == DURABILITY_ALWAYS:
+                    f.flush()
+                    os.fsync(f.fileno())
+            if self._writer.durability != DURABILITY_ALWAYS:
+                self._writer.sync_later(self._path)
+            elif created:
+                fsync_path(os.path.dirname(os.path.abspath(self._path)))
+
+    def _last_seq(self) -> int:
+        """日志文件最后一条完整记录的序号（调用方持有锁），从文件末尾向前读取"""
+        try:
+            with open(self._path, 'rb') as f:
+                end = f.seek(0, os.SEEK_END)
+                position, tail = end, b''
+                while position > 0:
+                    step = min(4096, position)
+                    position -= step
+                    f.seek(position)
+                    tail = f.read(step) + tail
+                    lines = tail.rstrip(b'\n').split(b'\n')
+                    if len(lines) > 1 or position == 0:
+                        seq = self._line_seq(lines[-1].decode('utf-8', 'replace'))
+                        if seq >= 0:
+                            return seq
+                        # 最后一行是崩溃时写了一半的记录：逐行扫描整个文件
+                        f.seek(0)
+                        return max((self._line_seq(line.decode('utf-8', 'replace')) for line in f), default=0)
+        except OSError:
+            pass
+        return 0
+
+    def _file_lock(self):
+        return FileLock(self._lock_path) if self._lock_path else contextlib.nullcontext()
+
+    def replay(self, snapshot_seq: int) -> List[dict]:
+        """读取快照之后的所有记录
+
+        因崩溃而写了一半的行会被跳过。调用方负责持有读取快照时的共享锁。
+
+        Args:
+            snapshot_seq: 快照中已包含的最大序号
+
+        Returns:
+            需要按顺序重新应用的记录列表
+        """
+        records = []
+        with self._lock:
+            if not os.path.exists(self._path):
+                self.seq = max(self.seq, snapshot_seq)
+                return records
+            with open(self._path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue
+                    if record["seq"] > snapshot_seq:
+                        records.append(record)
+        last_seq = max(self._last_seq(), records[-1]["seq"] if records else 0)
+        self.seq = max(self.seq, snapshot_seq, last_seq)
+        self.applied_seq = self.seq
+        return records
+
+    def size(self) -> int:
+        """返回日志文件的字节数"""
+        try:
+            return os.path.getsize(self._path)
+        except OSError:
+            return 0
+
+    def needs_compaction(self) -> bool:
+        """日志是否超过阈值且当前没有进行中的压缩"""
+        return not self._compacting and self.size() >= self._compact_threshold
+
+    def begin_compaction(self) -> int:
+        """开始一次压缩，返回内存数据已包含的序号（applied_seq）
+
+        调用方必须在同一线程内捕获与该序号一致的快照，写入完成后
+        以返回的序号调用 ``finish_compaction``。其他进程追加的、尚未重新加载的记录序号更大，
+        不会被截断，回放时再应用（按 id 回放，对快照中已有的本进程记录是幂等的）。
+        """
+        self._compacting = True
+        return self.applied_seq
+
+    def finish_compaction(self, seq: int, ok: bool) -> None:
+        """快照写入完成后丢弃日志中已被快照覆盖的记录
+
+        Args:
+            seq: ``begin_compaction`` 返回的序号
+            ok: 快照是否写入成功，失败时保留日志不动
+        """
+        try:
+            if ok:
+                self._truncate_through(seq)
+        except OSError as e:
+            print(f"[MutationJournal] 日志压缩失败: {e}")
+        finally:
+            self._compacting = False
+
+    def _truncate_through(self, seq: int) -> None:
+        """只保留序号大于 seq 的记录，原子替换日志文件
+
+        按序号而不是字节偏移截断，多次压缩的完成顺序与发起顺序不一致时也不会丢记录。
+        """
+        with self._lock, self._file_lock():
+            if not os.path.exists(self._path):
+                return
+            with open(self._path, 'r', encoding='utf-8') as f:
+                lines = f.readlines()
+            tail = [line for line in lines if self._line_seq(line) > seq]
+            if not tail:
+                # 保留最大序号，之后追加的记录不会与快照中的 journal_seq 重号
+                last = max([self.seq, *(self._line_seq(line) for line in lines)])
+                tail = [json.dumps({"seq": last, "op": "mark"}) + '\n']
+            always = self._writer.durability == DURABILITY_ALWAYS
+            tmp_path = self._path + '.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                f.writelines(tail)
+                if always:
+                    f.flush()
+                    os.fsync(f.fileno())
+            os.replace(tmp_path, self._path)
+            if always:
+                fsync_path(os.path.dirname(os.path.abspath(self._path)))
+            else:
+                self._writer.sync_later(self._path)
+
+    @staticmethod
+    def _line_seq(line: str) -> int:
+        """解析一行记录的序号，损坏的行返回 -1（压缩时直接丢弃）"""
+        try:
+            return json.loads(line)["seq"]
+        except (json.JSONDecodeError, KeyError):
+            return -1
+
+
+def apply_records(items: List[dict], records: List[dict]) -> None:
+    """按顺序把日志记录重新应用到项目字典列表上（原地修改）"""
+    index: Optional[Dict[str, int]] = None
+    for record in records:
+        if index is None:
+            index = {item.get('id'): row for row, item in enumerate(items)}
+        if apply_record(items, record, index):
+            index = None
+
+
+def apply_record(items: List[dict], record: dict, index: Optional[Dict[str, int]] = None) -> bool:
+    """将一条日志记录重新应用到项目字典列表上
+
+    带 id 的记录按 id 定位：insert 遇到已有的 id 时替换（重复回放是幂等的），
+    update 和 remove 的目标不存在时跳过（已被其他进程删除）。旧版不带 id 的记录按行号应用。
+
+    Args:
+        items: 按行排列的项目字典列表（原地修改）
+        record: ``MutationJournal.append`` 写入的记录
+        index: 项目 id -> 行号，None 时现场查找
+
+    Returns:
+        行的位置是否发生了变化（调用方据此重建 index）
+    """
+    op, row, data = record["op"], record.get("row", 0), record.get("data")
+    if op == "mark":
+        return False
+    if "id" not in record:
+        return _apply_by_row(items, op, row, data)
+    item_id = record["id"]
+    if index is None:
+        index = {item.get('id'): position for position, item in enumerate(items)}
+    position = index.get(item_id)
+    if op == "insert":
+        if position is not None:
+            items[position] = data
+            return False
+        items.insert(min(max(row, 0), len(items)), data)
+        return True
+    if op == "update":
+        if position is not None:
+            items[position] = data
+        return False
+    if op == "remove":
+        if position is None:
+            return False
+        del items[position]
+        return True
+    if op == "order" and "ids" in data:
+        # 按 id 排序；其他进程新增、不在排序列表中的项目保持相对顺序排在最后
+        rank = {item_id: position for position, item_id in enumerate(data["ids"])}
+        items.sort(key=lambda item: rank.get(item.get('id'), len(rank)))
+        return True
+    return _apply_by_row(items, op, row, data)
+
+
+def _apply_by_row(items: List[dict], op: str, row: int, data: Optional[dict]) -> bool:
+    if op == "insert":
+        items.insert(row, data)
+    elif op == "remove" and 0 <= row < len(items):
+        del items[row]
+    elif op == "update" and 0 <= row < len(items):
+        items[row] = data
+        return False
+    elif op == "order" and len(data["order"]) == len(items):
+        items[:] = [items[i] for i in data["order"]]
+    elif op == "reset":
+        items[:] = data["items"]
+    return True
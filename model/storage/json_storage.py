@@ -0,0 +1,172 @@
+"""
+JSON 存储引擎模块
+
+默认的存储方式：单个 JSON 快照文件，可选地配合追加写的变更日志。
+快照（各项目缓存的 JSON 片段）在主线程捕获，由后台写入器拼接并原子替换到磁盘；
+内容哈希与上次写入相同时跳过写入。读到旧格式版本的文件时在加载后整体写回新格式。
+读取持有进程间共享锁，外部修改通过目录的写入代数计数器发现。
+"""
+
+import hashlib
+import json
+import os
+import threading
+from typing import Dict, List, Optional
+
+from .background_writer import BackgroundWriter, background_writer
+from .base_storage import StorageEngine, SnapshotFn
+from .interprocess import FileLock, generation_counter
+from .journal import MutationJournal, apply_records
+from .schema import SCHEMA_VERSION, document_version, upgrade_items
+
+
+class JsonStorage(StorageEngine):
+    """JSON 快照 + 可选变更日志
+
+    Args:
+        path: 快照文件路径
+        items_key: 快照中存放项目列表的键（items/events）
+        journal: 是否启用变更日志模式
+        compact_bytes: 日志压缩阈值（字节）
+        writer: 后台写入器，默认使用全局实例
+    """
+
+    def __init__(self, path: str, items_key: str = 'items', journal: bool = False,
+                 compact_bytes: int = 256 * 1024, writer: Optional[BackgroundWriter] = None):
+        self._path = path
+        self._writer = writer or background_writer
+        self._items_key = items_key
+        self._last_digest: Optional[bytes] = None
+        self._stats = {'writes': 0, 'skipped_writes': 0}
+        self._journal: Optional[MutationJournal] = None
+        if journal:
+            self._journal = MutationJournal(path + '.journal', compact_bytes, lock_path=path, writer=self._writer)
+        # 已读取或自身写入的最新代数，计数器中的代数超过它说明其他进程写过该文件；
+        # 写入进行中时不做判断。写入器会合并同一文件的请求并丢弃旧请求的回调，
+        # 因此按提交序号而不是计数判断是否仍在写入
+        self._counter = generation_counter(os.path.dirname(os.path.abspath(path)))
+        self._name = os.path.basename(path)
+        self._generation = 0
+        self._external_pending = False
+        self._submitted = 0
+        self._completed = 0
+        self._submit_lock = threading.Lock()
+        self._ensure_file()
+
+    @property
+    def tracks_mutations(self) -> bool:
+        return self._journal is not None
+
+    @property
+    def sync_path(self) -> str:
+        return self._path
+
+    @property
+    def write_stats(self) -> Dict[str, int]:
+        return dict(self._stats)
+
+    def _ensure_file(self):
+        os.makedirs(os.path.dirname(self._path) or '.', exist_ok=True)
+        if not os.path.exists(self._path):
+            with open(self._path, 'w', encoding='utf-8') as f:
+                json.dump({'schema_version': SCHEMA_VERSION, self._items_key: []}, f)
+
+    def watch_paths(self) -> List[str]:
+        return [self._counter.path]
+
+    @property
+    def writing(self) -> bool:
+        """是否有已提交但尚未完成的后台写入"""
+        with self._submit_lock:
+            return self._completed < self._submitted
+
+    def has_external_changes(self) -> bool:
+        if self.writing:
+            return False
+        return self._external_pending or self._counter.get(self._name) != self._generation
+
+    def load(self) -> List[dict]:
+        # 快照和日志在同一把共享锁内读取，不会读到其他进程写了一半的状态
+        with FileLock(self._path, shared=True):
+            self._generation = self._counter.get(self._name)
+            self._external_pending = False
+            try:
+                with open(self._path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+            except (FileNotFoundError, json.JSONDecodeError):
+                return []
+            items = data.get('items', data.get('events', []))
+            if self._journal:
+                apply_records(items, self._journal.replay(data.get('journal_seq', 0)))
+        # 日志记录在升级前回放：迁移是幂等的，新旧格式混在一起也只需一次遍历
+        version = document_version(data)
+        if version < SCHEMA_VERSION:
+            upgrade_items(items, version)
+            self.needs_rewrite = True
+        return items
+
+    def apply(self, op: str, row: int, data: Optional[dict]) -> None:
+        if self._journal:
+            # 追加前其他进程已经写过：记录按 id 定位，不受本地过时行号影响；
+            # 记下来让监视器随后重新加载，重新加载之前压缩不会截断其他进程的记录（见 applied_seq）
+            if self._counter.get(self._name) != self._generation and not self.writing:
+                self._external_pending = True
+            self._journal.append(op, row, data)
+            self._generation = self._counter.bump(self._name)
+
+    def save(self, snapshot: SnapshotFn) -> None:
+        """日志模式下变更已追加落盘，只在日志过大时后台压缩"""
+        if not self._journal:
+            self._submit(snapshot())
+        elif self.needs_rewrite or self._journal.needs_compaction():
+            self._compact(snapshot)
+
+    def flush(self, snapshot: SnapshotFn) -> None:
+        if self._journal:
+            self._compact(snapshot)
+        else:
+            self._submit(snapshot())
+        self._writer.flush()
+
+    def sync_export(self, snapshot: SnapshotFn) -> str:
+        self.flush(snapshot)
+        return self._path
+
+    def _compact(self, snapshot: SnapshotFn):
+        # 快照必须与日志序号在同一线程内捕获，保证二者一致
+        seq = self._journal.begin_compaction()
+        self._submit(snapshot(), lambda ok: self._journal.finish_compaction(seq, ok), seq)
+
+    def _submit(self, fragments: List[str], on_done=None, seq: Optional[int] = None):
+        """seq 为快照包含的日志序号（写入 journal_seq），非日志模式为 None"""
+        self.needs_rewrite = False
+        with self._submit_lock:
+            self._submitted += 1
+            ticket = self._submitted
+
+        def done(ok: bool):
+            if not ok:
+                self._last_digest = None
+            if on_done:
+                on_done(ok)
+            with self._submit_lock:
+                self._generation = max(self._generation, self._counter.own_generation(self._name))
+                self._completed = max(self._completed, ticket)
+        self._writer.submit(self._path, lambda: self._encode(fragments, seq), done)
+
+    def _encode(self, fragments: List[str], seq: Optional[int]) -> Optional[bytes]:
+        """在后台线程中拼接快照；项目内容与上次写入完全相同时返回 None
+
+        哈希只覆盖项目内容：内容未变时即使 journal_seq 前进也无需重写，
+        文件中较旧的 journal_seq 只会让回放多检查几条已被截断的记录。
+        """
+        body = ',\n'.join(fragments).encode('utf-8')
+        digest = hashlib.blake2b(body, digest_size=16).digest()
+        if digest == self._last_digest:
+            self._stats['skipped_writes'] += 1
+            return None
+        self._last_digest = digest
+        self._stats['writes'] += 1
+        tail = f',"journal_seq":{seq}' if seq is not None else ''
+        head = f'{{"schema_version":{SCHEMA_VERSION},' + json.dumps(self._items_key) + ':[\n'
+        return head.encode('utf-8') + body + f'\n]{tail}}}\n'.encode('utf-8')
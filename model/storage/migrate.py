@@ -0,0 +1,77 @@
+"""
+存储迁移工具
+
+一次性把 JSON 数据文件（含未压缩的变更日志）导入 SQLite 数据库::
+
+    python -m model.storage.migrate          # 迁移全部集合，数据库中已有数据的集合会跳过
+    python -m model.storage.migrate --force  # 覆盖数据库中已有的数据
+
+迁移完成后把 config/settings.json 中的 ``data_storage.backend`` 改为 ``sqlite``。
+"""
+
+import argparse
+import os
+
+from .factory import DATA_DIR, SQLITE_FILE
+from .json_storage import JsonStorage
+from .segmented_storage import SegmentedStorage
+from .sqlite_storage import SqliteStorage
+
+
+def _collections():
+    """返回 (数据文件, 集合名, 项目键, 索引列, 分段字段) 列表"""
+    from model.todo_model import TodoModel
+    from model.event_model import EventModel
+    return [
+        ('todo_events.json', 'todo_events', 'items', TodoModel.storage_columns,
+         TodoModel.storage_segment_field),
+        ('event_records.json', 'event_records', 'events', EventModel.storage_columns,
+         EventModel.storage_segment_field),
+    ]
+
+
+def _read_json_items(json_path: str, table: str, items_key: str, segment_field) -> list:
+    """读取 JSON 后端的全部项目（分段存储时读取所有月度分段）"""
+    if not segment_field:
+        return JsonStorage(json_path, items_key, journal=True).load()
+    segments = SegmentedStorage(os.path.join(DATA_DIR, table), segment_field, items_key,
+                                legacy_path=json_path)
+    return [item for key in segments.segment_keys() for item in segments.read_partition(key)]
+
+
+def migrate_collection(data_file: str, table: str, items_key: str, columns: dict,
+                       segment_field=None, force: bool = False) -> int:
+    """迁移单个集合
+
+    Returns:
+        导入的项目数量；跳过时返回 -1
+    """
+    json_path = os.path.join(DATA_DIR, data_file)
+    if not os.path.exists(json_path) and not os.path.isdir(os.path.join(DATA_DIR, table)):
+        return -1
+    items = _read_json_items(json_path, table, items_key, segment_field)
+    target = SqliteStorage(os.path.join(DATA_DIR, SQLITE_FILE), table, columns, items_key)
+    try:
+        if target.load() and not force:
+            return -1
+        target.replace_all(items)
+        return len(items)
+    finally:
+        target.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="将 JSON 数据迁移到 SQLite 存储后端")
+    parser.add_argument('--force', action='store_true', help="覆盖数据库中已有的数据")
+    args = parser.parse_args()
+    for data_file, table, items_key, columns, segment_field in _collections():
+        count = migrate_collection(data_file, table, items_key, columns, segment_field, args.force)
+        if count < 0:
+            print(f"⏭️ [迁移] 跳过 {table}（源文件不存在或数据库已有数据，可使用 --force）")
+        else:
+            print(f"✅ [迁移] {table}: 导入 {count} 条")
+    print("请将 config/settings.json 中的 data_storage.backend 设置为 \"sqlite\"")
+
+
+if __name__ == '__main__':
+    main()
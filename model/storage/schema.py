@@ -0,0 +1,104 @@
+"""
+数据文件格式版本模块
+
+快照文件头部的 ``schema_version`` 标记项目字典的格式版本，缺失时视为 v1。
+读取旧版本数据时按版本号依次执行迁移函数，所有迁移步骤在一次遍历中完成。
+
+版本历史：
+    v1  待办事项同时写 description/text、created_time/createtime，
+        时间记录同时写 description/event_description
+    v2  去掉上述重复的兼容字段，description 和 created_time 始终存在
+    v3  每个项目带稳定的唯一标识 id
+    v4  每个项目带最后修改时间 updated_at（UTC ISO 字符串），用于增量云同步
+"""
+
+import uuid
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List
+
+SCHEMA_VERSION = 4
+
+
+def new_item_id() -> str:
+    """生成项目的唯一标识"""
+    return uuid.uuid4().hex
+
+
+def utc_timestamp(moment: datetime = None) -> str:
+    """返回 updated_at 使用的时间戳：UTC、毫秒精度的 ISO 字符串，可直接按字符串比较
+
+    Args:
+        moment: 要转换的时间，None 表示当前时间；不带时区的时间按本地时间解释
+    """
+    moment = moment.astimezone(timezone.utc) if moment else datetime.now(timezone.utc)
+    return moment.isoformat(timespec='milliseconds')
+
+
+def _v1_to_v2(item: Dict[str, Any]) -> None:
+    """合并 v1 的重复字段；对已经是 v2 的字典不做任何改动"""
+    text = item.pop('text', None)
+    event_description = item.pop('event_description', None)
+    createtime = item.pop('createtime', None)
+    if 'description' not in item:
+        item['description'] = text if text is not None else (event_description or "")
+    if 'item_type' not in item:
+        item['item_type'] = 'record' if 'start_time' in item else 'todo'
+    if not item.get('created_time'):
+        try:
+            created = datetime.strptime(createtime, '%Y-%m-%d')
+        except (TypeError, ValueError):
+            created = datetime.now()
+        item['created_time'] = created.isoformat()
+
+
+def _v2_to_v3(item: Dict[str, Any]) -> None:
+    """为没有标识的项目分配 id：由项目内容确定地生成，同一份旧数据在每台设备、每次升级得到相同的 id"""
+    if not item.get('id'):
+        key = '|'.join(str(item.get(name) or '') for name in ('item_type', 'created_time', 'start_time', 'description'))
+        item['id'] = uuid.uuid5(uuid.NAMESPACE_OID, f"todoer-item:{key}").hex
+
+
+def _v3_to_v4(item: Dict[str, Any]) -> None:
+    """以创建时间作为旧项目的最后修改时间：同一份数据在不同设备上升级结果一致"""
+    if not item.get('updated_at'):
+        try:
+            item['updated_at'] = utc_timestamp(datetime.fromisoformat(item['created_time']))
+        except (KeyError, TypeError, ValueError):
+            item['updated_at'] = utc_timestamp()
+
+
+# MIGRATIONS[v] 把 v 版本的项目字典原地升级到 v + 1。
+# 迁移函数必须是幂等的：变更日志中可能混有新旧两种格式的记录。
+MIGRATIONS: Dict[int, Callable[[Dict[str, Any]], None]] = {
+    1: _v1_to_v2,
+    2: _v2_to_v3,
+    3: _v3_to_v4,
+}
+
+
+def document_version(document: Dict[str, Any]) -> int:
+    """返回快照文档的格式版本，没有版本头的旧文件为 v1"""
+    return document.get('schema_version', 1)
+
+
+def upgrade_items(items: List[Dict[str, Any]], version: int) -> List[Dict[str, Any]]:
+    """把 version 版本的项目字典原地升级到 SCHEMA_VERSION
+
+    Args:
+        items: 项目字典列表
+        version: 数据当前的格式版本
+
+    Returns:
+        升级后的同一个列表
+    """
+    if version > SCHEMA_VERSION:
+        print(f"⚠️ [Schema] 数据格式版本 v{version} 高于当前支持的 v{SCHEMA_VERSION}，按原样读取")
+        return items
+    steps = [MIGRATIONS[v] for v in range(version, SCHEMA_VERSION)]
+    if steps:
+        for item in items:
+            # 损坏的行（不是字典）原样保留，由模型加载时跳过
+            if isinstance(item, dict):
+                for step in steps:
+                    step(item)
+    return items
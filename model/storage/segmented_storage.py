@@ -0,0 +1,229 @@
+"""
+按月分段的 JSON 存储引擎模块
+
+把一个集合拆成 ``<目录>/YYYY-MM.json`` 形式的月度分段文件，每个分段是一个
+普通的 JsonStorage。启动时只加载当月及之后的分段（项目数不足 preload_items
+时再向前补足），更早的分段按需加载；保存时只写被修改过的分段。
+"""
+
+import json
+import os
+import re
+from datetime import datetime
+from typing import Dict, List, Optional, Set, Tuple
+
+from .background_writer import BackgroundWriter, atomic_write, background_writer
+from .base_storage import StorageEngine, SnapshotFn
+from .interprocess import FileLock, bump_generation, generation_counter, locked_write
+from .json_storage import JsonStorage
+from .schema import SCHEMA_VERSION
+
+_SEGMENT_NAME = re.compile(r'^(\d{4}-\d{2})\.json$')
+
+
+class SegmentedStorage(StorageEngine):
+    """按月分段的 JSON 存储
+
+    分段键取自项目的 segment_field（缺失时用 created_time）的年月前缀。
+    新插入的项目应当落在已加载的分段中：EventModel 按 end_time 分段，
+    新记录总是属于当月；若落在未加载的旧分段，则改存入当月分段，
+    避免覆盖磁盘上尚未加载的内容。
+
+    Args:
+        directory: 分段文件所在目录
+        segment_field: 决定分段的时间字段
+        items_key: 分段文件中存放项目列表的键
+        preload_items: 启动时至少加载的项目数（不足时继续加载更早的分段）
+        legacy_path: 分段前的单文件路径，存在时会被一次性拆分
+        writer: 后台写入器，默认使用全局实例
+    """
+    tracks_mutations = True
+
+    def __init__(self, directory: str, segment_field: str, items_key: str = 'items',
+                 preload_items: int = 0, legacy_path: str = '',
+                 writer: Optional[BackgroundWriter] = None):
+        self._dir = directory
+        self._field = segment_field
+        self._items_key = items_key
+        self._preload_items = preload_items
+        self._writer = writer or background_writer
+        self._sync_path = directory + '.sync.json'
+        self._segments: Dict[str, JsonStorage] = {}   # 已加载的分段
+        self._row_keys: List[str] = []                # 每个已加载行所属的分段
+        self._dirty: Set[str] = set()
+        os.makedirs(directory, exist_ok=True)
+        # 各分段共用目录的代数计数器，新建分段也会体现在同一个文件里
+        self._counter = generation_counter(directory)
+        if legacy_path and os.path.exists(legacy_path) and not self.segment_keys():
+            self._split_legacy(legacy_path)
+
+    @property
+    def sync_path(self) -> str:
+        return self._sync_path
+
+    @property
+    def needs_rewrite(self) -> bool:
+        return bool(self._dirty)
+
+    @property
+    def write_stats(self) -> Dict[str, int]:
+        stats = {'writes': 0, 'skipped_writes': 0}
+        for segment in self._segments.values():
+            for name, value in segment.write_stats.items():
+                stats[name] += value
+        return stats
+
+    def _segment_key(self, data: dict) -> str:
+        value = data.get(self._field) or data.get('created_time') or ''
+        return value[:7] or datetime.now().strftime('%Y-%m')
+
+    def _segment_path(self, key: str) -> str:
+        return os.path.join(self._dir, f"{key}.json")
+
+    def segment_keys(self) -> List[str]:
+        """磁盘上全部分段的键，按时间升序"""
+        names = (_SEGMENT_NAME.match(name) for name in os.listdir(self._dir))
+        return sorted(match.group(1) for match in names if match)
+
+    def _write_segments(self, groups: Dict[str, List[dict]]):
+        """同步写出整个分段（用于拆分旧文件）"""
+        for key, items in groups.items():
+            document = {'schema_version': SCHEMA_VERSION, self._items_key: items}
+            locked_write(self._segment_path(key), json.dumps(document, ensure_ascii=False).encode('utf-8'))
+
+    def _group(self, items: List[dict]) -> Dict[str, List[dict]]:
+        groups: Dict[str, List[dict]] = {}
+        for item in items:
+            groups.setdefault(self._segment_key(item), []).append(item)
+        return groups
+
+    def _split_legacy(self, legacy_path: str):
+        """把分段前的单个数据文件拆成月度分段，原文件保留为 .bak"""
+        items = JsonStorage(legacy_path, self._items_key, writer=self._writer).load()
+        self._write_segments(self._group(items))
+        os.replace(legacy_path, legacy_path + '.bak')
+        print(f"📦 [SegmentedStorage] 已将 {legacy_path} 拆分为月度分段（{len(items)} 条）")
+
+    def _open_segment(self, key: str) -> List[dict]:
+        """读取分段并登记为已加载，已打开的分段复用原来的 JsonStorage"""
+        segment = self._segments.get(key) or JsonStorage(
+            self._segment_path(key), self._items_key, writer=self._writer)
+        self._segments[key] = segment
+        items = segment.load()
+        if segment.needs_rewrite:
+            self._dirty.add(key)
+        return items
+
+    def load(self) -> List[dict]:
+        self._segments.clear()
+        self._row_keys = []
+        self._dirty.clear()
+        current = datetime.now().strftime('%Y-%m')
+        items: List[dict] = []
+        for key in reversed(self.segment_keys()):
+            if key < current and len(items) >= self._preload_items:
+                break
+            segment_items = self._open_segment(key)
+            items[0:0] = segment_items
+            self._row_keys[0:0] = [key] * len(segment_items)
+        return items
+
+    def watch_paths(self) -> List[str]:
+        return [self._counter.path]
+
+    def _new_current_keys(self) -> List[str]:
+        """磁盘上出现的、尚未加载的当月及之后的分段"""
+        current = datetime.now().strftime('%Y-%m')
+        return [key for key in self.segment_keys() if key >= current and key not in self._segments]
+
+    def has_external_changes(self) -> bool:
+        # 还有未写出或正在写出的本地修改时不重新加载，否则会丢掉这些修改
+        if self._dirty or any(segment.writing for segment in self._segments.values()):
+            return False
+        return (any(segment.has_external_changes() for segment in self._segments.values())
+                or bool(self._new_current_keys()))
+
+    def reload(self) -> List[dict]:
+        """重新读取已加载的分段（以及新出现的当月分段），保持按需加载过的范围"""
+        keys = sorted(set(self._segments) | set(self._new_current_keys()))
+        self._row_keys = []
+        self._dirty.clear()
+        items: List[dict] = []
+        for key in keys:
+            segment_items = self._open_segment(key)
+            items.extend(segment_items)
+            self._row_keys.extend([key] * len(segment_items))
+        return items
+
+    def pending_partitions(self) -> List[str]:
+        return [key for key in reversed(self.segment_keys()) if key not in self._segments]
+
+    def load_partition(self, key: str) -> Tuple[int, List[dict]]:
+        items = self._open_segment(key)
+        row = next((i for i, k in enumerate(self._row_keys) if k > key), len(self._row_keys))
+        self._row_keys[row:row] = [key] * len(items)
+        return row, items
+
+    def read_partition(self, key: str) -> List[dict]:
+        return JsonStorage(self._segment_path(key), self._items_key, writer=self._writer).load()
+
+    def drop_partition(self, key: str) -> None:
+        if key in self._segments:
+            raise ValueError(f"分段 {key} 已加载，不能删除")
+        path = self._segment_path(key)
+        with FileLock(path):
+            os.remove(path)
+            bump_generation(path)
+
+    def _loaded_key(self, data: dict) -> str:
+        """新项目所属的分段；对应分段存在但未加载时改用当月分段"""
+        key = self._segment_key(data)
+        if key not in self._segments and os.path.exists(self._segment_path(key)):
+            key = datetime.now().strftime('%Y-%m')
+        if key not in self._segments:
+            self._segments[key] = JsonStorage(self._segment_path(key), self._items_key, writer=self._writer)
+        return key
+
+    def apply(self, op: str, row: int, data: Optional[dict]) -> None:
+        if op == 'insert':
+            key = self._loaded_key(data)
+            self._row_keys.insert(row, key)
+            self._dirty.add(key)
+        elif op == 'remove':
+            self._dirty.add(self._row_keys.pop(row))
+        elif op == 'update':
+            self._dirty.add(self._row_keys[row])
+        elif op == 'order':
+            self._row_keys = [self._row_keys[old] for old in data['order']]
+        elif op == 'reset':
+            # 清空的分段也要写回，旧内容才不会在下次启动时出现
+            self._dirty.update(self._segments)
+            self._row_keys = [self._loaded_key(item) for item in data['items']]
+            self._dirty.update(self._row_keys)
+
+    def save(self, snapshot: SnapshotFn) -> None:
+        """只把被修改过的分段交给后台写入器"""
+        if not self._dirty:
+            return
+        fragments = snapshot()
+        groups: Dict[str, List[str]] = {key: [] for key in self._dirty}
+        for key, fragment in zip(self._row_keys, fragments):
+            if key in groups:
+                groups[key].append(fragment)
+        self._dirty.clear()
+        for key, segment_fragments in groups.items():
+            self._segments[key].save(lambda fragments=segment_fragments: fragments)
+
+    def flush(self, snapshot: SnapshotFn) -> None:
+        self.save(snapshot)
+        self._writer.flush()
+
+    def sync_export(self, snapshot: SnapshotFn) -> str:
+        """合并全部分段（包括未加载的）为一个文件供上传"""
+        self.flush(snapshot)
+        items: List[dict] = []
+        for key in self.segment_keys():
+            items.extend(self.read_partition(key))
+        document = {'schema_version': SCHEMA_VERSION, self._items_key: items}
+        atomic_write(self._sync_path, json.dumps(document, ensure_ascii=False).encode('utf-8'))
+        return self._sync_path
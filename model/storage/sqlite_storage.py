@@ -0,0 +1,185 @@
+"""
+SQLite 存储引擎模块
+
+每个集合一张表：``position`` 记录行顺序，``data`` 保存完整的项目 JSON，
+另外把常用的过滤/排序字段抽取成带索引的列，供模型下推查询。
+``schema_versions`` 表记录每个集合的数据格式版本，打开旧版本的表时就地升级。
+进程间互斥由 SQLite 自身的锁保证；每次提交后增加集合的写入代数，通知其他进程重新加载。
+"""
+
+import json
+import os
+import sqlite3
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from .base_storage import StorageEngine, SnapshotFn
+from .interprocess import generation_counter
+from .schema import SCHEMA_VERSION, upgrade_items
+
+# 列名 -> 从项目字典中提取列值的函数
+ColumnMap = Dict[str, Callable[[dict], Any]]
+
+
+class SqliteStorage(StorageEngine):
+    """SQLite 存储引擎
+
+    Args:
+        db_path: 数据库文件路径（多个集合共用一个文件）
+        table: 表名，通常为集合名
+        columns: 需要建立索引的列及其提取函数
+        items_key: 云同步导出 JSON 时使用的项目列表键
+        sync_path: 云同步导出使用的 JSON 文件路径
+    """
+    tracks_mutations = True
+    supports_queries = True
+
+    def __init__(self, db_path: str, table: str, columns: ColumnMap,
+                 items_key: str = 'items', sync_path: str = ''):
+        self._table = table
+        self._columns = columns
+        self._items_key = items_key
+        self._sync_path = sync_path or f"{db_path}.{table}.json"
+        self._conn = sqlite3.connect(db_path)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        # 多个集合共用一个数据库文件，代数按 "<数据库文件名>:<表名>" 分别记录
+        self._counter = generation_counter(os.path.dirname(os.path.abspath(db_path)))
+        self._generation_key = f"{os.path.basename(db_path)}:{table}"
+        self._generation = 0
+        self._external_pending = False
+        self._create_schema()
+        self._upgrade_schema()
+
+    @property
+    def sync_path(self) -> str:
+        return self._sync_path
+
+    def _create_schema(self):
+        cols = ''.join(f', "{name}"' for name in self._columns)
+        with self._conn:
+            self._conn.execute(
+                f'CREATE TABLE IF NOT EXISTS "{self._table}" '
+                f'(position INTEGER NOT NULL, data TEXT NOT NULL{cols})'
+            )
+            for name in ['position', *self._columns]:
+                self._conn.execute(
+                    f'CREATE INDEX IF NOT EXISTS "{self._table}_{name}" '
+                    f'ON "{self._table}"("{name}")'
+                )
+
+    def _upgrade_schema(self):
+        """表中数据低于当前格式版本时整体升级（没有版本记录的表视为 v1）"""
+        with self._conn:
+            self._conn.execute(
+                'CREATE TABLE IF NOT EXISTS schema_versions (name TEXT PRIMARY KEY, version INTEGER NOT NULL)'
+            )
+        row = self._conn.execute('SELECT version FROM schema_versions WHERE name = ?',
+                                 (self._table,)).fetchone()
+        version = row[0] if row else 1
+        if version >= SCHEMA_VERSION:
+            return
+        # 迁移是幂等的，两步之间中断只会在下次打开时再升级一遍
+        self.replace_all(upgrade_items(self._select_all(), version))
+        with self._conn:
+            self._conn.execute('INSERT OR REPLACE INTO schema_versions (name, version) VALUES (?, ?)',
+                               (self._table, SCHEMA_VERSION))
+
+    def _row_values(self, data: dict) -> List[Any]:
+        values = [json.dumps(data, ensure_ascii=False)]
+        values.extend(extract(data) for extract in self._columns.values())
+        return values
+
+    def load(self) -> List[dict]:
+        # 先取代数再读表：读取期间的提交只会导致随后多一次重新加载
+        self._generation = self._counter.get(self._generation_key)
+        self._external_pending = False
+        return self._select_all()
+
+    def _select_all(self) -> List[dict]:
+        cursor = self._conn.execute(f'SELECT data FROM "{self._table}" ORDER BY position')
+        return [json.loads(data) for (data,) in cursor]
+
+    def watch_paths(self) -> List[str]:
+        return [self._counter.path]
+
+    def has_external_changes(self) -> bool:
+        return self._external_pending or self._counter.get(self._generation_key) != self._generation
+
+    def _committed(self) -> None:
+        """提交后增加代数；提交前其他进程已写过时记下来，让监视器随后重新加载"""
+        if self._counter.get(self._generation_key) != self._generation:
+            self._external_pending = True
+        self._generation = self._counter.bump(self._generation_key)
+
+    def apply(self, op: str, row: int, data: Optional[dict]) -> None:
+        self._apply(op, row, data)
+        self._committed()
+
+    def _apply(self, op: str, row: int, data: Optional[dict]) -> None:
+        t = f'"{self._table}"'
+        with self._conn:
+            if op == 'insert':
+                self._conn.execute(f'UPDATE {t} SET position = position + 1 WHERE position >= ?', (row,))
+                self._insert_rows([(row, data)])
+            elif op == 'remove':
+                self._conn.execute(f'DELETE FROM {t} WHERE position = ?', (row,))
+                self._conn.execute(f'UPDATE {t} SET position = position - 1 WHERE position > ?', (row,))
+            elif op == 'update':
+                sets = ', '.join(f'"{name}" = ?' for name in ['data', *self._columns])
+                self._conn.execute(f'UPDATE {t} SET {sets} WHERE position = ?',
+                                   (*self._row_values(data), row))
+            elif op == 'order':
+                self._reorder(data['order'])
+            elif op == 'reset':
+                self._conn.execute(f'DELETE FROM {t}')
+                self._insert_rows(list(enumerate(data['items'])))
+
+    def _insert_rows(self, rows: Sequence[tuple]):
+        names = ', '.join(f'"{name}"' for name in ['position', 'data', *self._columns])
+        marks = ', '.join('?' * (len(self._columns) + 2))
+        self._conn.executemany(
+            f'INSERT INTO "{self._table}" ({names}) VALUES ({marks})',
+            [(position, *self._row_values(data)) for position, data in rows]
+        )
+
+    def _reorder(self, order: List[int]):
+        """order[新行号] = 旧行号；借助 rowid 一次性改写 position"""
+        rowids = dict(self._conn.execute(f'SELECT position, rowid FROM "{self._table}"'))
+        self._conn.executemany(
+            f'UPDATE "{self._table}" SET position = ? WHERE rowid = ?',
+            [(new, rowids[old]) for new, old in enumerate(order)]
+        )
+
+    def save(self, snapshot: SnapshotFn) -> None:
+        # 每次 apply 都已提交事务，无需额外写入
+        pass
+
+    def flush(self, snapshot: SnapshotFn) -> None:
+        self._conn.execute("PRAGMA wal_checkpoint(PASSIVE)")
+
+    def replace_all(self, items: List[dict]) -> None:
+        """用给定的项目列表整体替换表内容"""
+        with self._conn:
+            self._conn.execute(f'DELETE FROM "{self._table}"')
+            self._insert_rows(list(enumerate(items)))
+        self._committed()
+
+    def sync_export(self, snapshot: SnapshotFn) -> str:
+        with open(self._sync_path, 'w', encoding='utf-8') as f:
+            json.dump({'schema_version': SCHEMA_VERSION, self._items_key: self._select_all()}, f, ensure_ascii=False)
+        return self._sync_path
+
+    def query(self, where: str, params: Sequence[Any] = (), order_by: str = "position") -> List[dict]:
+        cursor = self._conn.execute(
+            f'SELECT data FROM "{self._table}" WHERE {where} ORDER BY {order_by}', tuple(params)
+        )
+        return [json.loads(data) for (data,) in cursor]
+
+    def query_order(self, order_by: str) -> List[int]:
+        cursor = self._conn.execute(
+            f'SELECT position FROM "{self._table}" ORDER BY {order_by}, position'
+        )
+        return [position for (position,) in cursor]
+
+    def close(self) -> None:
+        self._conn.close()
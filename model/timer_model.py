@@ -3,7 +3,10 @@ import os
 from enum import Enum
 from PySide6.QtCore import QObject, Signal, QTimer
 from model.event_model import EventModel
-from cloud.cloud_sync import CloudSync
+from model.storage import FileLock, background_writer
+from cloud.cloud_sync import CloudSync, content_hash
+from cloud.sync_state import SyncState
+from cloud.sync_worker import SyncJob
 
 class TimerStatus(Enum):
     STOPPED = "stopped"
@@ -17,7 +20,7 @@ class TimerModel(QObject):
     status_changed = Signal(str)
     event_record_requested = Signal(int)
 
-    def __init__(self, user_id, key_path):
+    def __init__(self, user_id, key_path, event_model=None, cloud=None):
         super().__init__()
         self.total_seconds = 900
         self.remaining_seconds = 900
@@ -25,14 +28,17 @@ class TimerModel(QObject):
         self._qtimer = QTimer()
         self._qtimer.timeout.connect(self._update_time)
         self._qtimer.setInterval(1000)
-        self.event_model = EventModel(user_id, key_path)
+        # 与主窗口共享同一个 EventModel（由服务注册表注入），避免重复加载时间记录
+        self.event_model = event_model or EventModel(user_id, key_path, cloud=cloud)
         self._session_active = False
         self.user_id = user_id
         self.key_path = key_path
         self._data_dir = 'data'
         self._data_file_path = os.path.join(self._data_dir, 'timer_events.json')
         self._collection_name = 'timer_events'
-        self._cloud = CloudSync(key_path, user_id)
+        self._cloud = cloud or CloudSync(key_path, user_id)
+        # 记录上次与云端同步时的内容哈希，内容没有变化时跳过上传
+        self._sync_state = SyncState(os.path.join(self._data_dir, f"{self._collection_name}.syncstate.json"))
         self._ensure_local_file_exists()
         self.data = self._load_from_local()
 
@@ -43,22 +49,89 @@ class TimerModel(QObject):
                 json.dump({"events": []}, f)
 
     def _load_from_local(self) -> dict:
-        with open(self._data_file_path, 'r', encoding='utf-8') as f:
+        # 写入由后台写入器在独占锁内完成，读取时持共享锁，不会读到其他进程写了一半的文件
+        with FileLock(self._data_file_path, shared=True), \
+                open(self._data_file_path, 'r', encoding='utf-8') as f:
             return json.load(f)
 
     def save_to_local(self):
-        with open(self._data_file_path, 'w', encoding='utf-8') as f:
-            json.dump(self.data, f, ensure_ascii=False, indent=2)
+        """在后台线程中编码并原子替换计时数据文件"""
+        data = dict(self.data)
+        encode = lambda: json.dumps(data, ensure_ascii=False, indent=2).encode('utf-8')
+        background_writer.submit(self._data_file_path, encode)
 
     def sync_upload(self) -> bool:
-        self.save_to_local()
-        return self._cloud.upload(self._collection_name, self._data_file_path)
+        prepared = self._prepare_upload()
+        return self._finish_upload(prepared, self._run_upload(prepared))
 
     def sync_download(self) -> bool:
-        if self._cloud.download(self._collection_name, self._data_file_path):
-            self.data = self._load_from_local()
+        prepared = self._prepare_download()
+        return self._finish_download(prepared, self._run_download(prepared))
+
+    def upload_job(self) -> SyncJob:
+        """供 SyncWorker 在后台执行的上传任务（prepare 在 GUI 线程中提交当前数据）"""
+        return SyncJob(f"{self._collection_name}:upload",
+                       self._prepare_upload, self._run_upload, self._finish_upload)
+
+    def download_job(self) -> SyncJob:
+        """供 SyncWorker 在后台执行的下载任务（finish 在 GUI 线程中替换数据）"""
+        return SyncJob(f"{self._collection_name}:download",
+                       self._prepare_download, self._run_download, self._finish_download)
+
+    def _prepare_upload(self) -> tuple:
+        """GUI 线程：提交当前数据，返回 (当前内容哈希, 上次同步时的内容哈希)"""
+        self.save_to_local()
+        return content_hash(self.data), self._sync_state.content_hash
+
+    def _run_upload(self, prepared: tuple, token=None) -> bool:
+        if prepared[0] == prepared[1]:
+            print("[TimerModel] 计时数据自上次同步以来没有变化，跳过上传")
             return True
-        return False
+        background_writer.flush()
+        return self._cloud.upload(self._collection_name, self._data_file_path)
+
+    def _upload_writes(self, prepared: tuple) -> list:
+        """工作线程：整个计时数据文档的写入操作（批量上传全部集合时合并提交），内容没有变化时为空"""
+        if prepared[0] == prepared[1]:
+            return []
+        background_writer.flush()
+        with FileLock(self._data_file_path, shared=True), \
+                open(self._data_file_path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        return [self._cloud.document_write(self._collection_name, data)]
+
+    def _finish_upload(self, prepared: tuple, ok: bool) -> bool:
+        if ok and prepared[0] != prepared[1]:
+            self._sync_state.content_hash = prepared[0]
+            self._sync_state.save()
+        return bool(ok)
+
+    def _prepare_download(self) -> str:
+        return content_hash(self.data)
+
+    def _run_download(self, local_hash: str, token=None, snapshot=None):
+        """工作线程：云端内容哈希与本地相同时不读取文档内容；返回 (文档内容或 None, 云端哈希)，失败为 None
+
+        云端没有文档时云端哈希为空字符串，视为下载成功，本地数据保持不变
+        """
+        return self._cloud.download(self._collection_name, snapshot=snapshot, local_hash=local_hash)
+
+    def _finish_download(self, local_hash: str, result) -> bool:
+        """GUI 线程：直接替换内存中的计时数据，由后台写入器保存到本地文件"""
+        if not result:
+            return False
+        data, remote_hash = result
+        if data is None and not remote_hash:
+            print("[TimerModel] 云端没有计时数据，保留本地数据")
+        elif data is None:
+            print("[TimerModel] 云端计时数据与本地相同，无需更新")
+        else:
+            self.data = data
+            self.save_to_local()
+        if self._sync_state.content_hash != remote_hash:
+            self._sync_state.content_hash = remote_hash
+            self._sync_state.save()
+        return True
 
     def set_timer(self, seconds: int):
         if self.status == TimerStatus.RUNNING:
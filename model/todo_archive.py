@@ -0,0 +1,165 @@
+"""
+已完成待办事项归档模块
+
+完成超过一定天数的待办事项从 TodoModel 的热数据中移出，追加写入压缩的
+JSON Lines 文件（data/todo_archive.jsonl.gz）。每次追加写入一个独立的 gzip
+成员，首行是格式版本头，读取时按流解压，不需要把整个归档读入内存。
+
+追加写入中途崩溃会留下截断的 gzip 成员，读取时停在最后一条完整的记录；
+崩溃后重新归档可能重复写入同一事项，读取时按 id 去重。
+"""
+
+import gzip
+import json
+import os
+import zlib
+from itertools import islice
+from typing import Any, Dict, Iterator, List, Optional
+
+from PySide6.QtCore import QAbstractListModel, QModelIndex, Qt
+
+from .storage import SCHEMA_VERSION, upgrade_items
+
+
+class TodoArchive:
+    """已完成待办事项的冷存储
+
+    Args:
+        path: 归档文件路径
+    """
+
+    def __init__(self, path: str = os.path.join('data', 'todo_archive.jsonl.gz')):
+        self._path = path
+
+    @property
+    def path(self) -> str:
+        return self._path
+
+    def append(self, items: List[Dict[str, Any]]) -> None:
+        """把项目字典追加到归档，写入完成并落盘后才返回"""
+        if not items:
+            return
+        os.makedirs(os.path.dirname(self._path) or '.', exist_ok=True)
+        lines = [json.dumps({'schema_version': SCHEMA_VERSION})]
+        lines.extend(json.dumps(item, ensure_ascii=False) for item in items)
+        payload = gzip.compress(('\n'.join(lines) + '\n').encode('utf-8'))
+        with open(self._path, 'ab') as f:
+            f.write(payload)
+            f.flush()
+            os.fsync(f.fileno())
+
+    def iter_items(self, text: str = "", category: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+        """按归档顺序流式读取项目字典
+
+        Args:
+            text: 只返回描述中包含该文本的项目（不区分大小写）
+            category: 只返回该分类的项目
+        """
+        if not os.path.exists(self._path):
+            return
+        needle = text.lower()
+        version = SCHEMA_VERSION
+        seen = set()
+        with gzip.open(self._path, 'rt', encoding='utf-8') as f:
+            lines = iter(f)
+            while True:
+                try:
+                    line = next(lines)
+                except StopIteration:
+                    return
+                except (EOFError, gzip.BadGzipFile, zlib.error, UnicodeDecodeError) as e:
+                    print(f"⚠️ [TodoArchive] 归档末尾不完整，已读到最后一条完整记录: {e!r}")
+                    return
+                try:
+                    data = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                if not isinstance(data, dict):
+                    continue
+                if 'schema_version' in data:
+                    version = data['schema_version']
+                    continue
+                upgrade_items([data], version)
+                item_id = data.get('id')
+                if not item_id or item_id in seen:
+                    continue
+                seen.add(item_id)
+                if category is not None and data.get('category') != category:
+                    continue
+                if needle and needle not in str(data.get('description', '')).lower():
+                    continue
+                yield data
+
+    def search(self, text: str = "", category: Optional[str] = None,
+               limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """搜索归档，返回最多 limit 个匹配的项目字典"""
+        return list(islice(self.iter_items(text, category), limit))
+
+    def count(self) -> int:
+        """归档中的项目总数（需要完整扫描一遍）"""
+        return sum(1 for _ in self.iter_items())
+
+
+class TodoArchiveModel(QAbstractListModel):
+    """归档浏览模型
+
+    按需分批从归档读取项目：视图滚动到底部时通过 canFetchMore/fetchMore
+    再读下一批，任何时刻只解压已经显示过的部分。
+
+    Args:
+        archive: 待浏览的归档
+        batch_size: 每批读取的项目数
+    """
+
+    def __init__(self, archive: TodoArchive, batch_size: int = 100, parent=None):
+        super().__init__(parent)
+        from .todo_model import TodoItem
+        self._to_item = TodoItem.from_dict
+        self._archive = archive
+        self._batch_size = batch_size
+        self._items: List[Any] = []
+        self._source: Optional[Iterator[Dict[str, Any]]] = None
+        self.set_filter()
+
+    def set_filter(self, text: str = "", category: Optional[str] = None):
+        """设置搜索条件并从头重新浏览"""
+        self.beginResetModel()
+        if self._source is not None:
+            self._source.close()
+        self._source = self._archive.iter_items(text, category)
+        self._items = []
+        self.endResetModel()
+        self.fetchMore()
+
+    def rowCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self._items)
+
+    def canFetchMore(self, parent: QModelIndex = QModelIndex()) -> bool:
+        return not parent.isValid() and self._source is not None
+
+    def fetchMore(self, parent: QModelIndex = QModelIndex()):
+        if self._source is None:
+            return
+        rows = list(islice(self._source, self._batch_size))
+        if len(rows) < self._batch_size:
+            self._source = None
+        batch = []
+        for data in rows:
+            try:
+                batch.append(self._to_item(data))
+            except (KeyError, TypeError, ValueError, AttributeError) as e:
+                print(f"⚠️ [TodoArchiveModel] 跳过无法解析的归档事项 {data.get('id')}: {e!r}")
+        if batch:
+            self.beginInsertRows(QModelIndex(), len(self._items), len(self._items) + len(batch) - 1)
+            self._items.extend(batch)
+            self.endInsertRows()
+
+    def data(self, index: QModelIndex, role: int = Qt.DisplayRole):
+        if not index.isValid() or not 0 <= index.row() < len(self._items):
+            return None
+        item = self._items[index.row()]
+        if role == Qt.DisplayRole:
+            return item.description
+        elif role == Qt.UserRole:
+            return item
+        return None
@@ -6,15 +6,16 @@
 """
 
 import json
-from datetime import datetime
+from datetime import datetime, timedelta
 from enum import Enum
-from typing import Dict, Any
+from typing import Dict, Any, Iterator, List, Optional
 
 from PySide6.QtCore import QModelIndex, Qt, QDate
 from dataclasses import dataclass, field, asdict
 
-from .base_item import BaseItem
+from .base_item import BaseItem, item_dataclass, intern_str
 from .base_model import BaseModel
+from .todo_archive import TodoArchive
 
 
 
@@ -47,7 +48,7 @@ class Priority(Enum):
         except KeyError:
             return cls.MEDIUM
 
-@dataclass
+@item_dataclass
 class TodoItem(BaseItem):
     """待办事项数据类
     
@@ -70,8 +71,7 @@ class TodoItem(BaseItem):
     def __post_init__(self) -> None:
         """初始化后处理，设置类型标识和数据验证"""
         self.item_type = "todo"
-        self._item_type_set = True
-        super().__post_init__()
+        BaseItem.__post_init__(self)
         
         # 数据验证和转换
         if isinstance(self.priority, str):
@@ -93,14 +93,12 @@ class TodoItem(BaseItem):
         self.description = value
 
     def to_dict(self) -> Dict[str, Any]:
-        """序列化为字典，包含所有待办事项字段"""
-        base_dict = super().to_dict()
+        """序列化为字典（当前格式版本），包含所有待办事项字段"""
+        base_dict = BaseItem.to_dict(self)
         base_dict.update({
-            "text": self.description,  # 保持向后兼容
             "done": self.done,
             "priority": self.priority.value,
             "deadline": self.deadline.toString() if self.deadline else None,
-            "createtime": self.created_time.strftime('%Y-%m-%d'),  # 兼容旧格式
             "donetime": self.donetime.toString() if self.donetime else None,
             "consume_time": self.consume_time
         })
@@ -111,48 +109,105 @@ class TodoItem(BaseItem):
         """从字典反序列化待办事项对象
         
         Args:
-            data: 包含待办事项数据的字典
+            data: 包含待办事项数据的字典（当前格式，旧格式由存储层升级）
             
         Returns:
             反序列化后的TodoItem实例
+
+        Raises:
+            KeyError/ValueError/TypeError: 必需字段缺失或无法解析，BaseModel 加载时跳过该行
         """
-        # 处理时间字段的兼容性
-        created_time = data.get("created_time")
-        if created_time:
-            try:
-                created_time = datetime.fromisoformat(created_time)
-            except ValueError:
-                created_time = datetime.now()
-        else:
-            # 兼容旧格式的createtime字段
-            createtime_str = data.get("createtime")
-            if createtime_str:
-                try:
-                    created_time = datetime.strptime(createtime_str, '%Y-%m-%d')
-                except ValueError:
-                    created_time = datetime.now()
-            else:
-                created_time = datetime.now()
-        
         return cls(
-            description=data.get("text", data.get("description", "")),
-            category=data.get("category", "default"),
-            created_time=created_time,
+            id=data["id"],
+            description=data["description"],
+            category=intern_str(data.get("category", "default")),
+            created_time=datetime.fromisoformat(data["created_time"]),
+            updated_at=data["updated_at"],
             done=data.get("done", False),
-            priority=Priority(data.get("priority", Priority.MEDIUM.value)),
+            priority=_parse_priority(data.get("priority")),
             deadline=QDate.fromString(data["deadline"]) if data.get("deadline") else None,
             donetime=QDate.fromString(data["donetime"]) if data.get("donetime") else None,
             consume_time=data.get("consume_time", 0)
         )
 
+def _parse_priority(value: Any) -> Priority:
+    """解析优先级，缺失或无法识别时视为中等（不因为一个字段放弃整个事项）"""
+    try:
+        return Priority(value)
+    except ValueError:
+        return Priority.MEDIUM
+
+
+def _deadline_column(data: Dict[str, Any]):
+    """把 QDate 文本格式的截止日期转换为可排序的 ISO 日期"""
+    deadline = data.get("deadline")
+    return QDate.fromString(deadline).toString(Qt.ISODate) if deadline else None
+
+
 class TodoModel(BaseModel):
     """待办事项的核心模型"""
-    def __init__(self, user_id, key_path):
-        super().__init__(user_id, key_path, 'todo_events.json', 'todo_events')
+    journal_enabled = True
+    # 完成超过 N 天的事项在加载时移入压缩归档，None 表示不归档
+    archive_done_after_days: Optional[int] = 30
+    storage_columns = {
+        "done": lambda data: int(data.get("done", False)),
+        "priority": lambda data: data.get("priority"),
+        "deadline": _deadline_column,
+        "category": lambda data: data.get("category"),
+    }
+
+    def __init__(self, user_id, key_path, storage_backend=None, cloud=None):
+        self.archive = TodoArchive()
+        super().__init__(user_id, key_path, 'todo_events.json', 'todo_events', storage_backend, cloud)
         print(f"📝 [TodoModel] 初始化完成，加载了 {len(self._items)} 个待办事项")
         for i, item in enumerate(self._items):
             print(f"  {i+1}. {item.text} (done: {item.done})")
 
+    def load(self):
+        super().load()
+        self.archive_done_items()
+
+    def archive_done_items(self) -> int:
+        """把完成超过 archive_done_after_days 天的事项移入归档
+
+        没有完成日期的旧数据按创建时间判断。
+
+        Returns:
+            归档的事项数量
+        """
+        if self.archive_done_after_days is None:
+            return 0
+        today = QDate.currentDate()
+        cutoff = datetime.now() - timedelta(days=self.archive_done_after_days)
+
+        def expired(item: TodoItem) -> bool:
+            if not item.done:
+                return False
+            if item.donetime:
+                return item.donetime.daysTo(today) > self.archive_done_after_days
+            return item.created_time < cutoff
+
+        old = [item for item in self._items if expired(item)]
+        if not old:
+            return 0
+        # 先落盘归档再从热数据中删除，崩溃时最多重复归档，不会丢失
+        self.archive.append([item.to_dict() for item in old])
+        archived = set(map(id, old))
+        self.beginResetModel()
+        self._items = [item for item in self._items if id(item) not in archived]
+        self.endResetModel()
+        self._record_mutation('reset', 0, data={'items': [item.to_dict() for item in self._items]})
+        self.save()
+        print(f"📦 [TodoModel] 已归档 {len(old)} 个已完成事项")
+        return len(old)
+
+    def search_archive(self, text: str = "", limit: Optional[int] = None) -> List[TodoItem]:
+        """在归档中搜索描述包含 text 的事项"""
+        return self._parse_items(self.archive.search(text, limit=limit))
+
+    def _archived_items(self) -> Iterator[dict]:
+        return self.archive.iter_items()
+
     def _dict_to_item(self, data: dict) -> TodoItem:
         """将字典转换为 TodoItem 对象"""
         return TodoItem.from_dict(data)
@@ -166,6 +221,24 @@ class TodoModel(BaseModel):
         self.beginInsertRows(QModelIndex(), self.rowCount(), self.rowCount())
         self._items.append(item)
         self.endInsertRows()
+        self._record_mutation('insert', len(self._items) - 1, item)
+
+    def update_item(self, item_id: str, **fields) -> bool:
+        """按 id 修改项目的属性（项目可能已被移动），只通知该行
+
+        Returns:
+            项目是否仍然存在
+        """
+        row = next((row for row, item in enumerate(self._items) if item.id == item_id), None)
+        if row is None:
+            return False
+        item = self._items[row]
+        for name, value in fields.items():
+            setattr(item, name, value)
+        self._record_mutation('update', row, item)
+        index = self.index(row, 0)
+        self.dataChanged.emit(index, index, [Qt.DisplayRole, Qt.UserRole])
+        return True
 
     def delete_item(self, row: int):
         """删除指定行的项目"""
@@ -173,8 +246,9 @@ class TodoModel(BaseModel):
             return False
         
         self.beginRemoveRows(QModelIndex(), row, row)
-        del self._items[row]
+        item = self._items.pop(row)
         self.endRemoveRows()
+        self._record_mutation('remove', row, item)
         return True
 
     def toggle_item_done(self, row: int):
@@ -190,15 +264,26 @@ class TodoModel(BaseModel):
         else:
             item.donetime = None
         
+        self._record_mutation('update', row, item)
         index = self.index(row, 0)
         self.dataChanged.emit(index, index, [Qt.DisplayRole, Qt.UserRole])
 
     def sort_items(self):
         """根据完成状态、优先级和截止日期对项目进行排序"""
+        if self._storage.supports_queries:
+            # 下推到 done/priority/deadline 索引上排序，与 _sort_key 的语义一致
+            order = self._storage.query_order("done ASC, priority DESC, deadline IS NULL, deadline ASC")
+        else:
+            order = sorted(range(len(self._items)), key=lambda row: self._sort_key(self._items[row]))
         self.beginResetModel()
-        self._items.sort(key=lambda item: (
+        self._items = [self._items[row] for row in order]
+        self.endResetModel()
+        self._record_mutation('order', 0, data={'order': order, 'ids': [item.id for item in self._items]})
+
+    def _sort_key(self, item: TodoItem):
+        """排序键：未完成优先，其次优先级从高到低，最后按截止日期"""
+        return (
             item.done,
             -item.priority.value,
             item.deadline or QDate(9999, 12, 31)
-        ))
-        self.endResetModel() 
\ No newline at end of file
+        ) 
\ No newline at end of file
@@ -0,0 +1,37 @@
+import contextlib
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+from PySide6.QtWidgets import QApplication  # noqa: E402
+
+from model.storage import background_writer  # noqa: E402
+
+
+@pytest.fixture(scope='session')
+def qapp():
+    return QApplication.instance() or QApplication([])
+
+
+@pytest.fixture
+def inside(tmp_path):
+    """返回 inside(name)：切换到 tmp_path/name 的上下文（模型的数据路径是相对 data/ 的）"""
+
+    @contextlib.contextmanager
+    def enter(name: str):
+        path = tmp_path / name
+        path.mkdir(exist_ok=True)
+        previous = os.getcwd()
+        os.chdir(path)
+        try:
+            yield
+        finally:
+            # 后台写入使用相对路径，离开目录前写完
+            background_writer.flush()
+            os.chdir(previous)
+
+    return enter
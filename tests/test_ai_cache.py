@@ -0,0 +1,35 @@
+"""ParseCache 两级分别统计命中、未命中、过期和淘汰"""
+
+import time
+
+from model.storage import background_writer
+from utils.ai_cache import ParseCache
+
+
+def test_tiers_are_counted_separately(tmp_path):
+    cache = ParseCache(str(tmp_path / 'cache.json'), memory_entries=1, disk_entries=2)
+    cache.put('a', {'v': 1})
+    cache.put('b', {'v': 2})                 # 内存 LRU 淘汰 a
+    assert cache.get('a') == {'v': 1}        # 磁盘命中，提升到内存时淘汰 b
+    assert cache.get('a') == {'v': 1}        # 内存命中
+    cache.put('c', {'v': 3})                 # 磁盘超出容量，淘汰最久未使用的 b
+    assert cache.get('b') is None
+    background_writer.flush()
+
+    stats = cache.stats()
+    assert stats['memory'] == {'hits': 1, 'misses': 2, 'expired': 0, 'evictions': 3, 'entries': 1}
+    assert stats['disk'] == {'hits': 1, 'misses': 1, 'expired': 0, 'evictions': 1, 'entries': 2}
+
+
+def test_expired_entries_are_counted_per_tier(tmp_path, monkeypatch):
+    cache = ParseCache(str(tmp_path / 'cache.json'), ttl_seconds=60)
+    cache.put('a', {'v': 1})
+    now = time.time()
+    monkeypatch.setattr(time, 'time', lambda: now + 120)
+    assert cache.get('a') is None
+    background_writer.flush()
+
+    stats = cache.stats()
+    assert stats['memory']['expired'] == 1
+    assert stats['disk']['expired'] == 1
+    assert stats['disk']['misses'] == 1
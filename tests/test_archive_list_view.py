@@ -0,0 +1,61 @@
+"""归档列表视图：分批读取、搜索和只读行为"""
+
+from PySide6.QtCore import QEvent, Qt
+from PySide6.QtGui import QKeyEvent
+
+from model.todo_archive import TodoArchive
+from model.todo_model import TodoItem
+from view.widgets.archive_list_view import ArchiveListView
+
+
+def test_archive_list_fetches_in_batches_and_searches(qapp, tmp_path):
+    archive = TodoArchive(str(tmp_path / 'todo_archive.jsonl.gz'))
+    archive.append([TodoItem(description=f"task {i}", done=True).to_dict() for i in range(250)])
+    view = ArchiveListView(archive)
+    model = view.archive_model
+
+    assert model.rowCount() == 100
+    assert model.canFetchMore()
+    model.fetchMore()
+    model.fetchMore()
+    assert model.rowCount() == 250
+    assert not model.canFetchMore()
+
+    view.search('TASK 24')
+    assert [model.index(row, 0).data() for row in range(model.rowCount())] == ['task 24'] + [
+        f"task {i}" for i in range(240, 250)]
+    assert model.index(0, 0).data(Qt.UserRole).done is True
+
+    # 新归档的事项在刷新后出现，搜索条件保留
+    archive.append([TodoItem(description='task 24 again', done=True).to_dict()])
+    view.refresh_data()
+    assert model.rowCount() == 12
+
+
+def test_archive_list_is_read_only(qapp, tmp_path):
+    archive = TodoArchive(str(tmp_path / 'todo_archive.jsonl.gz'))
+    archive.append([TodoItem(description='done', done=True).to_dict()])
+    view = ArchiveListView(archive)
+    requested = []
+    view.delete_item_requested.connect(requested.append)
+    view.setCurrentIndex(view.archive_model.index(0, 0))
+    view.keyPressEvent(QKeyEvent(QEvent.KeyPress, Qt.Key_Delete, Qt.NoModifier))
+    assert requested == []
+
+
+def test_archive_survives_truncated_member_and_duplicates(qapp, tmp_path):
+    path = tmp_path / 'todo_archive.jsonl.gz'
+    archive = TodoArchive(str(path))
+    first = TodoItem(description='first', done=True).to_dict()
+    archive.append([first, {'description': 'no id'}, {**TodoItem(description='bad').to_dict(), 'created_time': 'x'}])
+    # 崩溃后重新归档了同一事项，随后的追加写到一半就中断
+    archive.append([first, TodoItem(description='second', done=True).to_dict()])
+    intact = path.stat().st_size
+    archive.append([TodoItem(description=f"lost {i}").to_dict() for i in range(50)])
+    with open(path, 'r+b') as f:
+        f.truncate(intact + 40)
+
+    assert [data['description'] for data in archive.iter_items()] == ['first', 'bad', 'second']
+    view = ArchiveListView(archive)
+    assert [view.archive_model.index(row, 0).data() for row in range(view.archive_model.rowCount())] == [
+        'first', 'second']
@@ -0,0 +1,35 @@
+"""时间记录列表的排序代理随 EventModel 的行级信号更新"""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+from model.event_model import EventModel
+from view.widgets.event_list_view import EventListModel
+
+
+@pytest.fixture
+def events(qapp, inside, monkeypatch):
+    monkeypatch.setattr(EventModel, 'archive_after_days', None)
+    with inside('events'):
+        yield EventModel('tester', '')
+
+
+def record(model: EventModel, description: str, minutes_ago: int):
+    model.current_session_start = datetime.now() - timedelta(minutes=minutes_ago + 25)
+    return model.end_session(description)
+
+
+def test_new_sessions_appear_in_the_proxy(events):
+    proxy = EventListModel(events)
+    for description, minutes_ago in (('first', 60), ('second', 30), ('third', 0)):
+        record(events, description, minutes_ago)
+
+    assert events.rowCount() == 3
+    assert proxy.rowCount() == 3
+    # 按结束时间倒序显示
+    assert [proxy.index(row, 0).data().splitlines()[1] for row in range(3)] == ['third', 'second', 'first']
+
+    assert events.delete_event(proxy.source_row(proxy.index(0, 0)))
+    assert events.rowCount() == proxy.rowCount() == 2
+    assert proxy.index(0, 0).data().splitlines()[1] == 'second'
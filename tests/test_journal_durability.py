@@ -0,0 +1,53 @@
+"""变更日志的追加写遵循后台写入器的持久化级别"""
+
+import importlib
+import os
+import time
+
+import pytest
+
+from model.storage.background_writer import BackgroundWriter
+from model.storage.journal import MutationJournal
+
+
+@pytest.fixture
+def synced(monkeypatch):
+    """记录写入器统一落盘（fsync_path）过的路径"""
+    writer_module = importlib.import_module('model.storage.background_writer')
+    paths = []
+    original = writer_module.fsync_path
+    monkeypatch.setattr(writer_module, 'fsync_path', lambda path: (paths.append(path), original(path)))
+    return paths
+
+
+def test_always_fsyncs_every_append(tmp_path, monkeypatch):
+    fsyncs = []
+    original = os.fsync
+    monkeypatch.setattr(os, 'fsync', lambda fd: (fsyncs.append(fd), original(fd)))
+    journal = MutationJournal(str(tmp_path / 'todo.json.journal'), writer=BackgroundWriter('always'))
+    journal.append('insert', 0, {'id': 'a'})
+    assert fsyncs
+    count = len(fsyncs)
+    journal.append('update', 0, {'id': 'a', 'done': True})
+    assert len(fsyncs) == count + 1
+
+
+def test_exit_mode_syncs_journal_on_flush(tmp_path, synced):
+    writer = BackgroundWriter('exit')
+    path = str(tmp_path / 'todo.json.journal')
+    journal = MutationJournal(path, writer=writer)
+    journal.append('insert', 0, {'id': 'a'})
+    time.sleep(0.05)
+    assert path not in synced
+    assert writer.flush(timeout=5)
+    assert path in synced
+
+
+def test_batched_mode_syncs_journal_on_timer(tmp_path, synced):
+    writer = BackgroundWriter('batched', batch_interval=0.05)
+    path = str(tmp_path / 'todo.json.journal')
+    MutationJournal(path, writer=writer).append('insert', 0, {'id': 'a'})
+    deadline = time.monotonic() + 5
+    while path not in synced and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert path in synced
@@ -0,0 +1,84 @@
+"""加载时跳过损坏的行：一个坏项目不应让整个模型（以及应用启动）失败"""
+
+import json
+import os
+import sqlite3
+from datetime import datetime, timedelta
+
+from model.event_model import EventModel, RecordItem
+from model.storage import SCHEMA_VERSION, background_writer
+from model.todo_model import Priority, TodoItem, TodoModel
+
+
+def test_malformed_rows_are_skipped(qapp, inside, monkeypatch):
+    monkeypatch.setattr(TodoModel, 'archive_done_after_days', None)
+    good = TodoItem(description='good').to_dict()
+    rows = [
+        good,
+        None,
+        {'description': 'no id'},
+        {**TodoItem(description='bad time').to_dict(), 'created_time': 'yesterday'},
+        {'id': 'missing-fields'},
+        {**TodoItem(description='odd priority').to_dict(), 'priority': 9},
+        {**good, 'description': 'good, edited'},
+    ]
+    with inside('a'):
+        os.makedirs('data')
+        with open(os.path.join('data', 'todo_events.json'), 'w', encoding='utf-8') as f:
+            json.dump({'schema_version': SCHEMA_VERSION, 'items': rows}, f)
+        model = TodoModel('tester', '')
+
+    assert [item.description for item in model._items] == ['good, edited', 'odd priority']
+    assert model._items[1].priority is Priority.MEDIUM
+
+
+def test_sqlite_rows_stay_aligned_after_skipping(qapp, inside, monkeypatch):
+    monkeypatch.setattr(TodoModel, 'archive_done_after_days', None)
+    with inside('sqlite'):
+        model = TodoModel('tester', '', storage_backend='sqlite')
+        for description in ('a', 'b', 'c'):
+            model.add_item(TodoItem(description=description))
+        model._storage._conn.close()
+        conn = sqlite3.connect(os.path.join('data', 'todoer.db'))
+        with conn:
+            conn.execute('UPDATE todo_events SET position = position + 1')
+            conn.execute('INSERT INTO todo_events (position, data) VALUES (0, ?)',
+                         (json.dumps({'description': 'broken'}),))
+
+        model = TodoModel('tester', '', storage_backend='sqlite')
+        model.toggle_item_done(0)
+        rows = [json.loads(data) for (data,) in conn.execute('SELECT data FROM todo_events ORDER BY position')]
+
+    assert [row['description'] for row in rows] == ['a', 'b', 'c']
+    assert [row['done'] for row in rows] == [True, False, False]
+
+
+def test_segments_stay_aligned_after_skipping(qapp, inside, monkeypatch):
+    monkeypatch.setattr(EventModel, 'archive_after_days', None)
+    monkeypatch.setattr(EventModel, 'segment_preload_items', 0)
+    now = datetime.now()
+    earlier = now.replace(day=1) - timedelta(days=1)
+
+    def segment(moment, descriptions):
+        rows = [{'description': 'broken'}]
+        for description in descriptions:
+            item = RecordItem(description=description, start_time=moment - timedelta(minutes=25), end_time=moment)
+            rows.append(item.to_dict())
+        path = os.path.join('data', 'event_records', f"{moment:%Y-%m}.json")
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'schema_version': SCHEMA_VERSION, 'events': rows}, f)
+
+    with inside('segments'):
+        os.makedirs(os.path.join('data', 'event_records'))
+        segment(now, ['current 1', 'current 2'])
+        segment(earlier, ['earlier'])
+        model = EventModel('tester', '')
+        assert len(model.load_older_segment()) == 1
+        model.current_session_start = now - timedelta(minutes=1)
+        model.end_session('new')
+        background_writer.flush()
+
+        reloaded = EventModel('tester', '')
+        reloaded.load_older_segment()
+
+    assert sorted(item.description for item in reloaded._items) == ['current 1', 'current 2', 'earlier', 'new']
@@ -0,0 +1,77 @@
+"""RecordArchive 的无损归档、按 id 去重、越界检查和旧格式转换"""
+
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+from model.event_model import RecordItem
+from model.record_archive import _FORMAT1_DTYPE, RecordArchive
+
+
+def record(description: str, start: datetime, **fields) -> RecordItem:
+    return RecordItem(description=description, start_time=start,
+                      end_time=start.replace(hour=start.hour + 1), duration_seconds=3600, **fields)
+
+
+def test_round_trip_keeps_every_field(tmp_path):
+    archive = RecordArchive(str(tmp_path))
+    item = record('写报告', datetime(2024, 1, 2, 9, 30), category='work', event_type='focus')
+    item.end_time = None
+    assert archive.append([item, record('读书', datetime(2024, 1, 3, 20))]) == 2
+
+    restored = list(RecordArchive(str(tmp_path)).iter_records())
+    assert restored[0] == item.to_dict()
+    assert restored[1]['end_time'] == '2024-01-03T21:00:00'
+
+
+def test_dedupe_on_id_not_start_time(tmp_path):
+    archive = RecordArchive(str(tmp_path))
+    start = datetime(2024, 1, 2, 9)
+    first, second = record('a', start), record('b', start)
+    assert archive.append([first, second, first]) == 2
+    assert archive.append([first, record('c', start, id=second.id)]) == 0
+    assert len(archive) == 2
+
+
+def test_overflow_raises_and_writes_nothing(tmp_path):
+    archive = RecordArchive(str(tmp_path))
+    archive._strings['event_types'] = [f"type{i}" for i in range(2 ** 16)]
+    with pytest.raises(ValueError):
+        archive.append([record('a', datetime(2024, 1, 2, 9), event_type='overflow')])
+    assert len(archive) == 0
+    assert archive._strings['event_types'] == []
+
+    with pytest.raises(ValueError):
+        archive.append([RecordItem(description='b', start_time=datetime(2024, 1, 2), duration_seconds=2 ** 31)])
+    assert len(archive) == 0
+
+
+def test_format1_archive_is_converted(tmp_path):
+    (tmp_path / 'strings.json').write_text('{"categories": ["work"], "event_types": ["pomodoro"]}')
+    (tmp_path / 'descriptions.bin').write_bytes('旧记录'.encode('utf-8'))
+    old = np.zeros(1, dtype=_FORMAT1_DTYPE)
+    old['start_us'] = (datetime(2023, 5, 1, 8) - datetime(1970, 1, 1)).total_seconds() * 1_000_000
+    old['duration'], old['desc_length'] = 1500, len('旧记录'.encode('utf-8'))
+    old.tofile(tmp_path / 'records.bin')
+
+    archive = RecordArchive(str(tmp_path))
+    [data] = archive.iter_records()
+    assert data['description'] == '旧记录'
+    assert data['end_time'] == '2023-05-01T08:25:00'
+    assert RecordItem.from_dict(data).category == 'work'
+    # 转换得到的 id 由开始时间确定，每台设备上都相同
+    assert list(RecordArchive(str(tmp_path)).iter_records())[0]['id'] == data['id']
+
+
+def test_append_after_partial_row_stays_aligned(tmp_path):
+    archive = RecordArchive(str(tmp_path))
+    first = record('a', datetime(2024, 1, 2, 9))
+    archive.append([first])
+    # 模拟追加定长记录时崩溃：只写入了半行
+    with open(tmp_path / 'records.bin', 'ab') as f:
+        f.write(b'\x01' * 10)
+    second = record('b', datetime(2024, 1, 3, 9))
+    assert archive.append([second]) == 1
+    assert [data['id'] for data in archive.iter_records()] == [first.id, second.id]
+    assert [data['description'] for data in archive.iter_records()] == ['a', 'b']
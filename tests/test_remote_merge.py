@@ -0,0 +1,217 @@
+"""两台设备（各自的 TodoModel 和数据目录）通过 FakeFirestore 增量同步时的合并行为"""
+
+import pytest
+
+from cloud.cloud_sync import CloudSync
+from cloud.fake_firestore import FakeFirestore
+from model.todo_model import TodoItem, TodoModel
+
+USER = 'tester'
+
+
+class Signals:
+    """记录模型发出的行级信号：(信号名, 首行, 末行)"""
+
+    def __init__(self, model: TodoModel):
+        self.events = []
+        model.rowsInserted.connect(lambda parent, first, last: self.events.append(('inserted', first, last)))
+        model.rowsRemoved.connect(lambda parent, first, last: self.events.append(('removed', first, last)))
+        model.dataChanged.connect(lambda top, bottom, roles=None: self.events.append(
+            ('changed', top.row(), bottom.row())))
+        model.modelReset.connect(lambda: self.events.append(('reset', 0, 0)))
+
+
+@pytest.fixture
+def devices(qapp, inside, monkeypatch):
+    """返回 (make, client)：make(name, items) 在独立目录中创建共用同一个 FakeFirestore 的 TodoModel"""
+    monkeypatch.setattr(TodoModel, 'archive_done_after_days', None)
+    client = FakeFirestore()
+
+    def make(name: str, items=()):
+        with inside(name):
+            model = TodoModel(USER, '', cloud=CloudSync('', USER, client=client))
+            for description in items:
+                model.add_item(TodoItem(description=description))
+        return model
+
+    return make, client
+
+
+def sync(inside, name: str, model: TodoModel, upload: bool) -> bool:
+    with inside(name):
+        return model.sync_upload() if upload else model.sync_download()
+
+
+def descriptions(model: TodoModel):
+    return [item.description for item in model._items]
+
+
+def test_first_download_inserts_remote_items(devices, inside):
+    make, _ = devices
+    a = make('a', ['t0', 't1', 't2'])
+    b = make('b')
+    assert sync(inside, 'a', a, upload=True)
+    signals = Signals(b)
+    assert sync(inside, 'b', b, upload=False)
+    assert sorted(descriptions(b)) == ['t0', 't1', 't2']
+    assert signals.events == [('inserted', 0, 2)]
+
+
+def test_newer_remote_version_wins(devices, inside):
+    make, _ = devices
+    a = make('a', ['t0', 't1', 't2'])
+    b = make('b')
+    sync(inside, 'a', a, upload=True)
+    sync(inside, 'b', b, upload=False)
+
+    row_a = next(row for row, item in enumerate(a._items) if item.description == 't1')
+    with inside('a'):
+        a.toggle_item_done(row_a)
+    sync(inside, 'a', a, upload=True)
+
+    row_b = next(row for row, item in enumerate(b._items) if item.description == 't1')
+    signals = Signals(b)
+    assert sync(inside, 'b', b, upload=False)
+    assert b._items[row_b].done is True
+    assert b._items[row_b].updated_at == a._items[row_a].updated_at
+    assert signals.events == [('changed', row_b, row_b)]
+
+
+def test_newer_local_version_is_kept(devices, inside):
+    make, _ = devices
+    a = make('a', ['t0'])
+    b = make('b')
+    sync(inside, 'a', a, upload=True)
+    sync(inside, 'b', b, upload=False)
+
+    # A 的修改先上传，B 随后（更晚）修改同一项目但尚未上传
+    with inside('a'):
+        a._items[0].description = 'from a'
+        a._record_mutation('update', 0, a._items[0])
+        a._items[0].updated_at = '2030-01-01T00:00:00.000Z'
+    sync(inside, 'a', a, upload=True)
+    with inside('b'):
+        b._items[0].description = 'from b'
+        b._record_mutation('update', 0, b._items[0])
+        b._items[0].updated_at = '2030-01-02T00:00:00.000Z'
+
+    signals = Signals(b)
+    assert sync(inside, 'b', b, upload=False)
+    assert descriptions(b) == ['from b']
+    assert signals.events == []
+
+    # B 上传后 A 下载：B 的版本更新，反方向同样以后写入者为准
+    sync(inside, 'b', b, upload=True)
+    assert sync(inside, 'a', a, upload=False)
+    assert descriptions(a) == ['from b']
+
+
+def test_tombstone_removes_only_the_deleted_row(devices, inside):
+    make, _ = devices
+    a = make('a', ['t0', 't1', 't2'])
+    b = make('b')
+    sync(inside, 'a', a, upload=True)
+    sync(inside, 'b', b, upload=False)
+
+    with inside('a'):
+        a.delete_item(next(row for row, item in enumerate(a._items) if item.description == 't1'))
+    sync(inside, 'a', a, upload=True)
+
+    row_b = next(row for row, item in enumerate(b._items) if item.description == 't1')
+    signals = Signals(b)
+    assert sync(inside, 'b', b, upload=False)
+    assert 't1' not in descriptions(b)
+    assert len(b._items) == 2
+    assert signals.events == [('removed', row_b, row_b)]
+
+
+def test_older_remote_update_does_not_resurrect_local_delete(devices, inside):
+    make, _ = devices
+    a = make('a', ['t0'])
+    b = make('b')
+    sync(inside, 'a', a, upload=True)
+    sync(inside, 'b', b, upload=False)
+
+    with inside('a'):
+        a._items[0].description = 'edited'
+        a._record_mutation('update', 0, a._items[0])
+        a._items[0].updated_at = '2030-01-01T00:00:00.000Z'
+    sync(inside, 'a', a, upload=True)
+    with inside('b'):
+        b.delete_item(0)
+        b._sync_state.tombstones[a._items[0].id] = '2030-01-02T00:00:00.000Z'
+
+    assert sync(inside, 'b', b, upload=False)
+    assert b._items == []
+
+
+def test_bulk_changes_reset_storage_once(devices, inside, monkeypatch):
+    monkeypatch.setattr(TodoModel, 'journal_enabled', True)
+    make, _ = devices
+    count = TodoModel.bulk_apply_threshold + 50
+    a = make('a', [f"t{i}" for i in range(count)])
+    b = make('b', ['local'])
+    sync(inside, 'a', a, upload=True)
+
+    applied = []
+    original = b._storage.apply
+    monkeypatch.setattr(b._storage, 'apply', lambda op, row, data: (applied.append(op), original(op, row, data)))
+    signals = Signals(b)
+    assert sync(inside, 'b', b, upload=False)
+
+    assert len(b._items) == count + 1
+    # 超过阈值：存储引擎只收到一次整体替换，视图仍只收到一次插入
+    assert applied == ['reset']
+    assert signals.events == [('inserted', 1, count)]
+    with inside('b'):
+        reloaded = TodoModel(USER, '', cloud=b._cloud)
+    assert sorted(descriptions(reloaded)) == sorted(descriptions(b))
+
+
+def test_small_changes_are_recorded_per_row(devices, inside, monkeypatch):
+    monkeypatch.setattr(TodoModel, 'journal_enabled', True)
+    make, _ = devices
+    a = make('a', ['t0', 't1'])
+    b = make('b')
+    sync(inside, 'a', a, upload=True)
+
+    applied = []
+    original = b._storage.apply
+    monkeypatch.setattr(b._storage, 'apply', lambda op, row, data: (applied.append((op, row)), original(op, row, data)))
+    assert sync(inside, 'b', b, upload=False)
+    assert applied == [('insert', 0), ('insert', 1)]
+
+
+def test_first_upload_exports_archived_items(devices, inside):
+    make, client = devices
+    a = make('a', ['live'])
+    archived = TodoItem(description='archived', done=True)
+    with inside('a'):
+        a.archive.append([archived.to_dict()])
+    legacy = client.collection('todo_events').document(USER)
+    legacy.set({'items': [archived.to_dict()], 'schema_version': 4})
+
+    assert sync(inside, 'a', a, upload=True)
+    # 旧版文档中的项目被清除，归档的项目作为项目文档保存在云端
+    assert 'items' not in legacy.get().to_dict()
+    b = make('b')
+    assert sync(inside, 'b', b, upload=False)
+    assert sorted(descriptions(b)) == ['archived', 'live']
+
+
+def test_legacy_document_is_imported_once_with_stable_ids(devices, inside):
+    make, client = devices
+    legacy = [{'description': f"old {i}", 'item_type': 'todo', 'created_time': f"2023-01-0{i + 1}T00:00:00"}
+              for i in range(2)]
+    client.collection('todo_events').document(USER).set({'items': legacy, 'schema_version': 2})
+    a, b = make('a'), make('b')
+
+    for _ in range(3):
+        assert sync(inside, 'b', b, upload=False)
+    assert b.rowCount() == 2
+    # 两台设备从同一份旧数据升级得到相同的 id，首次上传不会产生重复项目
+    assert sync(inside, 'a', a, upload=False)
+    assert {item.id for item in a._items} == {item.id for item in b._items}
+    assert sync(inside, 'a', a, upload=True)
+    assert sync(inside, 'b', b, upload=False)
+    assert sorted(descriptions(b)) == ['old 0', 'old 1']
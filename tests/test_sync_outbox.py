@@ -0,0 +1,35 @@
+"""离线同步队列：云端还没有计时数据文档时，下载请求视为成功并移出队列"""
+
+from PySide6.QtCore import QEventLoop, QTimer
+
+from cloud.cloud_sync import CloudSync
+from cloud.fake_firestore import FakeFirestore
+from cloud.sync_outbox import SyncOutbox
+from cloud.sync_worker import SyncWorker
+from model.timer_model import TimerModel
+
+USER = 'tester'
+
+
+def test_download_without_remote_document_leaves_outbox(qapp, inside):
+    with inside('a'):
+        timer = TimerModel(USER, '', cloud=CloudSync('', USER, client=FakeFirestore()))
+        local = dict(timer.data)
+        worker = SyncWorker()
+        outbox = SyncOutbox(worker, 'data/sync_outbox.json', base_delay=60)
+        outbox.register(timer.download_job)
+        name = timer.download_job().name
+        # 模拟上次失败后排队的下载请求
+        outbox._enqueue(name, "离线", count_attempt=True)
+        assert name in outbox.pending
+
+        results = []
+        loop = QEventLoop()
+        worker.sync_finished.connect(lambda job, ok, message: (results.append((job, ok)), loop.quit()))
+        outbox.retry_now()
+        QTimer.singleShot(5000, loop.quit)
+        loop.exec()
+
+        assert results == [(name, True)]
+        assert outbox.pending == {}
+        assert timer.data == local
@@ -0,0 +1,154 @@
+"""
+AI 解析结果缓存模块
+
+GeminiService.parse_todo_text 的两级缓存，重复或几乎相同的输入（周期性的家务、重新粘贴的行）
+不再重复请求 Gemini：
+
+- 键：解析时的“今天”日期 + 模型名 + 规范化后的输入文本（NFKC、大小写折叠、合并空白、去掉首尾标点）。
+  相对截止日期（明天、下周五）依赖当天日期，日期变化后旧条目不再命中
+- 内存：按最近使用排序的 LRU，最多 memory_entries 条
+- 磁盘：JSON 文件，最多 disk_entries 条，超出时淘汰最久未使用的条目；首次访问时才读取，
+  写入交给后台写入器（多次写入合并为一次）
+- 两级的条目超过 ttl_seconds 后失效
+- stats() 分别返回两级的命中/未命中/过期/淘汰计数和条目数，供监控各级的命中率
+"""
+
+import json
+import os
+import re
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from datetime import date
+from typing import Dict, Optional, Tuple
+
+from model.storage import FileLock, background_writer
+
+_SPACES = re.compile(r'\s+')
+_EDGE_PUNCTUATION = ' \t\r\n.,;:!?。，；：！？、…~～'
+
+
+class ParseCache:
+    """内存 LRU + 磁盘的两级解析结果缓存（线程安全）
+
+    Args:
+        path: 磁盘缓存文件路径
+        memory_entries: 内存中最多保留的条目数
+        disk_entries: 磁盘上最多保留的条目数
+        ttl_seconds: 条目的有效期（秒）
+    """
+
+    def __init__(self, path: str, memory_entries: int = 128, disk_entries: int = 2000,
+                 ttl_seconds: float = 24 * 3600):
+        self._path = path
+        self._memory_entries = memory_entries
+        self._disk_entries = disk_entries
+        self._ttl = ttl_seconds
+        self._lock = threading.Lock()
+        # 键 -> (写入时间, 解析结果)，按最近使用排序（最新的在末尾）
+        self._memory: "OrderedDict[str, Tuple[float, dict]]" = OrderedDict()
+        self._disk: Optional["OrderedDict[str, Tuple[float, dict]]"] = None
+        self._stats = {tier: {'hits': 0, 'misses': 0, 'expired': 0, 'evictions': 0} for tier in ('memory', 'disk')}
+
+    @staticmethod
+    def normalize(text: str) -> str:
+        """规范化输入文本：全角/半角统一、大小写折叠、合并空白、去掉首尾标点"""
+        text = unicodedata.normalize('NFKC', text).casefold()
+        return _SPACES.sub(' ', text).strip(_EDGE_PUNCTUATION)
+
+    @classmethod
+    def key(cls, text: str, model: str, today: date) -> str:
+        return f"{today.isoformat()}|{model}|{cls.normalize(text)}"
+
+    def get(self, key: str) -> Optional[dict]:
+        """查找解析结果，磁盘命中的条目提升到内存；未命中或已过期时返回 None"""
+        now = time.time()
+        with self._lock:
+            memory, disk_stats = self._stats['memory'], self._stats['disk']
+            entry = self._memory.get(key)
+            if entry is not None:
+                if now - entry[0] <= self._ttl:
+                    self._memory.move_to_end(key)
+                    memory['hits'] += 1
+                    return entry[1]
+                del self._memory[key]
+                memory['expired'] += 1
+            memory['misses'] += 1
+            disk = self._load()
+            entry = disk.get(key)
+            if entry is not None:
+                if now - entry[0] <= self._ttl:
+                    disk.move_to_end(key)
+                    self._remember(key, entry)
+                    disk_stats['hits'] += 1
+                    return entry[1]
+                del disk[key]
+                disk_stats['expired'] += 1
+            disk_stats['misses'] += 1
+            return None
+
+    def put(self, key: str, result: dict) -> None:
+        """保存解析结果（需可 JSON 序列化），写入内存并安排写回磁盘"""
+        entry = (time.time(), result)
+        with self._lock:
+            self._remember(key, entry)
+            disk = self._load()
+            disk[key] = entry
+            disk.move_to_end(key)
+            while len(disk) > self._disk_entries:
+                disk.popitem(last=False)
+                self._stats['disk']['evictions'] += 1
+            self._save(disk)
+
+    def clear(self) -> None:
+        """清空两级缓存（计数保留）"""
+        with self._lock:
+            self._memory.clear()
+            self._disk = OrderedDict()
+            self._save(self._disk)
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """两级各自的命中/未命中/过期/淘汰计数和当前条目数：{"memory": {...}, "disk": {...}}
+
+        内存未命中的查找才会访问磁盘，disk 的 misses 即整体的未命中数。
+        """
+        with self._lock:
+            stats = {tier: dict(counts) for tier, counts in self._stats.items()}
+            stats['memory']['entries'] = len(self._memory)
+            stats['disk']['entries'] = len(self._disk) if self._disk is not None else 0
+        return stats
+
+    def _remember(self, key: str, entry: Tuple[float, dict]) -> None:
+        """放入内存 LRU，超出容量时淘汰最久未使用的条目（调用方持有锁）"""
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        while len(self._memory) > self._memory_entries:
+            self._memory.popitem(last=False)
+            self._stats['memory']['evictions'] += 1
+
+    def _load(self) -> "OrderedDict[str, Tuple[float, dict]]":
+        """首次访问时读取磁盘缓存，丢弃已过期的条目（调用方持有锁）"""
+        if self._disk is None:
+            self._disk = OrderedDict()
+            try:
+                with FileLock(self._path, shared=True), open(self._path, 'r', encoding='utf-8') as f:
+                    entries = json.load(f).get('entries', [])
+            except FileNotFoundError:
+                entries = []
+            except json.JSONDecodeError as e:
+                print(f"[ParseCache] 缓存文件损坏，已忽略: {e}")
+                entries = []
+            now = time.time()
+            for entry in entries:
+                if now - entry['created'] <= self._ttl:
+                    self._disk[entry['key']] = (entry['created'], entry['result'])
+                else:
+                    self._stats['disk']['expired'] += 1
+        return self._disk
+
+    def _save(self, disk: "OrderedDict[str, Tuple[float, dict]]") -> None:
+        entries = [{'key': key, 'created': created, 'result': result} for key, (created, result) in disk.items()]
+        os.makedirs(os.path.dirname(self._path) or '.', exist_ok=True)
+        background_writer.submit(
+            self._path, lambda: json.dumps({'entries': entries}, ensure_ascii=False).encode('utf-8'))
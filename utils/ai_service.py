@@ -6,10 +6,17 @@ from enum import Enum
 from dotenv import load_dotenv
 from pydantic import BaseModel, Field
 from google import genai
+from utils.ai_cache import ParseCache
 
 # 加载环境变量
 load_dotenv()
 
+# Gemini 请求的超时时间（毫秒）
+REQUEST_TIMEOUT_MS = 15000
+GEMINI_MODEL = "gemini-2.5-flash-lite-preview-06-17"
+# AI 解析结果的磁盘缓存
+CACHE_PATH = os.path.join('data', 'ai_cache.json')
+
 class PriorityLevel(str, Enum):
     """优先级枚举"""
     LOW = "low"
@@ -36,22 +43,40 @@ class TodoItemAI(BaseModel):
 class GeminiService:
     """Gemini AI 服务"""
     
-    def __init__(self):
+    def __init__(self, cache: Optional[ParseCache] = None):
         self.api_key = os.getenv('GEMINI_API_KEY')
         self.client = None
+        # 相同输入（按规范化文本和当天日期）的 AI 解析结果直接从缓存返回
+        self.cache = cache if cache is not None else ParseCache(CACHE_PATH)
         
         if self.api_key and self.api_key != 'your_gemini_api_key_here':
             try:
-                self.client = genai.Client(api_key=self.api_key)
+                # 请求超时后工作线程得以释放（界面等待结果的超时由 AIParseHandler 控制）
+                self.client = genai.Client(api_key=self.api_key,
+                                           http_options={'timeout': REQUEST_TIMEOUT_MS})
             except Exception as e:
                 print(f"AI 服务初始化失败: {e}")
                 self.client = None
     
-    def parse_todo_text(self, user_input: str) -> TodoItemAI:
-        """解析用户输入的自然语言文本为结构化待办事项"""
+    def parse_todo_text(self, user_input: str, fallback: bool = True) -> TodoItemAI:
+        """解析用户输入的自然语言文本为结构化待办事项
+
+        Args:
+            user_input: 用户输入的文本
+            fallback: AI 不可用或请求失败时返回基本解析的结果；为 False 时抛出异常，
+                由调用方决定如何处理（如保留已经显示的本地解析结果）
+        """
         
         if not self.client:
+            if not fallback:
+                raise RuntimeError("AI 服务不可用")
             return self._basic_parse(user_input)
+
+        today = date.today()
+        cache_key = self.cache.key(user_input, GEMINI_MODEL, today)
+        cached = self.cache.get(cache_key)
+        if cached is not None:
+            return TodoItemAI.model_validate(cached)
         
         prompt = f"""
 请分析以下用户输入的待办事项文本，并提取相关信息：
@@ -66,12 +91,12 @@ class GeminiService:
 5. 识别预估时间：如果提到需要多长时间完成，提取分钟数
 6. 提取其他备注信息
 
-今天的日期是：{date.today().strftime('%Y-%m-%d')}
+今天的日期是：{today.strftime('%Y-%m-%d')}
 """
         
         try:
             response = self.client.models.generate_content(
-                model="gemini-2.5-flash-lite-preview-06-17",
+                model=GEMINI_MODEL,
                 contents=prompt,
                 config={
                     "response_mime_type": "application/json",
@@ -81,13 +106,18 @@ class GeminiService:
             
             # 优先使用解析后的对象
             if hasattr(response, 'parsed') and response.parsed:
+                # 只缓存 AI 的结果，基本解析的回退结果不缓存
+                self.cache.put(cache_key, response.parsed.model_dump(mode='json'))
                 return response.parsed
-            else:
-                # 如果没有解析结果，回退到基本解析
-                print("AI 响应解析失败，使用基本解析")
-                return self._basic_parse(user_input)
+            if not fallback:
+                raise ValueError("AI 响应解析失败")
+            # 如果没有解析结果，回退到基本解析
+            print("AI 响应解析失败，使用基本解析")
+            return self._basic_parse(user_input)
             
         except Exception as e:
+            if not fallback:
+                raise
             print(f"AI 解析错误: {e}")
             # 如果 AI 解析失败，返回基本的待办事项
             return self._basic_parse(user_input)
@@ -120,6 +150,10 @@ class GeminiService:
             category=category
         )
     
+    def cache_stats(self) -> dict:
+        """AI 解析缓存内存/磁盘两级各自的命中/未命中/过期/淘汰计数"""
+        return self.cache.stats()
+
     def is_available(self) -> bool:
         """检查 AI 服务是否可用"""
         return self.client is not None 
\ No newline at end of file
@@ -0,0 +1,122 @@
+"""
+服务注册表模块
+
+应用级的依赖容器：按名称登记工厂函数，第一次 get 时才创建实例，之后
+始终返回同一个实例。数据模型和 CloudSync 都通过注册表获取，保证整个
+应用中每个数据文件只被一个模型加载、只存在一份内存副本。
+"""
+
+import os
+from typing import Any, Callable, Dict, List, Optional
+
+Factory = Callable[['ServiceRegistry'], Any]
+
+
+class ServiceRegistry:
+    """延迟创建、共享实例的服务注册表"""
+
+    def __init__(self):
+        self._factories: Dict[str, Factory] = {}
+        self._instances: Dict[str, Any] = {}
+        self._creating: List[str] = []
+
+    def register(self, name: str, factory: Factory) -> None:
+        """登记服务的工厂函数（工厂接收注册表本身，用于获取依赖）
+
+        已创建的同名实例会被丢弃，下次 get 时用新工厂重新创建。
+        """
+        self._factories[name] = factory
+        self._instances.pop(name, None)
+
+    def get(self, name: str) -> Any:
+        """获取共享实例，首次访问时创建"""
+        if name in self._instances:
+            return self._instances[name]
+        if name not in self._factories:
+            raise KeyError(f"未注册的服务: {name}")
+        if name in self._creating:
+            raise RuntimeError(f"服务存在循环依赖: {' -> '.join(self._creating + [name])}")
+        self._creating.append(name)
+        try:
+            instance = self._factories[name](self)
+        finally:
+            self._creating.pop()
+        self._instances[name] = instance
+        return instance
+
+    def is_created(self, name: str) -> bool:
+        """服务是否已经创建"""
+        return name in self._instances
+
+    @property
+    def created(self) -> List[str]:
+        """已创建的服务名（按创建顺序）"""
+        return list(self._instances)
+
+
+def create_app_registry(user_id: str, key_path: str, live_upload_delay_ms: int = 2000,
+                        cloud_backend: Optional[str] = None, cloud_dir: Optional[str] = None) -> ServiceRegistry:
+    """登记应用的全部数据模型和云同步服务
+
+    服务名：cloud_sync、sync_worker、sync_all、live_sync、sync_outbox、todo_model、event_model、timer_model。
+    模块在工厂内部导入，未用到的服务不会被导入也不会被创建。
+    待办事项和时间记录模型创建后即开始监视数据文件的外部修改。
+    cloud_backend/cloud_dir 选择云同步后端（见 cloud.backends.create_backend），默认 Firestore。
+    """
+    registry = ServiceRegistry()
+
+    def cloud_sync(r: ServiceRegistry):
+        from cloud.backends import create_backend
+        from cloud.cloud_sync import CloudSync
+        return CloudSync(key_path, user_id, backend=create_backend(cloud_backend, key_path, cloud_dir))
+
+    def sync_worker(r: ServiceRegistry):
+        from cloud.sync_worker import SyncWorker
+        return SyncWorker()
+
+    def sync_all(r: ServiceRegistry):
+        from cloud.sync_all import SyncAll
+        return SyncAll(r.get('cloud_sync'), [r.get('todo_model'), r.get('event_model'), r.get('timer_model')])
+
+    def live_sync(r: ServiceRegistry):
+        from cloud.live_sync import LiveSync
+        return LiveSync(r.get('sync_worker'), [r.get('todo_model'), r.get('event_model')],
+                        upload_delay_ms=live_upload_delay_ms)
+
+    def sync_outbox(r: ServiceRegistry):
+        from cloud.sync_outbox import SyncOutbox
+        outbox = SyncOutbox(r.get('sync_worker'), os.path.join('data', 'sync_outbox.json'))
+        models = [r.get('todo_model'), r.get('event_model'), r.get('timer_model')]
+        for model in models:
+            outbox.register(model.upload_job)
+            outbox.register(model.download_job)
+        sync_all = r.get('sync_all')
+        outbox.register(sync_all.upload_job, covers=[model.upload_job().name for model in models])
+        outbox.register(sync_all.download_job, covers=[model.download_job().name for model in models])
+        return outbox
+
+    def todo_model(r: ServiceRegistry):
+        from model.todo_model import TodoModel
+        model = TodoModel(user_id, key_path, cloud=r.get('cloud_sync'))
+        model.watch_external_changes()
+        return model
+
+    def event_model(r: ServiceRegistry):
+        from model.event_model import EventModel
+        model = EventModel(user_id, key_path, cloud=r.get('cloud_sync'))
+        model.watch_external_changes()
+        return model
+
+    def timer_model(r: ServiceRegistry):
+        from model.timer_model import TimerModel
+        return TimerModel(user_id, key_path, event_model=r.get('event_model'), cloud=r.get('cloud_sync'))
+
+    registry.register('cloud_sync', cloud_sync)
+    registry.register('sync_worker', sync_worker)
+    registry.register('sync_all', sync_all)
+    registry.register('live_sync', live_sync)
+    registry.register('sync_outbox', sync_outbox)
+    registry.register('todo_model', todo_model)
+    registry.register('event_model', event_model)
+    registry.register('timer_model', timer_model)
+    return registry
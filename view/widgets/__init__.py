@@ -1,6 +1,7 @@
 from .ai_line_edit import AILineEdit
 from .todo_list_view import TodoListView
 from .event_list_view import EventListView
+from .archive_list_view import ArchiveListView
 from .base_list_view import BaseListView
 from .list_toggle_buttons import ListToggleButtons
 
@@ -8,6 +9,7 @@ __all__ = [
     'AILineEdit',
     'TodoListView', 
     'EventListView',
+    'ArchiveListView',
     'BaseListView',
     'ListToggleButtons'
 ] 
\ No newline at end of file
@@ -0,0 +1,55 @@
+from PySide6.QtCore import Qt
+from PySide6.QtGui import QAction, QKeyEvent
+from PySide6.QtWidgets import QMenu
+
+from model.todo_archive import TodoArchive, TodoArchiveModel
+from view.widgets.base_list_view import BaseListView
+
+
+class ArchiveListView(BaseListView):
+    """
+    已归档待办事项的只读列表视图
+    数据来自 TodoArchiveModel：滚动到底部时经 canFetchMore/fetchMore 再读下一批，
+    不会一次解压整个归档。归档只追加，不提供删除
+    """
+
+    def __init__(self, archive: TodoArchive, parent=None):
+        super().__init__(parent)
+        self.archive_model = TodoArchiveModel(archive, parent=self)
+        self._filter_text = ""
+        self.setUniformItemSizes(True)
+        self.setModel(self.archive_model)
+
+    def search(self, text: str = ""):
+        """按描述文本过滤归档（空字符串显示全部）"""
+        self._filter_text = text
+        self.archive_model.set_filter(text)
+
+    def refresh_data(self):
+        """重新从头读取归档（启动后可能有新归档的事项）"""
+        self.archive_model.set_filter(self._filter_text)
+
+    def _show_context_menu(self, position):
+        """只读列表：右键菜单只有查看详情"""
+        index = self.indexAt(position)
+        if not index.isValid():
+            return
+        menu = QMenu(self)
+        info_action = QAction("查看详情", self)
+        info_action.triggered.connect(lambda: self.show_info_requested.emit(index))
+        menu.addAction(info_action)
+        menu.exec(self.mapToGlobal(position))
+
+    def keyPressEvent(self, event: QKeyEvent):
+        """归档中的事项不能删除，Delete 键不发出删除请求"""
+        if event.key() == Qt.Key_Delete:
+            return
+        super().keyPressEvent(event)
+
+    def get_display_name(self) -> str:
+        """返回列表类型名称"""
+        return "已归档"
+
+    def get_empty_message(self) -> str:
+        """返回空列表时的提示信息"""
+        return "暂无归档事项\n完成超过一定天数的待办事项会自动归档"
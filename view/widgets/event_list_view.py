@@ -1,34 +1,43 @@
 from view.widgets.base_list_view import BaseListView
-from PySide6.QtCore import QAbstractListModel, Qt, QModelIndex
-from datetime import datetime
+from PySide6.QtCore import QSortFilterProxyModel, Qt, QModelIndex
 
 
-class EventListModel(QAbstractListModel):
-    """时间记录列表的数据模型"""
+class EventListModel(QSortFilterProxyModel):
+    """时间记录列表的数据模型
+
+    直接代理 EventModel 并按结束时间倒序排列：EventModel 的行级插入/删除/修改信号
+    （新记录、其他进程修改后的增量重新加载、云端变更的合并）由代理映射到对应的行，
+    列表不需要整体刷新。
+    """
     
     def __init__(self, event_model, parent=None):
         super().__init__(parent)
         self.event_model = event_model
-        self._events = []
-        self._load_events()
-    
-    def _load_events(self):
-        """从EventModel加载事件数据"""
-        if hasattr(self.event_model, '_items'):
-            self._events = list(self.event_model._items)
-            # 按时间倒序排列
-            self._events.sort(key=lambda x: x.end_time, reverse=True)
-    
-    def rowCount(self, parent=QModelIndex()):
-        """返回行数"""
-        return len(self._events)
+        self.setDynamicSortFilter(True)
+        self.setSourceModel(event_model)
+        self.sort(0, Qt.DescendingOrder)
+
+    def lessThan(self, left: QModelIndex, right: QModelIndex) -> bool:
+        """比较 ISO 字符串即可，不必为每条记录解析时间"""
+        items = self.event_model._items
+        return items[left.row()].time_key('end_time') < items[right.row()].time_key('end_time')
+
+    def canFetchMore(self, parent=QModelIndex()):
+        """还有未加载的更早月份时，滚动到底部会触发 fetchMore"""
+        return self.event_model.canFetchMore(parent)
+
+    def fetchMore(self, parent=QModelIndex()):
+        """加载更早一个月的记录（EventModel 发出插入信号，代理按时间排入对应位置）"""
+        self.event_model.load_older_segment()
     
     def data(self, index, role=Qt.DisplayRole):
         """返回数据"""
-        if not index.isValid() or not 0 <= index.row() < len(self._events):
+        if not index.isValid():
             return None
         
-        event = self._events[index.row()]
+        event = super().data(index, Qt.UserRole)
+        if event is None:
+            return None
         
         if role == Qt.DisplayRole:
             # 格式化显示文本
@@ -39,12 +48,14 @@ class EventListModel(QAbstractListModel):
             return event
         
         return None
+
+    def source_row(self, index: QModelIndex) -> int:
+        """列表中的行对应的 EventModel 行号"""
+        return self.mapToSource(index).row()
     
     def refresh(self):
-        """刷新数据"""
-        self.beginResetModel()
-        self._load_events()
-        self.endResetModel()
+        """重新排序（数据变化由 EventModel 的信号自动反映）"""
+        self.invalidate()
 
 
 class EventListView(BaseListView):
@@ -57,22 +68,14 @@ class EventListView(BaseListView):
         super().__init__(parent)
         self.event_model = event_model
         self._setup_model()
-        self._connect_event_model_signals()
     
     def _setup_model(self):
         """设置数据模型"""
         self.event_list_model = EventListModel(self.event_model)
+        # 每行都是两行文本，统一行高后视图只会为可见行请求数据
+        self.setUniformItemSizes(True)
         self.setModel(self.event_list_model)
     
-    def _connect_event_model_signals(self):
-        """连接事件模型信号"""
-        if hasattr(self.event_model, 'event_saved'):
-            self.event_model.event_saved.connect(self._on_event_saved)
-    
-    def _on_event_saved(self, description):
-        """当新事件保存时刷新列表"""
-        self.event_list_model.refresh()
-    
     def get_display_name(self) -> str:
         """返回列表类型名称"""
         return "时间记录"
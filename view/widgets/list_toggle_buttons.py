@@ -5,10 +5,10 @@ from PySide6.QtCore import Signal, Qt
 class ListToggleButtons(QWidget):
     """
     Material Design风格的切换按钮组
-    用于在Todo List和Time List之间切换
+    用于在Todo List、Time List和归档列表之间切换
     """
     
-    mode_changed = Signal(str)  # "todo" or "time"
+    mode_changed = Signal(str)  # "todo"、"time" 或 "archive"
     
     def __init__(self, parent=None):
         super().__init__(parent)
@@ -37,13 +37,20 @@ class ListToggleButtons(QWidget):
         self.time_button.setCheckable(True)
         self.time_button.setObjectName("toggleButton")
         
+        # 归档按钮：浏览已归档的待办事项
+        self.archive_button = QPushButton("📦 Archive")
+        self.archive_button.setCheckable(True)
+        self.archive_button.setObjectName("toggleButton")
+        
         # 添加到按钮组
         self.button_group.addButton(self.todo_button, 0)
         self.button_group.addButton(self.time_button, 1)
+        self.button_group.addButton(self.archive_button, 2)
         
         # 添加到布局
         layout.addWidget(self.todo_button)
         layout.addWidget(self.time_button)
+        layout.addWidget(self.archive_button)
     
     def _apply_material_design_style(self):
         """应用Material Design样式"""
@@ -86,6 +93,7 @@ class ListToggleButtons(QWidget):
         """连接信号槽"""
         self.todo_button.clicked.connect(lambda: self._on_button_clicked("todo"))
         self.time_button.clicked.connect(lambda: self._on_button_clicked("time"))
+        self.archive_button.clicked.connect(lambda: self._on_button_clicked("archive"))
     
     def _on_button_clicked(self, mode: str):
         """处理按钮点击事件"""
@@ -99,6 +107,8 @@ class ListToggleButtons(QWidget):
             self.todo_button.setChecked(True)
         elif mode == "time":
             self.time_button.setChecked(True)
+        elif mode == "archive":
+            self.archive_button.setChecked(True)
         
         if self.current_mode != mode:
             self.current_mode = mode
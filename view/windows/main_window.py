@@ -5,6 +5,7 @@ from PySide6.QtGui import QKeySequence, QShortcut
 from view.widgets.ai_line_edit import AILineEdit
 from view.widgets.todo_list_view import TodoListView
 from view.widgets.event_list_view import EventListView
+from view.widgets.archive_list_view import ArchiveListView
 from view.widgets.list_toggle_buttons import ListToggleButtons
 from view.utils import load_stylesheet
 
@@ -19,10 +20,11 @@ class MainWindow(QWidget):
     upload_requested = Signal()
     download_requested = Signal()
     
-    def __init__(self, config: dict, event_model=None, parent=None):
+    def __init__(self, config: dict, event_model=None, parent=None, todo_archive=None):
         super().__init__(parent)
         self.config = config
         self.event_model = event_model
+        self.todo_archive = todo_archive
         self.old_pos = None
         self._init_ui()
 
@@ -71,10 +73,13 @@ class MainWindow(QWidget):
         self.list_stack = QStackedWidget()
         self.todo_list_view = TodoListView()
         self.event_list_view = EventListView(self.event_model) if self.event_model else None
+        self.archive_list_view = ArchiveListView(self.todo_archive) if self.todo_archive else None
         
         self.list_stack.addWidget(self.todo_list_view)
         if self.event_list_view:
             self.list_stack.addWidget(self.event_list_view)
+        if self.archive_list_view:
+            self.list_stack.addWidget(self.archive_list_view)
         
         # 保持向后兼容，list_view指向当前活动视图
         self.list_view = self.todo_list_view
@@ -137,9 +142,11 @@ class MainWindow(QWidget):
             app.quit()
 
     def _on_add_item(self):
-        """当输入框回车时，发射添加信号并清空输入"""
+        """当输入框回车时，发射添加信号并清空输入；归档模式下按输入的文本搜索归档"""
         text = self.input_lineedit.text()
-        if text:
+        if self.list_view is self.archive_list_view:
+            self.archive_list_view.search(text)
+        elif text:
             self.add_item_requested.emit(text)
             self.input_lineedit.clear()
 
@@ -181,6 +188,10 @@ class MainWindow(QWidget):
         elif mode == "time" and self.event_list_view:
             self.list_stack.setCurrentWidget(self.event_list_view)
             self.list_view = self.event_list_view
+        elif mode == "archive" and self.archive_list_view:
+            self.archive_list_view.refresh_data()
+            self.list_stack.setCurrentWidget(self.archive_list_view)
+            self.list_view = self.archive_list_view
         
         # 重新连接当前活动视图的信号
         self._connect_current_list_signals()
@@ -195,9 +206,9 @@ class MainWindow(QWidget):
         except:
             pass
         
-        # 连接当前活动视图的信号
+        # 连接当前活动视图的信号（归档列表只读，双击不切换完成状态）
         current_view = self.list_stack.currentWidget()
-        if current_view:
+        if current_view and current_view is not self.archive_list_view:
             current_view.item_double_clicked.connect(self.toggle_item_requested)
 
     def get_list_view(self):